@@ -0,0 +1,14 @@
+import subprocess
+import sys
+
+
+def test_help_startup(benchmark):
+    benchmark(subprocess.run, [sys.executable, "-c", "from dbt_sdf.cli.main import cli; cli()", "--help"],
+              check=True, capture_output=True)
+
+
+def test_migrate_help_startup(benchmark):
+    """Loading the migrate command imports dbt."""
+    benchmark.pedantic(subprocess.run, args=([sys.executable, "-c", "from dbt_sdf.cli.main import cli; cli()",
+                                              "migrate", "--help"],),
+                       kwargs={"check": True, "capture_output": True}, rounds=3)
@@ -0,0 +1,23 @@
+import random
+
+import pytest
+from jinja2 import Environment
+
+from benchmarks.differential import TemplateGenerator, summarize, summarize_with_jinja
+
+
+@pytest.fixture(scope="module")
+def templates():
+    generator = TemplateGenerator(random.Random(0), max_depth=3)
+    return [generator.template() for _ in range(200)]
+
+
+@pytest.mark.benchmark(group="differential")
+def test_model_parser(benchmark, templates):
+    benchmark(lambda: [summarize(code) for code in templates])
+
+
+@pytest.mark.benchmark(group="differential")
+def test_jinja2_parser(benchmark, templates):
+    environment = Environment()
+    benchmark(lambda: [summarize_with_jinja(code, environment) for code in templates])
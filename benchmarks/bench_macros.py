@@ -0,0 +1,52 @@
+import os
+from types import SimpleNamespace
+
+import dbt.include.global_project
+import pytest
+
+from benchmarks.synthetic import generate_macros
+from dbt_sdf.migration.pipeline import run_pipeline
+from dbt_sdf.migration.resolution import ResolutionIndex
+from dbt_sdf.model_parser.evaluator import Evaluator
+from dbt_sdf.model_parser.inliner import Inliner
+from dbt_sdf.model_parser.macro_cache import MacroCache
+from dbt_sdf.model_parser.macros import MacroIndex, parse_macros
+
+# dbt's own macros stand in for an installed package such as dbt_utils
+PACKAGE_ROOT = os.path.dirname(dbt.include.global_project.__file__)
+
+
+@pytest.fixture(scope="module")
+def warm_cache(tmp_path_factory):
+    cache = MacroCache(str(tmp_path_factory.mktemp("macro_cache")))
+    cache.add_package(MacroIndex(), "dbt", PACKAGE_ROOT, ["macros"], version="bench")
+    return cache
+
+
+@pytest.mark.benchmark(group="package-macros")
+def test_parse_package_macros(benchmark):
+    benchmark(lambda: MacroIndex().add_package("dbt", PACKAGE_ROOT, ["macros"]))
+
+
+@pytest.mark.benchmark(group="package-macros")
+def test_load_cached_package_macros(benchmark, warm_cache):
+    benchmark(lambda: warm_cache.add_package(MacroIndex(), "dbt", PACKAGE_ROOT, ["macros"], version="bench"))
+
+
+def test_render_models_statically(benchmark, spec, sources):
+    """Render the synthetic project without dbt, inlining its macros."""
+    macros = MacroIndex(root_project=spec.name)
+    for path, code in generate_macros(spec).items():
+        for macro in parse_macros(code, path, spec.name):
+            macros.add(macro)
+    index = ResolutionIndex(spec.name)
+    for source in sources:
+        index.add_node(SimpleNamespace(unique_id=source.unique_id, name=source.name, package_name=source.package_name,
+                                       database=source.database, schema=source.schema, alias=source.name))
+    for i in range(max(spec.sources, 1)):
+        index.add_source(SimpleNamespace(unique_id=f"source.{spec.name}.raw.table_{i}", source_name="raw",
+                                         name=f"table_{i}", package_name=spec.name, database="synthetic",
+                                         schema="raw", identifier=f"table_{i}"))
+    inliner = Inliner(macros, Evaluator(target={"name": "prod"}))
+    models = benchmark(run_pipeline, sources, index=index, inliner=inliner)
+    benchmark.extra_info["rendered_statically"] = sum(1 for model in models if model.compiled_code is not None)
@@ -0,0 +1,44 @@
+import glob
+import os
+
+import pytest
+
+from dbt_sdf.migration.pipeline import ModelSource, build_definitions, run_pipeline, write_definitions
+
+
+def read_sources(project_dir, package_name):
+    sources = []
+    for path in sorted(glob.glob(os.path.join(project_dir, "models", "**", "*.sql"), recursive=True)):
+        name = os.path.basename(path)[:-4]
+        with open(path) as f:
+            sources.append(ModelSource(f"model.{package_name}.{name}", name, package_name,
+                                       os.path.relpath(path, project_dir), f.read(),
+                                       database="synthetic", schema="analytics"))
+    return sources
+
+
+def test_migrate_pipeline(benchmark, spec, project_dir, tmp_path):
+    """Read, migrate and write a synthetic project without dbt in the loop."""
+    def migrate():
+        models = run_pipeline(read_sources(project_dir, spec.name))
+        write_definitions(build_definitions(spec.name, models), str(tmp_path / "workspace.sdf.yml"))
+
+    benchmark(migrate)
+
+
+def test_migrate_cli(benchmark, spec, project_dir, tmp_path):
+    """Run `dbt-sdf migrate` end to end, including dbt's manifest parse."""
+    pytest.importorskip("dbt.adapters.duckdb")
+    from dbt_sdf.cli.main import cli
+
+    with open(os.path.join(project_dir, "profiles.yml"), "w") as f:
+        f.write(f"{spec.name}:\n  target: dev\n  outputs:\n    dev:\n"
+                f"      type: duckdb\n      path: {tmp_path / 'synthetic.duckdb'}\n")
+    args = ["migrate", "--project-dir", project_dir, "--profiles-dir", project_dir,
+            "--workspace-dir", str(tmp_path), "--slowest-models", "0", "--no-partial-parse"]
+
+    def migrate():
+        ctx = cli.make_context(cli.name, list(args))
+        cli.invoke(ctx)
+
+    benchmark.pedantic(migrate, rounds=3, iterations=1)
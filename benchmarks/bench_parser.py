@@ -0,0 +1,154 @@
+import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from dbt_sdf.model_parser import is_compiled, load_source, parser
+from dbt_sdf.model_parser.dump import dump, dump_json
+from dbt_sdf.model_parser.evaluator import Evaluator
+from dbt_sdf.model_parser.parser import PARALLEL_THRESHOLD, Parser, extract_dbt_calls, tokenize, tokenize_chunked
+
+
+def test_tokenize(benchmark, sources):
+    benchmark(lambda: [tokenize(source.raw_code) for source in sources])
+
+
+def test_tokenize_large_template(benchmark, large_template):
+    benchmark(tokenize, large_template)
+
+
+@pytest.fixture(scope="module")
+def huge_template(large_template):
+    """A generated model of a few megabytes, a fraction of the largest ones seen."""
+    return "\n".join([large_template] * 20)
+
+
+@pytest.mark.benchmark(group="tokenize-huge-template")
+def test_tokenize_huge_template(benchmark, huge_template):
+    benchmark.pedantic(tokenize, (huge_template,), {"max_workers": 1}, rounds=3)
+
+
+@pytest.mark.benchmark(group="tokenize-huge-template")
+def test_tokenize_huge_template_chunked(benchmark, huge_template):
+    benchmark.pedantic(tokenize_chunked, (huge_template,), {"chunk_size": 512 * 1024}, rounds=3)
+
+
+@pytest.fixture(scope="module")
+def parallel_template(large_template):
+    """A generated model just over PARALLEL_THRESHOLD, the size tokenize() starts chunking at."""
+    return "\n".join([large_template] * (PARALLEL_THRESHOLD // len(large_template) + 1))
+
+
+@pytest.mark.benchmark(group="tokenize-parallel-template")
+@pytest.mark.parametrize("max_workers", [None, 1])
+def test_tokenize_parallel_template(benchmark, parallel_template, max_workers):
+    # None is the default: chunked on a process pool only with more than one CPU
+    benchmark.pedantic(tokenize, (parallel_template,), {"max_workers": max_workers}, rounds=1)
+
+
+def test_parse(benchmark, sources):
+    token_streams = [tokenize(source.raw_code) for source in sources]
+    benchmark(lambda: [Parser(tokens).parse() for tokens in token_streams])
+
+
+@pytest.mark.benchmark(group="parse-large-template")
+def test_parse_large_template(benchmark, large_template):
+    tokens = tokenize(large_template)
+    benchmark(lambda: Parser(tokens).parse())
+
+
+@pytest.mark.benchmark(group="parse-large-template")
+def test_parse_large_template_lazily(benchmark, large_template):
+    tokens = tokenize(large_template)
+    benchmark(lambda: Parser(tokens, lazy=True).parse())
+
+
+@pytest.mark.benchmark(group="config-calls")
+def test_config_calls_eager(benchmark, sources):
+    token_streams = [tokenize(source.raw_code) for source in sources]
+    evaluator = Evaluator(target={"name": "prod"})
+    benchmark(lambda: [evaluator.calls(Parser(tokens).parse(), "config") for tokens in token_streams])
+
+
+@pytest.mark.benchmark(group="config-calls")
+def test_config_calls_lazy(benchmark, sources):
+    """Only the bodies of the if branches taken and of loops are parsed."""
+    token_streams = [tokenize(source.raw_code) for source in sources]
+    evaluator = Evaluator(target={"name": "prod"})
+    benchmark(lambda: [evaluator.calls(Parser(tokens, lazy=True).parse(), "config") for tokens in token_streams])
+
+
+def test_extract_dbt_calls(benchmark, sources):
+    benchmark(lambda: [extract_dbt_calls(source.raw_code) for source in sources])
+
+
+def _calls(code):
+    return extract_dbt_calls(code)
+
+
+@pytest.mark.benchmark(group="parse-pool")
+def test_extract_calls_on_thread_pool(benchmark, sources):
+    """Scales with cores on free-threaded builds only, but returns trees without pickling them."""
+    codes = [source.raw_code for source in sources]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        benchmark(lambda: list(executor.map(_calls, codes)))
+
+
+@pytest.mark.benchmark(group="parse-pool")
+def test_extract_calls_on_process_pool(benchmark, sources):
+    codes = [source.raw_code for source in sources]
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        benchmark(lambda: list(executor.map(_calls, codes, chunksize=len(codes) // 16)))
+
+
+@pytest.fixture(scope="module")
+def pure_parser():
+    return load_source("parser", "dbt_sdf.model_parser._pure_parser")
+
+
+@pytest.mark.benchmark(group="compiled-speedup")
+def test_tokenize_and_parse_pure_python(benchmark, pure_parser, sources):
+    benchmark(lambda: [pure_parser.Parser(pure_parser.tokenize(source.raw_code)).parse() for source in sources])
+
+
+@pytest.mark.benchmark(group="compiled-speedup")
+def test_tokenize_and_parse_compiled(benchmark, sources):
+    if not is_compiled(parser):
+        pytest.skip("the model parser is not compiled, see `make build-compiled`")
+    benchmark(lambda: [Parser(tokenize(source.raw_code)).parse() for source in sources])
+
+
+@pytest.mark.benchmark(group="compare-trees")
+def test_compare_trees_by_repr(benchmark, large_template):
+    trees, again = Parser(tokenize(large_template)).parse(), Parser(tokenize(large_template)).parse()
+    benchmark(lambda: repr(trees) == repr(again))
+
+
+@pytest.mark.benchmark(group="compare-trees")
+def test_compare_trees_by_equality(benchmark, large_template):
+    trees, again = Parser(tokenize(large_template)).parse(), Parser(tokenize(large_template)).parse()
+    benchmark(lambda: trees == again)
+
+
+@pytest.mark.benchmark(group="compare-trees")
+def test_fingerprint_trees(benchmark, large_template):
+    tokens = tokenize(large_template)
+    benchmark(lambda: [node.fingerprint() for node in Parser(tokens).parse()])
+
+
+@pytest.mark.benchmark(group="print-trees")
+def test_print_trees_by_repr(benchmark, large_template):
+    trees = Parser(tokenize(large_template)).parse()
+    benchmark(lambda: io.StringIO().write(repr(trees)))
+
+
+@pytest.mark.benchmark(group="print-trees")
+def test_print_trees_by_dump(benchmark, large_template):
+    trees = Parser(tokenize(large_template)).parse()
+    benchmark(lambda: dump(trees, io.StringIO()))
+
+
+@pytest.mark.benchmark(group="print-trees")
+def test_print_trees_as_json(benchmark, large_template):
+    trees = Parser(tokenize(large_template)).parse()
+    benchmark(lambda: dump_json(trees, io.StringIO()))
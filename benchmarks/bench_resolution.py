@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from dbt_sdf.migration.pipeline import run_pipeline
+from dbt_sdf.migration.resolution import ResolutionIndex, qualified_name
+
+
+@pytest.fixture(scope="module")
+def manifest(spec, sources):
+    """A stand-in for the dbt Manifest of the synthetic project, with the attributes the index reads."""
+    nodes = {
+        source.unique_id: SimpleNamespace(
+            unique_id=source.unique_id, resource_type="model", name=source.name, package_name=source.package_name,
+            database=source.database, schema=source.schema, alias=source.name)
+        for source in sources
+    }
+    raw = {
+        f"source.{spec.name}.raw.table_{i}": SimpleNamespace(
+            unique_id=f"source.{spec.name}.raw.table_{i}", source_name="raw", name=f"table_{i}",
+            package_name=spec.name, database="synthetic", schema="raw", identifier=f"table_{i}")
+        for i in range(max(spec.sources, 1))
+    }
+    return SimpleNamespace(nodes=nodes, sources=raw)
+
+
+@pytest.fixture(scope="module")
+def models(sources):
+    return run_pipeline(sources)
+
+
+def naive_resolve(manifest, call):
+    """Resolve a call by scanning the manifest, as a per-call lookup without an index would."""
+    args = [argument.token.value[1:-1] for argument in call.children[1:]]
+    if call.children[0].token.value == "source":
+        for source in manifest.sources.values():
+            if (source.source_name, source.name) == tuple(args):
+                return qualified_name(source.database, source.schema, source.identifier)
+    for node in manifest.nodes.values():
+        if node.name == args[-1]:
+            return qualified_name(node.database, node.schema, node.alias)
+
+
+def test_build_index(benchmark, spec, manifest):
+    benchmark(ResolutionIndex.from_manifest, manifest, spec.name)
+
+
+@pytest.mark.benchmark(group="resolve-calls")
+def test_resolve_with_index(benchmark, spec, manifest, models):
+    def resolve():
+        index = ResolutionIndex.from_manifest(manifest, spec.name)
+        return [index.resolve_call(call, spec.name) for model in models for call in model.ref_calls + model.source_calls]
+    benchmark(resolve)
+
+
+@pytest.mark.benchmark(group="resolve-calls")
+def test_resolve_by_scanning(benchmark, manifest, models):
+    benchmark(lambda: [naive_resolve(manifest, call) for model in models for call in model.ref_calls + model.source_calls])
@@ -0,0 +1,205 @@
+import itertools
+from enum import Enum
+from typing import List, Optional, Union
+
+import pytest
+import yaml
+from pydantic import TypeAdapter, create_model
+
+from dbt_sdf.migration.output import write_workspace
+from dbt_sdf.migration.pipeline import build_definitions, run_pipeline, write_definitions
+from dbt_sdf.schema.generated.models import (
+    CompressionType,
+    Definition,
+    Materialization,
+    Materialization10,
+    Table,
+    TableCreationFlags,
+    TablePurpose,
+)
+from dbt_sdf.schema import loader
+from dbt_sdf.schema.generated import mirrors
+from dbt_sdf.schema.generated import models as models_
+from dbt_sdf.schema.loader import load_workspace
+from dbt_sdf.schema.validation import construct_definitions, list_adapter, validate_definitions
+
+
+@pytest.fixture(scope="module")
+def models(sources):
+    return run_pipeline(sources)
+
+
+@pytest.fixture(scope="module")
+def table_dicts(models):
+    return [
+        {"table": {"name": model.source.table_name, "materialization": "view", "dependencies": ["a.b.c"]}}
+        for model in models
+    ] * 10
+
+
+def test_construct_tables(benchmark, models):
+    names = [model.source.table_name for model in models]
+    benchmark(lambda: [Definition(table=Table(name=name)) for name in names])
+
+
+@pytest.mark.parametrize("trusted", [False, True], ids=["validated", "trusted"])
+def test_build_definitions(benchmark, models, trusted):
+    benchmark(build_definitions, "synthetic", models, trusted=trusted)
+
+
+@pytest.mark.benchmark(group="batch-validation")
+def test_validate_one_by_one(benchmark, table_dicts):
+    benchmark(lambda: [Definition.model_validate(definition) for definition in table_dicts])
+
+
+@pytest.mark.benchmark(group="batch-validation")
+def test_validate_batch(benchmark, table_dicts):
+    benchmark(validate_definitions, table_dicts)
+
+
+@pytest.mark.benchmark(group="batch-validation")
+def test_construct_trusted(benchmark, table_dicts):
+    benchmark(construct_definitions, table_dicts)
+
+
+def test_yaml_emission(benchmark, models, tmp_path):
+    definitions = build_definitions("synthetic", models)
+    path = str(tmp_path / "workspace.sdf.yml")
+    benchmark(write_definitions, definitions, path)
+
+
+@pytest.mark.parametrize("output_format", ["json", "ndjson"])
+def test_json_emission(benchmark, models, tmp_path, output_format):
+    definitions = build_definitions("synthetic", models)
+    benchmark(write_workspace, definitions, str(tmp_path), output_format)
+
+
+def _legacy_union(enum, *extra):
+    """Rebuild the Union of single-member Enums the code generator emits for enum."""
+    arms = [Enum(f"{enum.__name__}{i}", {member.name: member.value}) for i, member in enumerate(enum, 1)]
+    return Optional[Union[tuple(arms) + extra]]
+
+
+# The Table fields that used to be Unions, before and after cleanup_codegen.py merges them
+LEGACY_TABLE = create_model(
+    "LegacyTable",
+    materialization=(_legacy_union(Materialization, Materialization10), None),
+    purpose=(_legacy_union(TablePurpose), None),
+    creation_flags=(_legacy_union(TableCreationFlags), None),
+    compression=(_legacy_union(CompressionType), None),
+)
+MERGED_TABLE = create_model(
+    "MergedTable",
+    materialization=(Optional[Union[Materialization, Materialization10]], None),
+    purpose=(Optional[TablePurpose], None),
+    creation_flags=(Optional[TableCreationFlags], None),
+    compression=(Optional[CompressionType], None),
+)
+
+
+@pytest.fixture(scope="module")
+def table_fields():
+    def values(enum):
+        return [member.value for member in enum]
+
+    fields = zip(
+        itertools.cycle(values(Materialization) + [{"other": "custom"}]),
+        itertools.cycle(values(TablePurpose)),
+        itertools.cycle(values(TableCreationFlags)),
+        itertools.cycle(values(CompressionType)),
+    )
+    return [
+        dict(zip(("materialization", "purpose", "creation_flags", "compression"), row))
+        for row in itertools.islice(fields, 2000)
+    ]
+
+
+@pytest.mark.benchmark(group="enum-validation")
+@pytest.mark.parametrize("model", [LEGACY_TABLE, MERGED_TABLE], ids=["union", "enum"])
+def test_validate_enum_fields(benchmark, model, table_fields):
+    adapter = TypeAdapter(List[model])
+    benchmark(adapter.validate_python, table_fields)
+
+
+def test_validate_definitions(benchmark, table_fields):
+    definitions = [
+        {"table": {"name": f"t{i}", "materialization": fields["materialization"], "purpose": fields["purpose"]}}
+        for i, fields in enumerate(table_fields)
+    ]
+    adapter = TypeAdapter(List[Definition])
+    benchmark(adapter.validate_python, definitions)
+
+
+@pytest.fixture(scope="module")
+def workspace_dir(models, tmp_path_factory):
+    root = tmp_path_factory.mktemp("workspace")
+    for i, model in enumerate(models):
+        table = {
+            "name": model.source.table_name,
+            "materialization": "view",
+            "description": "A synthetic table",
+            "columns": [
+                {"name": f"column_{j}", "datatype": "varchar", "lineage": {"copy": [f"upstream.column_{j}"]}}
+                for j in range(20)
+            ],
+        }
+        with open(root / f"t{i:04}.sdf.yml", "w") as f:
+            yaml.safe_dump({"table": table}, f)
+    return str(root)
+
+
+@pytest.mark.benchmark(group="workspace-loading")
+def test_scan_workspace(benchmark, workspace_dir):
+    benchmark(lambda: [(d.key, d.hash) for d in load_workspace(workspace_dir)])
+
+
+@pytest.mark.benchmark(group="workspace-loading")
+def test_load_and_validate_workspace(benchmark, workspace_dir):
+    benchmark(lambda: [d.definition for d in load_workspace(workspace_dir)])
+
+
+@pytest.mark.benchmark(group="workspace-loading")
+@pytest.mark.skipif(not yaml.__with_libyaml__, reason="PyYAML was built without libyaml")
+def test_scan_workspace_pure_python_yaml(benchmark, workspace_dir, monkeypatch):
+    monkeypatch.setattr(loader, "SafeLoader", yaml.SafeLoader)
+    benchmark(lambda: [(d.key, d.hash) for d in load_workspace(workspace_dir)])
+
+
+COLUMNS = [(f"column_{i}", f"upstream.column_{i}") for i in range(20)]
+
+
+@pytest.mark.benchmark(group="hot-models")
+def test_build_tables_pydantic(benchmark, models):
+    def build():
+        return [
+            models_.Table(name=model.source.table_name, columns=[
+                models_.Column(name=name, lineage=models_.Lineage(copy=[upstream])) for name, upstream in COLUMNS
+            ])
+            for model in models
+        ]
+    benchmark(build)
+
+
+@pytest.mark.benchmark(group="hot-models")
+def test_build_tables_mirrors(benchmark, models):
+    def build():
+        return [
+            mirrors.Table(model.source.table_name, columns=[
+                mirrors.Column(name, lineage=mirrors.Lineage(copy_=[upstream])) for name, upstream in COLUMNS
+            ])
+            for model in models
+        ]
+    benchmark(build)
+
+
+@pytest.mark.benchmark(group="hot-models")
+def test_build_tables_mirrors_then_validate(benchmark, models):
+    def build():
+        tables = [
+            mirrors.Table(model.source.table_name, columns=[
+                mirrors.Column(name, lineage=mirrors.Lineage(copy_=[upstream])) for name, upstream in COLUMNS
+            ])
+            for model in models
+        ]
+        return list_adapter(models_.Table).validate_python([table.to_dict() for table in tables])
+    benchmark(build)
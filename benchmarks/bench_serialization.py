@@ -0,0 +1,54 @@
+import pickle
+
+import pytest
+
+from dbt_sdf.model_parser.parser import Parser, tokenize
+from dbt_sdf.model_parser.serialization import dumps_tokens, dumps_trees, loads_tokens, loads_trees
+
+
+def _pickle(value):
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+FORMATS = {
+    "pickle": (_pickle, pickle.loads, _pickle, pickle.loads),
+    "binary": (dumps_tokens, loads_tokens, dumps_trees, loads_trees),
+}
+
+
+@pytest.fixture(scope="module")
+def tokens(large_template):
+    return tokenize(large_template)
+
+
+@pytest.fixture(scope="module")
+def trees(tokens):
+    return Parser(tokens).parse()
+
+
+@pytest.mark.benchmark(group="dump-tokens")
+@pytest.mark.parametrize("format", FORMATS)
+def test_dump_tokens(benchmark, tokens, format):
+    dumps = FORMATS[format][0]
+    benchmark.extra_info["bytes"] = len(benchmark(dumps, tokens))
+
+
+@pytest.mark.benchmark(group="load-tokens")
+@pytest.mark.parametrize("format", FORMATS)
+def test_load_tokens(benchmark, tokens, format):
+    dumps, loads = FORMATS[format][:2]
+    benchmark(loads, dumps(tokens))
+
+
+@pytest.mark.benchmark(group="dump-trees")
+@pytest.mark.parametrize("format", FORMATS)
+def test_dump_trees(benchmark, trees, format):
+    dumps = FORMATS[format][2]
+    benchmark.extra_info["bytes"] = len(benchmark(dumps, trees))
+
+
+@pytest.mark.benchmark(group="load-trees")
+@pytest.mark.parametrize("format", FORMATS)
+def test_load_trees(benchmark, trees, format):
+    dumps, loads = FORMATS[format][2:]
+    benchmark(loads, dumps(trees))
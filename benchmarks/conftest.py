@@ -0,0 +1,30 @@
+import pytest
+
+from benchmarks.synthetic import ProjectSpec, model_sources, write_project
+
+
+@pytest.fixture(scope="session")
+def spec():
+    return ProjectSpec(models=200, depth=6, fan_out=3, jinja_density=0.3, macros=10, lines_per_model=40)
+
+
+@pytest.fixture(scope="session")
+def sources(spec):
+    return model_sources(spec)
+
+
+@pytest.fixture(scope="session")
+def large_template():
+    """A single model roughly a hundred times the size of a typical one."""
+    return model_sources(ProjectSpec(models=1, lines_per_model=4000, jinja_density=0.5))[0].raw_code
+
+
+@pytest.fixture(scope="session")
+def project_dir(spec, tmp_path_factory):
+    return write_project(spec, str(tmp_path_factory.mktemp("synthetic_project")))
+
+
+def pytest_report_header(config):
+    from dbt_sdf.model_parser import is_compiled, parser
+
+    return f"dbt_sdf model parser: {'compiled' if is_compiled(parser) else 'pure Python'}"
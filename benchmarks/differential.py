@@ -0,0 +1,282 @@
+"""Differential testing of the model parser against jinja2's own parser.
+
+Random templates are generated from the subset of Jinja the model parser
+supports. Both parsers reduce a template to the same summary: the call sites
+it contains, the dbt calls extract_dbt_calls() reports, and the statements in
+document order, each with its line number. Both sides are timed.
+
+Run as a script to fuzz a batch of templates and report the speedup::
+
+    python -m benchmarks.differential --templates 1000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from jinja2 import Environment, nodes
+
+from dbt_sdf.model_parser.parser import (
+    AttributeAccess,
+    ConditionBlock,
+    ForStatement,
+    FunctionCall,
+    IfStatement,
+    MacroDefinition,
+    Parser,
+    SetStatement,
+    Variable,
+    collect_dbt_calls,
+    iter_nodes,
+    tokenize,
+)
+
+DBT_CALLS = ('config', 'source', 'ref')
+
+_NAMES = ['a', 'b', 'col', 'item', 'model', 'target', 'x_1', 'user']
+_FUNCTIONS = ['ref', 'source', 'config', 'var', 'env_var', 'my_macro', 'adapter.dispatch', 'dbt_utils.star']
+_WORDS = ['select', 'from', 'where', '1', 'id', ',', '*', '(', ')', 'as', 'and', '=', "'x'", 'join']
+_BINARY_OPS = ['+', '-', '*', '/', '%', '==', '!=', '<', '>', '<=', '>=', 'and', 'or']
+
+
+class TemplateGenerator:
+    """Generates random templates that both parsers must agree on."""
+
+    def __init__(self, rng: random.Random, max_depth: int = 3):
+        self.rng = rng
+        self.max_depth = max_depth
+
+    def _space(self):
+        return self.rng.choice([' ', ' ', '  ', '\n', ' \n  '])
+
+    def text(self):
+        words = [self.rng.choice(_WORDS) for _ in range(self.rng.randint(1, 6))]
+        return ''.join(self.rng.choice([' ', ' ', '\n']) + word for word in words) + self.rng.choice([' ', '\n'])
+
+    def expression(self, depth=0):
+        choices = ['number', 'string', 'name', 'call']
+        if depth < self.max_depth:
+            choices += ['attribute', 'index', 'list', 'dict', 'binary', 'not', 'group', 'call', 'call']
+        kind = self.rng.choice(choices)
+        if kind == 'number':
+            return self.rng.choice([str(self.rng.randrange(1000)), f"{self.rng.randrange(100)}.{self.rng.randrange(10)}"])
+        if kind == 'string':
+            return self.rng.choice(["'{}'", '"{}"']).format(self.rng.choice(_NAMES + ['view', 'my table']))
+        if kind == 'name':
+            return self.rng.choice(_NAMES)
+        if kind == 'attribute':
+            return f"{self.rng.choice(_NAMES)}.{self.rng.choice(_NAMES)}"
+        if kind == 'index':
+            return f"{self.rng.choice(_NAMES)}[{self.expression(depth + 1)}]"
+        if kind == 'list':
+            return '[' + ', '.join(self.expression(depth + 1) for _ in range(self.rng.randint(0, 3))) + ']'
+        if kind == 'dict':
+            pairs = (f"'{self.rng.choice(_NAMES)}': {self.expression(depth + 1)}" for _ in range(self.rng.randint(0, 3)))
+            return '{' + ', '.join(pairs) + '}'
+        if kind == 'binary':
+            op = self.rng.choice(_BINARY_OPS)
+            return f"{self.expression(depth + 1)} {op} {self.expression(depth + 1)}"
+        if kind == 'not':
+            return f"(not {self.expression(depth + 1)})"
+        if kind == 'group':
+            return f"({self.expression(depth + 1)})"
+        return self.call(depth)
+
+    def call(self, depth=0):
+        args = [self.expression(depth + 1) for _ in range(self.rng.randint(0, 2))]
+        keywords = self.rng.sample(_NAMES, self.rng.randint(0, 2))
+        args += [f"{keyword}={self.expression(depth + 1)}" for keyword in keywords]
+        return f"{self.rng.choice(_FUNCTIONS)}({','.join(self._space() + arg for arg in args)})"
+
+    def _open(self, delimiter):
+        # Statement keywords stay on the line of their delimiter: jinja2 reports
+        # the keyword's line, the model parser the delimiter's.
+        return delimiter + self.rng.choice(['', '-']) + self.rng.choice([' ', '  '])
+
+    def _close(self, delimiter):
+        return self._space() + self.rng.choice(['', '-']) + delimiter
+
+    def statement(self, name, rest=''):
+        return f"{self._open('{%')}{name}{rest}{self._close('%}')}"
+
+    def element(self, depth=0):
+        kinds = ['text', 'text', 'output', 'output', 'comment', 'set']
+        if depth < self.max_depth:
+            kinds += ['if', 'for', 'macro']
+        kind = self.rng.choice(kinds)
+        if kind == 'text':
+            return self.text()
+        if kind == 'output':
+            return f"{self._open('{{')}{self.expression()}{self._close('}}')}"
+        if kind == 'comment':
+            return f"{{# {self.rng.choice(_NAMES)} {self.rng.choice(_WORDS)} #}}"
+        if kind == 'set':
+            return self.statement('set', f" {self.rng.choice(_NAMES)} = {self.expression()}")
+        if kind == 'if':
+            parts = [self.statement('if', f" {self.expression()}"), self.body(depth + 1)]
+            for _ in range(self.rng.randint(0, 2)):
+                parts += [self.statement('elif', f" {self.expression()}"), self.body(depth + 1)]
+            if self.rng.random() < 0.5:
+                parts += [self.statement('else'), self.body(depth + 1)]
+            parts.append(self.statement('endif'))
+            return ''.join(parts)
+        if kind == 'for':
+            return ''.join([self.statement('for', f" {self.rng.choice(_NAMES)} in {self.expression()}"),
+                            self.body(depth + 1), self.statement('endfor')])
+        parameters = ', '.join(self.rng.sample(_NAMES, self.rng.randint(0, 3)))
+        return ''.join([self.statement('macro', f" m_{self.rng.randrange(100)}({parameters})"),
+                        self.body(depth + 1), self.statement('endmacro')])
+
+    def body(self, depth=0):
+        return ''.join(self.element(depth) for _ in range(self.rng.randint(0, 4)))
+
+    def template(self):
+        return ''.join(self.element() for _ in range(self.rng.randint(1, 8)))
+
+
+@dataclass
+class Summary:
+    """What a parser saw in a template, each item paired with its line number."""
+    calls: List[Tuple[str, int]] = field(default_factory=list)
+    dbt_calls: List[Tuple[str, int]] = field(default_factory=list)
+    statements: List[Tuple[str, int]] = field(default_factory=list)
+
+    def __eq__(self, other):
+        return (Counter(self.calls) == Counter(other.calls)
+                and Counter(self.dbt_calls) == Counter(other.dbt_calls)
+                and self.statements == other.statements)
+
+
+def _our_callee(node):
+    if isinstance(node, Variable):
+        return node.token.value
+    if isinstance(node, AttributeAccess):
+        return f"{_our_callee(node.children[0])}.{node.children[1].value}"
+    return '<expr>'
+
+
+def _our_call_line(node):
+    while not isinstance(node, Variable):
+        node = node.children[0]
+    return node.token.line
+
+
+def _our_call_site(call):
+    return _our_callee(call.children[0]), _our_call_line(call.children[0])
+
+
+def summarize(code: str) -> Summary:
+    """Summarize a template with the model parser."""
+    trees = Parser(tokenize(code)).parse()
+    summary = Summary()
+    elif_blocks = set()
+    for node in iter_nodes(trees):
+        if isinstance(node, FunctionCall):
+            summary.calls.append(_our_call_site(node))
+        elif isinstance(node, IfStatement):
+            elif_blocks.update(id(clause) for clause in node.clauses[1:])
+        elif isinstance(node, ConditionBlock) and node.condition is not None:
+            kind = 'elif' if id(node) in elif_blocks else 'if'
+            summary.statements.append((kind, node.open_token.line))
+        elif isinstance(node, ForStatement):
+            summary.statements.append(('for', node.token.line))
+        elif isinstance(node, SetStatement):
+            summary.statements.append(('set', node.token.line))
+        elif isinstance(node, MacroDefinition):
+            summary.statements.append(('macro', node.token.line))
+    for calls in collect_dbt_calls(trees):
+        summary.dbt_calls.extend(_our_call_site(call) for call in calls)
+    return summary
+
+
+def _jinja_callee(node):
+    if isinstance(node, nodes.Name):
+        return node.name
+    if isinstance(node, nodes.Getattr):
+        return f"{_jinja_callee(node.node)}.{node.attr}"
+    return '<expr>'
+
+
+def summarize_with_jinja(code: str, environment: Optional[Environment] = None) -> Summary:
+    """Summarize a template with jinja2's parser."""
+    template = (environment or Environment()).parse(code)
+    summary = Summary()
+    stack = [(template, False)]
+    while stack:
+        node, is_elif = stack.pop()
+        if isinstance(node, nodes.Call):
+            site = (_jinja_callee(node.node), node.lineno)
+            summary.calls.append(site)
+            if site[0] in DBT_CALLS:
+                summary.dbt_calls.append(site)
+        elif isinstance(node, nodes.If):
+            summary.statements.append(('elif' if is_elif else 'if', node.lineno))
+        elif isinstance(node, nodes.For):
+            summary.statements.append(('for', node.lineno))
+        elif isinstance(node, nodes.Assign):
+            summary.statements.append(('set', node.lineno))
+        elif isinstance(node, nodes.Macro):
+            summary.statements.append(('macro', node.lineno))
+        children = list(node.iter_child_nodes())
+        elifs = set(map(id, node.elif_)) if isinstance(node, nodes.If) else set()
+        stack.extend((child, id(child) in elifs) for child in reversed(children))
+    return summary
+
+
+@dataclass
+class Comparison:
+    code: str
+    ours: Optional[Summary]
+    theirs: Summary
+    our_seconds: float
+    jinja_seconds: float
+    error: Optional[str] = None
+
+    @property
+    def matches(self):
+        return self.error is None and self.ours == self.theirs
+
+
+def compare(code: str, environment: Optional[Environment] = None) -> Comparison:
+    """Summarize code with both parsers, timing each."""
+    environment = environment or Environment()
+    ours, error = None, None
+    start = time.perf_counter()
+    try:
+        ours = summarize(code)
+    except SyntaxError as e:
+        error = str(e)
+    middle = time.perf_counter()
+    theirs = summarize_with_jinja(code, environment)
+    end = time.perf_counter()
+    return Comparison(code, ours, theirs, middle - start, end - middle, error)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--templates", type=int, default=500)
+    parser.add_argument("--max-depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    generator = TemplateGenerator(random.Random(args.seed), args.max_depth)
+    environment = Environment()
+    ours = theirs = 0.0
+    mismatches = 0
+    for _ in range(args.templates):
+        comparison = compare(generator.template(), environment)
+        ours += comparison.our_seconds
+        theirs += comparison.jinja_seconds
+        if not comparison.matches:
+            mismatches += 1
+            print(f"Mismatch:\n{comparison.code}\n  ours:   {comparison.error or comparison.ours}\n"
+                  f"  jinja2: {comparison.theirs}\n")
+    print(f"{args.templates} templates, {mismatches} mismatches")
+    print(f"model parser {ours:.3f}s, jinja2 {theirs:.3f}s, speedup {theirs / ours if ours else float('inf'):.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
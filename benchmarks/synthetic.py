@@ -0,0 +1,170 @@
+"""Generate synthetic dbt projects for benchmarking the migration.
+
+Run as a script to write a project to disk::
+
+    python -m benchmarks.synthetic /tmp/synthetic --models 5000 --depth 12 --fan-out 4
+"""
+import argparse
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict, List
+
+from dbt_sdf.migration.pipeline import ModelSource
+
+
+@dataclass
+class ProjectSpec:
+    """Shape of a synthetic dbt project."""
+    name: str = "synthetic"
+    models: int = 100
+    # Number of DAG layers; models only ref models in earlier layers
+    depth: int = 5
+    # Maximum number of upstream refs per model
+    fan_out: int = 3
+    # Probability that a body line is Jinja rather than plain SQL
+    jinja_density: float = 0.3
+    macros: int = 5
+    # Probability that a plain SQL column line calls one of the macros
+    macro_usage: float = 0.2
+    # Number of column lines in each model body, controls file size
+    lines_per_model: int = 40
+    sources: int = 3
+    seed: int = 0
+
+
+def _macro_name(i):
+    return f"transform_{i}"
+
+
+def generate_macros(spec: ProjectSpec) -> Dict[str, str]:
+    """Return macro files keyed by their path relative to the project root."""
+    files = {}
+    for i in range(spec.macros):
+        files[f"macros/{_macro_name(i)}.sql"] = (
+            f"{{% macro {_macro_name(i)}(col) %}}({{{{ col }}}} * {i + 1}){{% endmacro %}}\n"
+        )
+    return files
+
+
+def _column_line(rng, spec, i):
+    if spec.macros and rng.random() < spec.macro_usage:
+        return f"    {{{{ {_macro_name(rng.randrange(spec.macros))}('col_{i}') }}}} as col_{i},"
+    return f"    col_{i} + {rng.randrange(1000)} as col_{i},"
+
+
+def _jinja_line(rng, i):
+    choice = rng.randrange(4)
+    if choice == 0:
+        return (f"    {{% if target.name == 'prod' %}}col_{i}{{% else %}}"
+                f"col_{i} * 2{{% endif %}} as col_{i},")
+    if choice == 1:
+        return (f"    {{% for suffix in ['a', 'b', 'c'] %}}col_{i}_{{{{ suffix }}}} + {{% endfor %}}"
+                f"0 as col_{i},")
+    if choice == 2:
+        return f"    {{% set offset_{i} = {rng.randrange(100)} %}}col_{i} + {{{{ offset_{i} }}}} as col_{i},"
+    return f"    {{{{ var('scale_{i % 5}', 1) }}}} * col_{i} as col_{i},"
+
+
+def generate_models(spec: ProjectSpec) -> Dict[str, str]:
+    """Return model files keyed by their path relative to the project root."""
+    rng = random.Random(spec.seed)
+    layers: List[List[str]] = [[] for _ in range(max(spec.depth, 1))]
+    files = {}
+    for i in range(spec.models):
+        layer = i * len(layers) // max(spec.models, 1)
+        name = f"model_{i:05d}"
+        upstream = [model for earlier in layers[:layer] for model in earlier]
+
+        lines = [f"{{{{ config(materialized='{rng.choice(['view', 'table', 'incremental'])}', "
+                 f"tags=['layer_{layer}']) }}}}",
+                 "with"]
+        if upstream:
+            refs = rng.sample(upstream, min(len(upstream), rng.randint(1, max(spec.fan_out, 1))))
+            inputs = [f"{{{{ ref('{ref}') }}}}" for ref in refs]
+        else:
+            inputs = [f"{{{{ source('raw', 'table_{rng.randrange(max(spec.sources, 1))}') }}}}"]
+        for j, relation in enumerate(inputs):
+            lines.append(f"input_{j} as (select * from {relation}),")
+        lines.append("final as (")
+        lines.append("  select")
+        for k in range(spec.lines_per_model):
+            if rng.random() < spec.jinja_density:
+                lines.append(_jinja_line(rng, k))
+            else:
+                lines.append(_column_line(rng, spec, k))
+        lines.append("    1 as _synthetic")
+        lines.append("  from input_0")
+        lines.append(")")
+        lines.append("select * from final")
+
+        files[f"models/layer_{layer}/{name}.sql"] = "\n".join(lines) + "\n"
+        layers[layer].append(name)
+    return files
+
+
+def generate_project(spec: ProjectSpec) -> Dict[str, str]:
+    """Return every file of the project keyed by its path relative to the project root."""
+    files = {
+        "dbt_project.yml": (
+            f"name: {spec.name}\n"
+            "version: '1.0'\n"
+            f"profile: {spec.name}\n"
+            "config-version: 2\n"
+            "models:\n"
+            f"  {spec.name}:\n"
+            "    +materialized: view\n"
+        ),
+        "models/sources.yml": (
+            "version: 2\n"
+            "sources:\n"
+            "  - name: raw\n"
+            "    tables:\n"
+            + "".join(f"      - name: table_{i}\n" for i in range(max(spec.sources, 1)))
+        ),
+    }
+    files.update(generate_macros(spec))
+    files.update(generate_models(spec))
+    return files
+
+
+def write_project(spec: ProjectSpec, root: str) -> str:
+    """Write the project below root and return root."""
+    for path, content in generate_project(spec).items():
+        full_path = os.path.join(root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+    return root
+
+
+def model_sources(spec: ProjectSpec) -> List[ModelSource]:
+    """Return the generated models as pipeline inputs without touching the disk."""
+    return [
+        ModelSource(
+            unique_id=f"model.{spec.name}.{os.path.basename(path)[:-4]}",
+            name=os.path.basename(path)[:-4],
+            package_name=spec.name,
+            path=path,
+            raw_code=content,
+            database="synthetic",
+            schema="analytics",
+        )
+        for path, content in generate_models(spec).items()
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="Directory to write the project to")
+    defaults = ProjectSpec()
+    for name, value in vars(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args(argv)
+    spec = ProjectSpec(**{name: getattr(args, name) for name in vars(defaults)})
+    write_project(spec, args.root)
+    print(f"Wrote {spec.models} models to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,151 @@
-
-import functools
-import yaml
-from copy import copy
-from dataclasses import dataclass
-from typing import Callable, List, Optional, Union
-from dbt.contracts.graph.manifest import Manifest
+import sys
+from importlib import import_module
 
 import click
-import dbt.cli.params as p
-import dbt_sdf.cli.params as sdf_p
-from dbt_sdf.schema.generated.models import (
-    Workspace,
-    Definition
-)
-from dbt.cli import requires
-from dbt.cli.main import global_flags
+
+# Set in a context's meta when the group's lazy_params apply to it
+LAZY_PARAMS_KEY = "dbt_sdf.lazy_params"
+
+
+class LazyGroup(click.Group):
+    """A click group that imports its subcommands only when they are used.
+
+    Commands that need dbt are registered in lazy_subcommands as
+    {name: ("module:attribute", short_help)} so that `dbt-sdf --help` and the
+    dbt-free commands do not pay for importing dbt. The group options those
+    commands accept before their name, e.g. dbt's global flags, are given
+    as lazy_params, a list of "module:attribute" option decorators, and
+    added only when a lazy subcommand is on the command line.
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, lazy_params=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+        self.lazy_params = lazy_params or []
+        self._loaded_params = None
+
+    def parse_args(self, ctx, args):
+        if self.lazy_params and any(arg in self.lazy_subcommands for arg in args):
+            ctx.meta[LAZY_PARAMS_KEY] = True
+        return super().parse_args(ctx, args)
+
+    def get_params(self, ctx):
+        params = super().get_params(ctx)
+        if not ctx.meta.get(LAZY_PARAMS_KEY):
+            return params
+        if self._loaded_params is None:
+            self._loaded_params = self._load_params()
+        # Options the group has itself, e.g. --version, keep their own definition
+        known = {opt for param in params for opt in param.opts}
+        return [param for param in self._loaded_params if not known & set(param.opts)] + params
+
+    def _load_params(self):
+        def callback():
+            pass
+        for path in reversed(self.lazy_params):
+            module_name, attribute = path.split(":")
+            callback = getattr(import_module(module_name), attribute)(callback)
+        return click.command()(callback).params
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            module_name, attribute = self.lazy_subcommands[cmd_name][0].split(":")
+            return getattr(import_module(module_name), attribute)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        """Like click.Group.format_commands, but reads lazy help text without importing."""
+        names = self.list_commands(ctx)
+        if not names:
+            return
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = []
+        for name in names:
+            if name in self.lazy_subcommands:
+                rows.append((name, self.lazy_subcommands[name][1]))
+                continue
+            cmd = super().get_command(ctx, name)
+            if cmd is not None and not cmd.hidden:
+                rows.append((name, cmd.get_short_help_str(limit)))
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+
+def _print_version(ctx, param, value):
+    # Like dbt's --version, without importing dbt unless asked
+    if not value or ctx.resilient_parsing:
+        return
+    from dbt.version import get_version_information
+
+    click.echo(get_version_information())
+    ctx.exit()
 
 
 # dbt-sdf
 @click.group(
+    cls=LazyGroup,
+    lazy_subcommands={
+        "migrate": ("dbt_sdf.cli.migrate:migrate", "Migrates a dbt project to an SDF Workspace."),
+    },
+    lazy_params=[
+        "dbt.cli.main:global_flags",
+        "dbt.cli.params:warn_error",
+        "dbt.cli.params:warn_error_options",
+        "dbt.cli.params:log_format",
+        "dbt.cli.params:show_resource_report",
+    ],
     context_settings={"help_option_names": ["-h", "--help"]},
     invoke_without_command=True,
     no_args_is_help=True,
     epilog="Run `dbt-sdf [command] --help` for more information on a specific command.",
 )
+@click.option("--version", "-V", "-v", is_flag=True, is_eager=True, expose_value=False, callback=_print_version,
+              help="Show version information and exit")
 @click.pass_context
-@global_flags
-@p.warn_error
-@p.warn_error_options
-@p.log_format
-@p.show_resource_report
 def cli(ctx, **kwargs):
     """A migration tool for dbt models."""
 
-# dbt-sdf migrate
-@cli.command("migrate")
-@click.pass_context
-@global_flags
-@p.profile
-@p.profiles_dir
-@p.project_dir
-@p.target
-@p.target_path
-@p.threads
-@p.vars
-@sdf_p.workspace_dir
-@requires.postflight
-@requires.preflight
-@requires.profile
-@requires.project
-@requires.runtime_config
-@requires.manifest()
-def migrate(ctx, **kwargs):
-    """Migrates a dbt project to an SDF Workspace."""
-    # manifest generation and writing happens in @requires.manifest
-    print(ctx)
-    manifest: Manifest = ctx.obj["manifest"]
-    # Iterate over the nodes in the manifest, reading the SQL, replacing sources, refs, config blocks, and writing to a new file
-    
-    # Get all the conventions from the current initializer, including for credentials
-    workspace = Workspace(
-        edition="1.3",
-        name="demo_name"
-    )
-    definition = Definition(
-        workspace=workspace
-    )
-    
-    # Write the workspace to the workspace directory
-    with open("workspace.sdf.yml", "w") as yaml_file:
-        yaml.dump(definition.model_dump(exclude_defaults=True), yaml_file, default_flow_style=False)
-
-    return None, True
\ No newline at end of file
+
+# dbt-sdf parse
+@cli.command("parse")
+@click.argument("template", type=click.File("r"))
+@click.option("--calls", is_flag=True, help="Only print the config, source and ref calls.")
+@click.option("--format", "output_format", type=click.Choice(["text", "json"]), default="text",
+              help="Print each tree as text, or as a line of JSON.")
+@click.option("--max-depth", type=click.IntRange(min=1), default=None,
+              help="Only print this many levels of nodes.")
+def parse(template, calls, output_format, max_depth):
+    """Parses a single model or macro file and prints its syntax tree. Does not need a dbt project."""
+    from dbt_sdf.model_parser.dump import dump, dump_json
+    from dbt_sdf.model_parser.parser import Parser, collect_dbt_calls, tokenize
+
+    trees = Parser(tokenize(template.read())).parse()
+    if calls:
+        for name, found in zip(("config", "source", "ref"), collect_dbt_calls(trees)):
+            for call in found:
+                click.echo(f"{name}: {call!r}")
+        return
+    # Trees are written as they are walked, so big models print without building their text first
+    write_tree = dump_json if output_format == "json" else dump
+    for tree in trees:
+        write_tree(tree, sys.stdout, max_depth=max_depth)
+
+
+# dbt-sdf inspect
+@cli.command("inspect")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--jobs", "-j", type=click.IntRange(min=1), default=None,
+              help="Number of worker processes. Defaults to the number of CPUs.")
+@click.option("--output", "-o", type=click.File("w"), default="-",
+              help="Where to write the JSON Lines inventory. Defaults to stdout.")
+def inspect(paths, jobs, output):
+    """Lists the config, source and ref calls of .sql files as JSON Lines. Does not need a dbt project."""
+    import json
+
+    from dbt_sdf.model_parser.inventory import inspect_paths
+
+    for result in inspect_paths(paths, max_workers=jobs):
+        output.write(json.dumps(result) + "\n")
@@ -0,0 +1,123 @@
+import os
+
+import click
+from dbt.contracts.graph.manifest import Manifest
+import dbt.cli.params as p
+import dbt_sdf.cli.params as sdf_p
+import dbt_sdf.cli.requires as sdf_requires
+from dbt_sdf.migration.pipeline import (
+    build_definitions,
+    model_sources,
+    run_pipeline,
+)
+from dbt_sdf.migration.config import ConfigResolver, ConfigTrie, project_evaluator, properties_configs
+from dbt_sdf.migration.fallback import RENDER_CACHE_FILE, FallbackRenderer, RenderCache, dbt_renderer
+from dbt_sdf.migration.output import write_workspace
+from dbt_sdf.model_parser.inliner import Inliner
+from dbt_sdf.model_parser.macro_cache import MacroCache
+from dbt_sdf.model_parser.macros import MacroIndex
+from dbt_sdf.migration.resolution import ResolutionIndex, dialect_for_adapter
+from dbt_sdf.profiling.timing import format_slowest_models
+from dbt.cli import requires
+from dbt.cli.main import global_flags
+
+
+def _macro_index(runtime_config):
+    """Index the macros of the project and every package it loads, through the user-level macro cache."""
+    macros = MacroIndex(root_project=runtime_config.project_name)
+    cache = MacroCache()
+    for package_name, project in runtime_config.load_dependencies().items():
+        cache.add_package(macros, package_name, project.project_root, project.macro_paths, version=project.version)
+    return macros
+
+
+def _properties_configs(runtime_config):
+    """Read the properties-file configs of the project and every package it loads, reporting unreadable files."""
+    configs, errors = {}, {}
+    for package_name, project in runtime_config.load_dependencies().items():
+        paths = (os.path.join(project.project_root, path) for path in project.model_paths)
+        configs.update(properties_configs(paths, package_name, errors))
+    for path, error in errors.items():
+        click.echo(f"{path}: skipped, {error}")
+    return configs
+
+
+# dbt-sdf migrate
+@click.command("migrate")
+@click.pass_context
+@global_flags
+@p.show_resource_report
+@p.profile
+@p.profiles_dir
+@p.project_dir
+@p.target
+@p.target_path
+@p.threads
+@p.vars
+@sdf_p.workspace_dir
+@sdf_p.memory_profile
+@sdf_p.slowest_models
+@sdf_p.model_budget
+@sdf_p.output_format
+@sdf_p.render_timeout
+@sdf_requires.memory_profile
+@requires.postflight
+@requires.preflight
+@requires.profile
+@requires.project
+@requires.runtime_config
+@requires.manifest()
+def migrate(ctx, **kwargs):
+    """Migrates a dbt project to an SDF Workspace."""
+    # manifest generation and writing happens in @requires.manifest
+    manifest: Manifest = ctx.obj["manifest"]
+    profiler = ctx.obj["memory_profiler"]
+    if profiler is not None:
+        profiler.snapshot("manifest", nodes=len(manifest.nodes))
+
+    # Iterate over the nodes in the manifest, reading the SQL, replacing sources, refs, config blocks, and writing to a new file
+    runtime_config = ctx.obj["runtime_config"]
+    index = ResolutionIndex.from_manifest(
+        manifest, runtime_config.project_name, dialect_for_adapter(runtime_config.credentials.type))
+    configs = ConfigResolver(
+        ConfigTrie.from_project(runtime_config.models),
+        _properties_configs(runtime_config),
+        project_evaluator(runtime_config),
+    )
+    inliner = Inliner(_macro_index(runtime_config), configs.evaluator)
+    models = run_pipeline(model_sources(manifest), profiler=profiler, budget=kwargs["model_budget"],
+                          index=index, configs=configs, inliner=inliner)
+    if kwargs["slowest_models"]:
+        click.echo(format_slowest_models([model.timing for model in models], kwargs["slowest_models"]))
+    renderer = FallbackRenderer(
+        dbt_renderer(manifest, runtime_config),
+        cache=RenderCache(os.path.join(runtime_config.project_target_path, RENDER_CACHE_FILE)),
+        target_path=runtime_config.project_target_path,
+        project_root=runtime_config.project_root,
+        max_workers=runtime_config.threads,
+        timeout=kwargs["render_timeout"],
+        target_name=runtime_config.target_name,
+        vars=configs.evaluator.vars,
+        render_inputs=(kwargs["target"], runtime_config.cli_vars),
+        macros=inliner.macros,
+    )
+    renderer.render_all(models)
+    renderer.cache.save()
+    if profiler is not None:
+        profiler.snapshot("fallback", models=sum(1 for model in models if not model.is_static))
+    for model in models:
+        if not model.is_static:
+            click.echo(f"{model.source.path}: using fallback, {model.fallback_reason}"
+                       + (f", compiled SQL from {model.compiled_from}" if model.compiled_from else ""))
+
+    # Get all the conventions from the current initializer, including for credentials
+    definitions = build_definitions(runtime_config.project_name, models)
+    if profiler is not None:
+        profiler.snapshot("definitions", models=len(models), definitions=len(definitions))
+
+    # Write the workspace to the workspace directory
+    write_workspace(definitions, kwargs["workspace_dir"], kwargs["output_format"])
+    if profiler is not None:
+        profiler.snapshot("write", models=len(models))
+
+    return None, True
\ No newline at end of file
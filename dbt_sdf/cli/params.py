@@ -8,4 +8,43 @@ workspace_dir = click.option(
     help="Which directory to output migration artifacts in. If not set, dbt will create a directory called `sdf` in the current working directory.",
     default=Path.cwd(),
     type=click.Path(exists=True),
-)
\ No newline at end of file
+)
+memory_profile = click.option(
+    "--memory-profile",
+    envvar="DBT_SDF_MEMORY_PROFILE",
+    help="Write a JSON report of the memory retained by each migration phase to this file. Tracing allocations slows the migration down considerably.",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+)
+
+slowest_models = click.option(
+    "--slowest-models",
+    envvar="DBT_SDF_SLOWEST_MODELS",
+    help="Report this many models that took longest to tokenize, parse and extract. Set to 0 to disable the report.",
+    default=10,
+    type=click.IntRange(min=0),
+)
+
+model_budget = click.option(
+    "--model-budget",
+    envvar="DBT_SDF_MODEL_BUDGET",
+    help="Seconds a single model may spend being migrated statically before it is diverted to the fallback path.",
+    default=None,
+    type=click.FloatRange(min=0, min_open=True),
+)
+
+output_format = click.option(
+    "--output-format",
+    envvar="DBT_SDF_OUTPUT_FORMAT",
+    help="Write the workspace as multi-document YAML, a JSON array, or newline-delimited JSON with one definition per line.",
+    default="yaml",
+    type=click.Choice(["yaml", "json", "ndjson"]),
+)
+
+render_timeout = click.option(
+    "--render-timeout",
+    envvar="DBT_SDF_RENDER_TIMEOUT",
+    help="Seconds to wait for dbt to render a model that cannot be migrated statically before giving up on it.",
+    default=60.0,
+    type=click.FloatRange(min=0, min_open=True),
+)
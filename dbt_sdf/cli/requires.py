@@ -0,0 +1,34 @@
+from functools import update_wrapper
+
+from click import Context
+
+from dbt_sdf.profiling.memory import MemoryProfiler
+
+
+def memory_profile(func):
+    """Trace allocations for the whole command when --memory-profile is set.
+
+    Must wrap dbt's own `requires` decorators so that loading the project and
+    the manifest is traced as well. The profiler is made available as
+    ctx.obj["memory_profiler"] and the report is written when the command exits.
+    """
+    def wrapper(*args, **kwargs):
+        ctx = args[0]
+        assert isinstance(ctx, Context)
+        ctx.obj = ctx.obj or {}
+
+        path = kwargs.get("memory_profile")
+        if not path:
+            ctx.obj["memory_profiler"] = None
+            return func(*args, **kwargs)
+
+        profiler = MemoryProfiler()
+        ctx.obj["memory_profiler"] = profiler
+        profiler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.stop()
+            profiler.write(path)
+
+    return update_wrapper(wrapper, func)
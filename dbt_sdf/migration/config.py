@@ -0,0 +1,233 @@
+import json
+import os
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML was built without libyaml
+    from yaml import SafeLoader
+
+from dbt_sdf.model_parser.evaluator import Evaluator, is_known
+from dbt_sdf.schema.generated.models import Materialization, Materialization10, Severity
+
+# How dbt merges a config key set at several levels; everything else is overwritten
+APPEND_KEYS = {"tags", "pre_hook", "post_hook", "packages"}
+UPDATE_KEYS = {"meta", "quoting", "column_types", "docs", "contract"}
+DICT_KEY_APPEND_KEYS = {"grants"}
+
+# The fields of dbt's ModelConfig, which are configs in dbt_project.yml with or without a '+'
+MODEL_CONFIG_KEYS = {
+    "access", "alias", "batch_size", "begin", "column_types", "concurrent_batches", "contract", "database",
+    "docs", "enabled", "event_time", "full_refresh", "grants", "group", "incremental_strategy", "lookback",
+    "materialized", "meta", "on_configuration_change", "on_schema_change", "packages", "persist_docs",
+    "post_hook", "pre_hook", "quoting", "schema", "tags", "unique_key",
+}
+
+# dbt materializations with an sdf equivalent; anything else becomes Materialization10(other=...)
+MATERIALIZATIONS = {
+    "table": Materialization.table,
+    "view": Materialization.view,
+    "incremental": Materialization.incremental_table,
+    "materialized_view": Materialization.materialized_view,
+    "snapshot": Materialization.snapshot_table,
+}
+SEVERITIES = {"warn": Severity.warning, "error": Severity.error}
+
+
+class DynamicConfig(Exception):
+    """Raised when a config() call sets a value that is not a literal."""
+
+
+def _config_key(key):
+    return key.lstrip("+").replace("-", "_")
+
+
+def _listify(value):
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def merge_configs(base, override):
+    """Merge override into a copy of base with dbt's MergeBehavior rules.
+
+    Tags and hooks are appended, meta and similar dicts are updated key by key,
+    grants append per key, and every other key is overwritten.
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        key = _config_key(key)
+        if key not in merged:
+            merged[key] = _listify(value) if key in APPEND_KEYS else value
+        elif key in APPEND_KEYS:
+            merged[key] = _listify(merged[key]) + _listify(value)
+        elif key in UPDATE_KEYS and isinstance(value, dict):
+            merged[key] = {**merged[key], **value}
+        elif key in DICT_KEY_APPEND_KEYS and isinstance(value, dict):
+            grants = dict(merged[key])
+            for grant, grantees in value.items():
+                grants[grant] = _listify(grants.get(grant)) + _listify(grantees)
+            merged[key] = grants
+        else:
+            merged[key] = value
+    return merged
+
+
+class ConfigTrie:
+    """The `models:` configs of dbt_project.yml, merged down each fqn prefix in advance.
+
+    Every node of the trie holds the config that applies at its level, already
+    merged with its parents', so resolving a model is a walk down its fqn.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.children = {}
+
+    @classmethod
+    def from_project(cls, models_config):
+        """Build the trie from the `models:` section of dbt_project.yml."""
+        trie = cls()
+        trie._add(models_config or {})
+        return trie
+
+    def _add(self, section):
+        own = {}
+        subdirectories = {}
+        for key, value in section.items():
+            # '+' always marks a config, and so does a known config key; any other dict is a subdirectory
+            if key.startswith("+") or not isinstance(value, dict) or _config_key(key) in MODEL_CONFIG_KEYS:
+                own[key] = value
+            else:
+                subdirectories[key] = value
+        self.config = merge_configs(self.config, own)
+        for key, subsection in subdirectories.items():
+            child = self.children.get(key)
+            if child is None:
+                child = self.children[key] = ConfigTrie(self.config)
+            child._add(subsection)
+
+    def resolve(self, fqn):
+        """Return the project config of a node with the given fqn."""
+        trie = self
+        for segment in fqn:
+            child = trie.children.get(segment)
+            if child is None:
+                break
+            trie = child
+        return trie.config
+
+
+def properties_configs(paths, package_name, errors=None):
+    """Read the `config:` of every model in the properties (.yml) files under paths.
+
+    Files that cannot be read or are not valid YAML are skipped.
+
+    Args:
+        paths: The model paths of a package.
+        package_name: The package the models belong to; models of other
+            packages may have the same names.
+        errors: A dict the skipped files are added to, as {path: error}.
+
+    Returns:
+        A map from (package name, model name) to the model's properties-file config.
+    """
+    configs = {}
+    for path in paths:
+        for directory, _, names in os.walk(path):
+            for name in sorted(names):
+                if not name.endswith((".yml", ".yaml")):
+                    continue
+                file_path = os.path.join(directory, name)
+                try:
+                    with open(file_path, "rb") as f:
+                        properties = yaml.load(f, Loader=SafeLoader)
+                except (OSError, yaml.YAMLError) as e:
+                    if errors is not None:
+                        errors[file_path] = str(e)
+                    continue
+                if not isinstance(properties, dict):
+                    continue
+                for model in properties.get("models") or ():
+                    if isinstance(model, dict) and "name" in model and model.get("config"):
+                        configs[(package_name, model["name"])] = model["config"]
+    return configs
+
+
+def call_config(config_calls):
+    """Merge the keyword arguments of a model's config() calls.
+
+    Args:
+        config_calls: The EvaluatedCalls returned by Evaluator.calls(trees, 'config').
+
+    Raises:
+        DynamicConfig: If one of them cannot be evaluated, e.g. config(materialized=my_macro()),
+            or depends on a condition or loop that cannot be evaluated.
+    """
+    config = {}
+    for call in config_calls:
+        if not call.certain:
+            raise DynamicConfig(f"config() on line {call.node.children[0].token.line} may not render")
+        for key, value in call.kwargs.items():
+            if not is_known(value):
+                raise DynamicConfig(f"config({key}=...) cannot be evaluated statically")
+            config = merge_configs(config, {key: value})
+    return config
+
+
+class ConfigResolver:
+    """Resolves the effective config of a model, in dbt's order of precedence.
+
+    dbt_project.yml configs are overridden by properties-file configs, which are
+    overridden by the model's own config() calls. properties is a map from
+    (package name, model name) to config, as properties_configs() returns.
+    """
+
+    def __init__(self, trie, properties=None, evaluator=None):
+        self.trie = trie
+        self.properties = properties or {}
+        self.evaluator = evaluator or Evaluator()
+
+    def config_calls(self, trees):
+        """Evaluate the config() calls of a parsed model."""
+        return self.evaluator.calls(trees, 'config')
+
+    def resolve(self, fqn, name, config_calls=()):
+        config = self.trie.resolve(fqn)
+        # A node's fqn starts with its package
+        properties = self.properties.get((fqn[0], name)) if fqn else None
+        if properties:
+            config = merge_configs(config, properties)
+        if config_calls:
+            config = merge_configs(config, call_config(config_calls))
+        return config
+
+
+def project_evaluator(runtime_config):
+    """Return an Evaluator with the vars and target a dbt run of the root project would see."""
+    project_vars = runtime_config.vars.to_dict()
+    credentials = runtime_config.credentials
+    return Evaluator(
+        vars={**project_vars, **project_vars.get(runtime_config.project_name, {}), **runtime_config.cli_vars},
+        target={
+            "name": runtime_config.target_name,
+            "type": credentials.type,
+            "database": credentials.database,
+            "schema": credentials.schema,
+        },
+    )
+
+
+def apply_config(table, config):
+    """Set the materialization, severity and meta of a Table mirror from a dbt config."""
+    materialized = config.get("materialized")
+    if materialized is not None:
+        table.materialization = MATERIALIZATIONS.get(materialized) or Materialization10(other=materialized)
+    severity = config.get("severity")
+    if severity is not None:
+        table.severity = SEVERITIES.get(str(severity).lower())
+    meta = config.get("meta")
+    if meta:
+        # sdf table meta only holds strings
+        table.meta = {key: value if isinstance(value, str) else json.dumps(value) for key, value in meta.items()}
@@ -0,0 +1,310 @@
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from dbt_sdf.model_parser.macros import called_names
+
+# Where a model's compiled SQL came from, fastest first
+STATIC = "static"
+CACHE = "cache"
+MANIFEST = "manifest"
+COMPILED_ARTIFACT = "target/compiled"
+COMPILER = "compiler"
+
+RENDER_CACHE_FILE = "dbt_sdf_render_cache.json"
+
+
+def code_checksum(raw_code):
+    """Return the sha256 of a model's raw code, as dbt stores it in node.checksum."""
+    return hashlib.sha256(raw_code.encode("utf-8")).hexdigest()
+
+
+def render_key(unique_id, raw_code, target_name=None, vars=None, macros_digest=None):
+    """Return the render cache key of a model version.
+
+    The same raw code renders differently for another model ({{ this }}),
+    another target, other vars or edited macros, so they are all part of
+    the key; macros_digest is MacroIndex.digest() of the macros the model calls.
+    """
+    digest = hashlib.sha256(unique_id.encode("utf-8"))
+    digest.update(b"\0" + raw_code.encode("utf-8"))
+    digest.update(b"\0" + (target_name or "").encode("utf-8"))
+    digest.update(b"\0" + json.dumps(vars or {}, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\0" + (macros_digest or "").encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Compiled SQL by render key, kept in memory and optionally in a JSON file.
+
+    Args:
+        path: The cache file. It is read on creation and written by save().
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                # A corrupt or unreadable cache is only a slower run
+                self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, compiled_code):
+        self.entries[key] = compiled_code
+        self.dirty = True
+
+    def save(self):
+        """Write the cache file if anything was added, replacing it atomically."""
+        if self.path is None or not self.dirty:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".render-cache-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.dirty = False
+
+
+def compiled_artifact_path(target_path, source):
+    """Return where `dbt compile` writes the compiled SQL of a model."""
+    return os.path.join(target_path, "compiled", source.package_name, source.path)
+
+
+def compiled_with(target_path):
+    """Return the (target, vars) the dbt command that last wrote target_path ran with, or None.
+
+    dbt records its arguments in run_results.json, leaving out the target
+    when the profile's default was used and vars when none were passed.
+    """
+    try:
+        with open(os.path.join(target_path, "run_results.json"), "rb") as f:
+            args = json.load(f)["args"]
+        return args.get("target"), args.get("vars") or {}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _same_render_inputs(found, expected):
+    # Compared as JSON, the way run_results.json stores them
+    return json.dumps(found, sort_keys=True, default=str) == json.dumps(expected, sort_keys=True, default=str)
+
+
+def reuse_compiled(source, target_path=None, project_root=None, render_inputs=None):
+    """Return existing compiled SQL for a model, and where it came from, or (None, None).
+
+    Compiled SQL is only reused if the dbt command that last wrote
+    target_path was run with render_inputs, the (target, vars) of this run as
+    compiled_with() returns them, since other ones render differently. The
+    manifest's compiled_code is then used if the node's checksum matches the
+    model file on disk, and a target/compiled file if it is not older than the
+    model file, since the file itself carries no checksum.
+    """
+    if target_path is None or render_inputs is None:
+        return None, None
+    found = compiled_with(target_path)
+    if found is None or not _same_render_inputs(found, render_inputs):
+        return None, None
+    model_file = os.path.join(project_root or ".", source.path)
+    try:
+        if source.compiled_code is not None:
+            with open(model_file, "r", encoding="utf-8", newline="") as f:
+                if source.checksum == code_checksum(f.read()):
+                    return source.compiled_code, MANIFEST
+        artifact = compiled_artifact_path(target_path, source)
+        if os.path.getmtime(artifact) < os.path.getmtime(model_file):
+            return None, None
+        with open(artifact, "r", encoding="utf-8") as f:
+            return f.read(), COMPILED_ARTIFACT
+    except (OSError, UnicodeDecodeError):
+        return None, None
+
+
+class FallbackRenderer:
+    """Gets the compiled SQL of models that cannot be migrated statically.
+
+    Existing compiled SQL is reused where it is known to match the model:
+    the render cache, the manifest's compiled_code, then target/compiled. Only
+    the remaining models are rendered, by a bounded number of daemon threads.
+    A render that runs past the timeout is abandoned: its thread is left to
+    finish on its own, without holding up the run or the interpreter's exit,
+    and another thread takes its place, up to max_abandoned times. Past
+    that, the models still waiting are not rendered.
+
+    Args:
+        render: A function from a ModelSource to its compiled SQL, e.g. dbt_renderer().
+        cache: A RenderCache, keyed by render_key().
+        target_path: The dbt target directory holding compiled/ artifacts.
+        project_root: The dbt project directory the model paths are relative to.
+        max_workers: The number of models rendered at once.
+        timeout: Seconds a model's render may take, from when it starts.
+        target_name: The dbt target, part of the cache key.
+        vars: The vars the project is rendered with, part of the cache key.
+        render_inputs: The (target, vars) this run was given, as compiled_with()
+            returns them; compiled SQL in target_path is only reused if it
+            was compiled with the same ones.
+        macros: The MacroIndex of the project; the macros each model calls
+            are part of its cache key.
+        max_abandoned: How many timed-out renders get a new thread in their place, by default max_workers.
+    """
+
+    def __init__(self, render, cache=None, target_path=None, project_root=None, max_workers=4, timeout=None,
+                 target_name=None, vars=None, render_inputs=None, macros=None, max_abandoned=None):
+        self.render = render
+        self.cache = cache if cache is not None else RenderCache()
+        self.target_path = target_path
+        self.project_root = project_root
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.target_name = target_name
+        self.vars = vars
+        self.render_inputs = render_inputs
+        self.macros = macros
+        self.max_abandoned = max_workers if max_abandoned is None else max_abandoned
+
+    def render_all(self, models):
+        """Set compiled_code and compiled_from on every model that fell back.
+
+        Models that could not be rendered in time, or whose render failed, keep
+        compiled_code None and get the reason appended to their fallback_reason.
+        """
+        pending = []
+        for model in models:
+            if model.is_static:
+                continue
+            key = render_key(model.source.unique_id, model.source.raw_code, self.target_name, self.vars,
+                             self._macros_digest(model))
+            compiled_code = self.cache.get(key)
+            if compiled_code is not None:
+                model.compiled_code, model.compiled_from = compiled_code, CACHE
+                continue
+            compiled_code, compiled_from = reuse_compiled(
+                model.source, self.target_path, self.project_root, self.render_inputs)
+            if compiled_code is not None:
+                model.compiled_code, model.compiled_from = compiled_code, compiled_from
+                self.cache.put(key, compiled_code)
+                continue
+            pending.append((model, key))
+        if pending:
+            self._render_pending(pending)
+        return models
+
+    def _macros_digest(self, model):
+        if self.macros is None:
+            return None
+        if not model.trees:
+            # A model that did not parse may call any macro
+            return self.macros.digest(self.macros.macros)
+        return self.macros.digest(self.macros.dependencies(called_names(model.trees), model.source.package_name))
+
+    def _render_pending(self, pending):
+        tasks = queue.Queue()
+        for task in pending:
+            tasks.put(task)
+        results = queue.Queue()
+        # The task each worker is rendering and when it started. Whichever of
+        # the worker and this thread takes a task out first decides whether
+        # it finished or timed out.
+        running = {}
+        lock = threading.Lock()
+
+        def work():
+            worker = threading.current_thread()
+            while True:
+                with lock:
+                    try:
+                        model, key = tasks.get_nowait()
+                    except queue.Empty:
+                        return
+                    start = time.perf_counter()
+                    running[worker] = (model, start)
+                try:
+                    outcome = self.render(model.source), None
+                except Exception as e:
+                    outcome = None, e
+                with lock:
+                    if running.pop(worker, None) is None:
+                        # Abandoned after timing out; a new worker took this one's place
+                        return
+                results.put((model, key, time.perf_counter() - start) + outcome)
+
+        def start_worker():
+            threading.Thread(target=work, name="dbt-sdf-render", daemon=True).start()
+
+        for _ in range(min(self.max_workers, len(pending))):
+            start_worker()
+        remaining = len(pending)
+        abandoned = 0
+        while remaining:
+            wait = None
+            if self.timeout is not None:
+                with lock:
+                    starts = [start for _, start in running.values()]
+                # Until the oldest render times out, or a worker takes its first task
+                wait = max(min(starts) + self.timeout - time.perf_counter(), 0) if starts else 0.01
+            try:
+                result = results.get(timeout=wait)
+            except queue.Empty:
+                result = None
+            if result is not None:
+                remaining -= 1
+                self._finish(*result)
+            if self.timeout is None:
+                continue
+            for model in self._abandon_timed_out(running, lock):
+                remaining -= 1
+                abandoned += 1
+                model.fallback_reason += f"; render timed out after {self.timeout}s"
+                if abandoned <= self.max_abandoned:
+                    start_worker()
+            if abandoned > self.max_abandoned:
+                # Too many threads are hung already: skip the models no worker took yet
+                with lock:
+                    while not tasks.empty():
+                        model, _ = tasks.get_nowait()
+                        model.fallback_reason += f"; render skipped after {abandoned} renders timed out"
+                        remaining -= 1
+
+    def _finish(self, model, key, seconds, compiled_code, error):
+        if error is not None:
+            model.fallback_reason += f"; render failed: {error}"
+            return
+        model.compiled_code, model.compiled_from = compiled_code, COMPILER
+        model.timing.render_seconds = seconds
+        self.cache.put(key, compiled_code)
+
+    def _abandon_timed_out(self, running, lock):
+        """Return the models whose render timed out, taking them out of running."""
+        now = time.perf_counter()
+        with lock:
+            timed_out = [(worker, model) for worker, (model, start) in running.items() if now - start >= self.timeout]
+            for worker, _ in timed_out:
+                del running[worker]
+        return [model for _, model in timed_out]
+
+
+def dbt_renderer(manifest, runtime_config):
+    """Return a function rendering a model through dbt's compiler, without writing target/compiled."""
+    from dbt.compilation import Compiler
+
+    compiler = Compiler(runtime_config)
+
+    def render(source):
+        node = manifest.nodes[source.unique_id]
+        return compiler.compile_node(node, manifest, write=False).compiled_code
+    return render
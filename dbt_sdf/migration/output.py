@@ -0,0 +1,42 @@
+import os
+
+from dbt_sdf.migration.pipeline import write_definitions
+from dbt_sdf.schema.generated.models import Definition
+from dbt_sdf.schema.validation import list_adapter
+
+# Serialization options shared by every output format
+DUMP_OPTIONS = dict(by_alias=True, exclude_defaults=True)
+
+
+def write_json(definitions, path):
+    """Write definitions as one JSON array, serialized by pydantic-core in a single call."""
+    with open(path, "wb") as json_file:
+        json_file.write(list_adapter(Definition).dump_json(definitions, **DUMP_OPTIONS))
+
+
+def write_ndjson(definitions, path):
+    """Write definitions as newline-delimited JSON, one definition per line, for bulk loading."""
+    with open(path, "wb") as ndjson_file:
+        for definition in definitions:
+            ndjson_file.write(definition.model_dump_json(**DUMP_OPTIONS).encode())
+            ndjson_file.write(b"\n")
+
+
+# Output format: (file name in the workspace directory, writer)
+OUTPUT_FORMATS = {
+    "yaml": ("workspace.sdf.yml", write_definitions),
+    "json": ("workspace.sdf.json", write_json),
+    "ndjson": ("workspace.sdf.ndjson", write_ndjson),
+}
+
+
+def write_workspace(definitions, workspace_dir, output_format="yaml"):
+    """Write definitions to the workspace directory in the given format.
+
+    Returns:
+        The path of the file written.
+    """
+    file_name, writer = OUTPUT_FORMATS[output_format]
+    path = os.path.join(workspace_dir, file_name)
+    writer(definitions, path)
+    return path
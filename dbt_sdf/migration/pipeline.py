@@ -0,0 +1,258 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+import yaml
+
+from dbt_sdf.model_parser.inliner import NotInlinable
+from dbt_sdf.model_parser.parser import (
+    ParseBudgetExceeded,
+    Parser,
+    collect_dbt_calls,
+    count_nodes,
+    tokenize,
+)
+from dbt_sdf.migration.config import DynamicConfig, apply_config
+from dbt_sdf.migration.fallback import STATIC
+from dbt_sdf.migration.resolution import UnresolvedCall
+from dbt_sdf.profiling.timing import ModelTiming
+from dbt_sdf.schema.generated import mirrors
+from dbt_sdf.schema.validation import construct_definitions, validate_definitions
+
+
+@dataclass
+class ModelSource:
+    """The parts of a dbt manifest node the migration reads."""
+    unique_id: str
+    name: str
+    package_name: str
+    path: str
+    raw_code: str
+    database: Optional[str] = None
+    schema: Optional[str] = None
+    alias: Optional[str] = None
+    fqn: Optional[List[str]] = None
+    # The sha256 of the raw code dbt parsed, and the SQL it compiled it to, if any
+    checksum: Optional[str] = None
+    compiled_code: Optional[str] = None
+
+    def __post_init__(self):
+        if self.fqn is None:
+            # dbt's fqn: the package, the directories below the model path, the model name
+            directories = os.path.dirname(self.path).replace(os.sep, "/").split("/")[1:]
+            self.fqn = [self.package_name, *directories, self.name]
+
+    @classmethod
+    def from_node(cls, node):
+        return cls(
+            unique_id=node.unique_id,
+            name=node.name,
+            package_name=node.package_name,
+            path=node.original_file_path,
+            raw_code=node.raw_code,
+            database=node.database,
+            schema=node.schema,
+            alias=node.alias,
+            fqn=getattr(node, "fqn", None),
+            checksum=node.checksum.checksum if getattr(node, "checksum", None) else None,
+            compiled_code=getattr(node, "compiled_code", None),
+        )
+
+    @property
+    def table_name(self):
+        parts = [self.database, self.schema, self.alias or self.name]
+        return '.'.join(part for part in parts if part)
+
+
+@dataclass
+class MigratedModel:
+    """A model as it moves through the migration phases.
+
+    Models that cannot be migrated statically get a fallback_reason and are
+    skipped by the remaining static phases.
+    """
+    source: ModelSource
+    timing: ModelTiming
+    tokens: List[Any] = field(default_factory=list)
+    trees: List[Any] = field(default_factory=list)
+    config_calls: List[Any] = field(default_factory=list)
+    source_calls: List[Any] = field(default_factory=list)
+    ref_calls: List[Any] = field(default_factory=list)
+    fallback_reason: Optional[str] = None
+    # The table definition being built for the model, as a plain mirror until it is written
+    table: Optional[mirrors.Table] = None
+    # The rendered SQL of a model that fell back, and where it came from
+    compiled_code: Optional[str] = None
+    compiled_from: Optional[str] = None
+
+    @classmethod
+    def from_source(cls, source):
+        timing = ModelTiming(source.unique_id, source.path, len(source.raw_code.encode()))
+        return cls(source, timing, table=mirrors.Table(source.table_name))
+
+    @property
+    def is_static(self):
+        return self.fallback_reason is None
+
+    def deadline(self, budget):
+        """Return the perf_counter() deadline for the next stage, given a per-model budget."""
+        if budget is None:
+            return None
+        return time.perf_counter() + budget - self.timing.total_seconds
+
+
+def model_sources(manifest):
+    """Return the SQL models of a manifest in a stable order."""
+    return [
+        ModelSource.from_node(node)
+        for _, node in sorted(manifest.nodes.items())
+        if node.resource_type == 'model' and getattr(node, 'language', 'sql') == 'sql'
+    ]
+
+
+def run_pipeline(sources, profiler=None, budget=None, index=None, configs=None, inliner=None):
+    """Tokenize, parse and extract dbt calls from every model.
+
+    Each phase runs over all models before the next one starts, so a memory
+    profiler snapshot taken between phases attributes the tokens, the ASTs and
+    the extracted calls separately.
+
+    Args:
+        sources: The ModelSource objects to migrate.
+        profiler: An optional started MemoryProfiler.
+        budget: Optional number of seconds a single model may spend in the
+            static stages. Models over budget are diverted to the fallback path.
+        index: An optional ResolutionIndex. When given, table names are
+            normalized for its dialect and the ref() and source() calls of each
+            model are resolved into its table dependencies.
+        configs: An optional ConfigResolver. When given, each model's effective
+            dbt config sets its table's materialization, severity and meta.
+        inliner: An optional Inliner. When given, each model is rendered to SQL
+            without dbt, inlining simple macros; models it cannot render fall back.
+    Returns:
+        A list of MigratedModel, in the order of sources.
+    """
+    models = [MigratedModel.from_source(source) for source in sources]
+
+    for model in models:
+        start = time.perf_counter()
+        try:
+            model.tokens = tokenize(model.source.raw_code, deadline=model.deadline(budget))
+        except ParseBudgetExceeded as e:
+            model.fallback_reason = f"over budget: {e}"
+        except SyntaxError as e:
+            model.fallback_reason = f"unsupported template: {e}"
+        model.timing.tokenize_seconds = time.perf_counter() - start
+        model.timing.tokens = len(model.tokens)
+    if profiler is not None:
+        profiler.snapshot('tokenize', models=len(models),
+                          tokens=sum(len(model.tokens) for model in models))
+
+    for model in models:
+        if not model.is_static:
+            continue
+        start = time.perf_counter()
+        try:
+            model.trees = Parser(model.tokens, deadline=model.deadline(budget)).parse()
+        except ParseBudgetExceeded as e:
+            model.fallback_reason = f"over budget: {e}"
+        except (SyntaxError, RecursionError) as e:
+            model.fallback_reason = f"unsupported template: {e}"
+        model.timing.parse_seconds = time.perf_counter() - start
+    if profiler is not None:
+        profiler.snapshot('parse', models=len(models),
+                          ast_nodes=sum(count_nodes(model.trees) for model in models))
+
+    for model in models:
+        if not model.is_static:
+            continue
+        start = time.perf_counter()
+        calls = collect_dbt_calls(model.trees)
+        model.timing.extract_seconds = time.perf_counter() - start
+        if budget is not None and model.timing.total_seconds > budget:
+            # A model that falls back keeps none of its static results
+            model.fallback_reason = f"over budget: took {model.timing.total_seconds:.3f}s"
+            model.trees = []
+            continue
+        model.config_calls, model.source_calls, model.ref_calls = calls
+    if profiler is not None:
+        profiler.snapshot('extract', models=len(models),
+                          calls=sum(len(model.config_calls) + len(model.source_calls) + len(model.ref_calls)
+                                    for model in models))
+
+    if configs is not None:
+        for model in models:
+            if not model.is_static:
+                continue
+            try:
+                config = configs.resolve(model.source.fqn, model.source.name, configs.config_calls(model.trees))
+            except DynamicConfig as e:
+                model.fallback_reason = f"dynamic config: {e}"
+                continue
+            apply_config(model.table, config)
+        if profiler is not None:
+            profiler.snapshot('config', models=len(models))
+
+    if index is not None:
+        for model in models:
+            model.table.name = index.names.get(model.source.unique_id, model.table.name)
+            if not model.is_static:
+                continue
+            try:
+                dependencies = [index.resolve_call(call, model.source.package_name)
+                                for call in model.ref_calls + model.source_calls]
+            except UnresolvedCall as e:
+                model.fallback_reason = f"unresolved call: {e}"
+                continue
+            model.table.dependencies = list(dict.fromkeys(dependencies)) or None
+        if profiler is not None:
+            profiler.snapshot('resolve', models=len(models),
+                              dependencies=sum(len(model.table.dependencies or ()) for model in models))
+
+    if inliner is not None:
+        for model in models:
+            if not model.is_static:
+                continue
+            package_name = model.source.package_name
+            resolve = None if index is None else (lambda call: index.resolve_call(call, package_name))
+            try:
+                model.compiled_code = inliner.render(model.trees, package_name, resolve)
+            except (NotInlinable, UnresolvedCall) as e:
+                model.fallback_reason = f"not statically renderable: {e}"
+                continue
+            model.compiled_from = STATIC
+        if profiler is not None:
+            profiler.snapshot('render', models=len(models))
+
+    return models
+
+
+def build_definitions(workspace_name, models, trusted=False):
+    """Build the workspace definition followed by one table definition per model.
+
+    Args:
+        workspace_name: The name of the sdf workspace.
+        models: The MigratedModels to define tables for.
+        trusted: Skip validation, for definitions known to be valid.
+
+    Returns:
+        A list of Definitions.
+    """
+    definitions = [{"workspace": {"edition": "1.3", "name": workspace_name}}]
+    for model in models:
+        definitions.append({"table": model.table.to_dict()})
+    if trusted:
+        return construct_definitions(definitions)
+    return validate_definitions(definitions)
+
+
+def write_definitions(definitions, path):
+    """Write definitions as a multi-document .sdf.yml file."""
+    with open(path, "w") as yaml_file:
+        yaml.dump_all(
+            (definition.model_dump(mode="json", by_alias=True, exclude_defaults=True)
+             for definition in definitions),
+            yaml_file,
+            default_flow_style=False,
+        )
@@ -0,0 +1,167 @@
+import re
+from functools import lru_cache
+
+from dbt_sdf.model_parser.inventory import literal_value
+from dbt_sdf.schema.generated.models import Dialect
+
+# Resource types ref() can point at
+REFABLE_TYPES = {"model", "seed", "snapshot"}
+
+# dbt adapter types that map onto an sdf dialect
+ADAPTER_DIALECTS = {
+    "snowflake": Dialect.snowflake,
+    "trino": Dialect.trino,
+    "bigquery": Dialect.bigquery,
+    "redshift": Dialect.redshift,
+    "spark": Dialect.spark_lp,
+    "databricks": Dialect.spark_lp,
+}
+
+# Dialects whose unquoted identifiers are case sensitive
+CASE_SENSITIVE_DIALECTS = {Dialect.bigquery}
+BACKTICK_DIALECTS = {Dialect.bigquery, Dialect.spark_lp}
+
+SIMPLE_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class UnresolvedCall(Exception):
+    """Raised when a ref() or source() call cannot be resolved statically."""
+
+
+def dialect_for_adapter(adapter_type):
+    """Return the sdf Dialect of a dbt adapter type, or None if sdf has no such dialect."""
+    return ADAPTER_DIALECTS.get(adapter_type)
+
+
+@lru_cache(maxsize=None)
+def normalize_identifier(identifier, dialect=None):
+    """Normalize one identifier the way the dialect treats it, quoting it if needed.
+
+    Plain identifiers are case-folded to lower case unless the dialect is case
+    sensitive; anything else is quoted and keeps its case.
+    """
+    if SIMPLE_IDENTIFIER.match(identifier):
+        return identifier if dialect in CASE_SENSITIVE_DIALECTS else identifier.lower()
+    if dialect in BACKTICK_DIALECTS:
+        return "`" + identifier.replace("`", "``") + "`"
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def qualified_name(database, schema, identifier, dialect=None):
+    """Return the catalog.schema.table name of a relation, skipping missing parts."""
+    return ".".join(normalize_identifier(part, dialect) for part in (database, schema, identifier) if part)
+
+
+def _packages_to_search(current_project, node_package, target_package=None):
+    # Mirrors dbt.contracts.graph.manifest._packages_to_search; None means any package
+    if target_package is not None:
+        return [target_package]
+    if current_project == node_package:
+        return [current_project, None]
+    return [current_project, node_package, None]
+
+
+def _find(storage, key, package):
+    packages = storage.get(key)
+    if not packages:
+        return None
+    if package is None:
+        # Like dbt's find_unique_id_for_package, any package: the first one added, in manifest order
+        return next(iter(packages.values()))
+    return packages.get(package)
+
+
+class ResolutionIndex:
+    """Maps ref() and source() arguments to sdf table names, built in one pass over a manifest.
+
+    Lookups follow dbt's package precedence: an explicit package, otherwise the
+    root project, then the calling node's package, then any package.
+    """
+
+    def __init__(self, root_project, dialect=None):
+        self.root_project = root_project
+        self.dialect = dialect
+        # name, or name.v<version> for pinned versions -> package -> table name
+        self.refs = {}
+        # source_name.table_name -> package -> table name
+        self.sources = {}
+        # unique_id -> table name
+        self.names = {}
+
+    @classmethod
+    def from_manifest(cls, manifest, root_project, dialect=None):
+        index = cls(root_project, dialect)
+        for node in manifest.nodes.values():
+            if node.resource_type in REFABLE_TYPES:
+                index.add_node(node)
+        for source in manifest.sources.values():
+            index.add_source(source)
+        return index
+
+    def add_node(self, node):
+        name = qualified_name(node.database, node.schema, node.alias or node.name, self.dialect)
+        self.names[node.unique_id] = name
+        version = getattr(node, "version", None)
+        if version is None:
+            self.refs.setdefault(node.name, {})[node.package_name] = name
+            return
+        self.refs.setdefault(f"{node.name}.v{version}", {})[node.package_name] = name
+        # An unpinned ref() resolves to the latest version
+        if str(version) == str(getattr(node, "latest_version", None)):
+            self.refs.setdefault(node.name, {})[node.package_name] = name
+
+    def add_source(self, source):
+        name = qualified_name(source.database, source.schema, source.identifier or source.name, self.dialect)
+        self.names[source.unique_id] = name
+        self.sources.setdefault(f"{source.source_name}.{source.name}", {})[source.package_name] = name
+
+    def resolve_ref(self, name, package=None, version=None, node_package=None):
+        """Return the table name a ref() resolves to.
+
+        Raises:
+            UnresolvedCall: If no node matches.
+        """
+        key = name if version is None else f"{name}.v{version}"
+        for candidate in _packages_to_search(self.root_project, node_package or self.root_project, package):
+            found = _find(self.refs, key, candidate)
+            if found is not None:
+                return found
+        raise UnresolvedCall(f"ref to '{key}' was not found")
+
+    def resolve_source(self, source_name, table_name, node_package=None):
+        """Return the table name a source() resolves to.
+
+        Raises:
+            UnresolvedCall: If no source matches.
+        """
+        key = f"{source_name}.{table_name}"
+        for candidate in _packages_to_search(self.root_project, node_package or self.root_project):
+            found = _find(self.sources, key, candidate)
+            if found is not None:
+                return found
+        raise UnresolvedCall(f"source '{key}' was not found")
+
+    def resolve_call(self, call, node_package=None):
+        """Resolve a ref() or source() FunctionCall node extracted from a template.
+
+        Raises:
+            UnresolvedCall: If the call has arguments that are not literals, or does not resolve.
+        """
+        function = call.children[0].token.value
+        args, kwargs = [], {}
+        for argument in call.children[1:]:
+            if isinstance(argument, tuple):
+                kwargs[argument[0].value] = literal_value(argument[1])
+            else:
+                args.append(literal_value(argument))
+        if any(arg is None for arg in args) or any(value is None for value in kwargs.values()):
+            raise UnresolvedCall(f"{function}() has arguments that are not literals")
+        if function == "source":
+            if len(args) != 2 or kwargs:
+                raise UnresolvedCall(f"source() takes a source and a table name, got {len(args)} arguments")
+            return self.resolve_source(*args, node_package=node_package)
+        version = kwargs.pop("version", kwargs.pop("v", None))
+        if kwargs or not 1 <= len(args) <= 2:
+            raise UnresolvedCall("ref() takes a name and an optional package and version")
+        package, name = args if len(args) == 2 else (None, args[0])
+        return self.resolve_ref(name, package=package, version=version, node_package=node_package)
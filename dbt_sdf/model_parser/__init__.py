@@ -0,0 +1,52 @@
+import importlib
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+# Modules that may be compiled with mypyc, see setup.py
+COMPILED_MODULES = ("parser",)
+
+
+def load_source(name, module_name=None):
+    """Import a module of this package from its .py file, even where a compiled build of it exists.
+
+    Args:
+        name: The module, e.g. 'parser'.
+        module_name: The name to register the module under, defaults to its own.
+    """
+    module_name = module_name or f"{__name__}.{name}"
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(os.path.dirname(__file__), name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def is_compiled(module):
+    """Tell whether an imported module is a compiled extension rather than Python source."""
+    return not module.__file__.endswith(".py")
+
+
+def _has_compiled(name):
+    directory = os.path.dirname(__file__)
+    return any(os.path.exists(os.path.join(directory, name + suffix))
+               for suffix in importlib.machinery.EXTENSION_SUFFIXES)
+
+
+# DBT_SDF_PURE_PYTHON=1 uses the .py modules even where compiled ones are
+# installed, which are otherwise preferred. A compiled module that fails to
+# load, e.g. one missing its mypyc runtime, falls back to the .py module.
+for _name in COMPILED_MODULES:
+    if os.environ.get("DBT_SDF_PURE_PYTHON"):
+        load_source(_name)
+    elif _has_compiled(_name):
+        try:
+            importlib.import_module(f"{__name__}.{_name}")
+        except ImportError:
+            load_source(_name)
+del _name
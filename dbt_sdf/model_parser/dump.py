@@ -0,0 +1,138 @@
+import json
+from json.encoder import encode_basestring
+
+from dbt_sdf.model_parser.parser import ConditionBlock, IfStatement, LazyBlock, Node, Token
+
+INDENT = '    '
+
+# The names of the values a node is made of, in the order of Node._fields()
+FIELD_NAMES = {
+    ConditionBlock: ('open_token', 'condition', 'close_token', 'block'),
+    IfStatement: ('clauses', 'endif_token', 'close_token'),
+}
+NODE_FIELD_NAMES = ('token', 'children')
+
+_DONE = object()
+
+
+def _items(value):
+    if isinstance(value, LazyBlock):
+        value._load()
+    return iter(value)
+
+
+def dump(trees, stream, max_depth=None):
+    """Write parsed trees to a text stream in the layout of Node.pretty_repr().
+
+    The trees are walked iteratively and written as they are walked, so the
+    time taken is linear in the size of the trees and the memory used only
+    grows with their depth. Unlike pretty_repr(), keyword arguments and
+    other tuples are indented like lists, and the clauses of if statements
+    are written at any depth.
+
+    Args:
+        trees: A node, or a list of them as Parser.parse() returns.
+        stream: A text stream, e.g. sys.stdout or an io.StringIO.
+        max_depth: How many levels of nodes to write; deeper nodes are written as e.g. FunctionCall(...).
+    """
+    write = stream.write
+    # Each frame is the items of a node, list or tuple being written, their
+    # indentation level and node depth, the text closing them, and whether
+    # an item has been written yet
+    stack = []
+
+    def start(value, level, depth):
+        indent = INDENT * level
+        if isinstance(value, Node):
+            name = type(value).__name__
+            if max_depth is not None and depth >= max_depth:
+                write(f"{indent}{name}(...)")
+                return
+            fields = value._fields()
+            if len(fields) == 2 and not fields[1]:
+                write(f"{indent}{name}({fields[0]!r}, [])")
+                return
+            write(f"{indent}{name}(\n")
+            stack.append([iter(fields), level + 1, depth + 1, f"\n{indent})", False])
+        elif isinstance(value, (list, tuple)):
+            opening, closing = '[]' if isinstance(value, list) else '()'
+            items = _items(value)
+            if not value:
+                write(f"{indent}{opening}{closing}")
+                return
+            write(f"{indent}{opening}\n")
+            stack.append([items, level + 1, depth, f"\n{indent}{closing}", False])
+        else:
+            write(f"{indent}{value!r}")
+
+    start(trees, 0, 0)
+    while stack:
+        frame = stack[-1]
+        items, level, depth, closing, started = frame
+        item = next(items, _DONE)
+        if item is _DONE:
+            stack.pop()
+            write(closing)
+            continue
+        if started:
+            write(',\n')
+        frame[4] = True
+        start(item, level, depth)
+    write('\n')
+
+
+def dump_json(trees, stream, max_depth=None):
+    """Write parsed trees to a text stream as a line of JSON.
+
+    A node is written as an object with its class under "node" and its
+    values under their names, e.g. {"node": "Variable", "token": {...},
+    "children": []}; a token as an object with its type, value, line and
+    column. Like dump(), the trees are written as they are walked.
+
+    Args:
+        trees: A node, or a list of them as Parser.parse() returns.
+        stream: A text stream, e.g. sys.stdout or an io.StringIO.
+        max_depth: How many levels of nodes to write; deeper nodes are written
+            with only their class and "truncated": true.
+    """
+    write = stream.write
+    # Each frame is the (name or None, value) pairs of a node, list or tuple
+    # being written, its node depth, the text closing it, and whether the
+    # next pair needs a separator
+    stack = []
+
+    def start(value, depth):
+        if isinstance(value, Node):
+            name = encode_basestring(type(value).__name__)
+            if max_depth is not None and depth >= max_depth:
+                write(f'{{"node": {name}, "truncated": true}}')
+                return
+            write(f'{{"node": {name}')
+            names = FIELD_NAMES.get(type(value), NODE_FIELD_NAMES)
+            stack.append([zip(names, value._fields()), depth + 1, '}', True])
+        elif isinstance(value, Token):
+            write(f'{{"type": {encode_basestring(value.type)}, "value": {encode_basestring(value.value)}, '
+                  f'"line": {value.line}, "column": {value.column}}}')
+        elif isinstance(value, (list, tuple)):
+            write('[')
+            stack.append([((None, item) for item in _items(value)), depth, ']', False])
+        else:
+            write(json.dumps(value))
+
+    start(trees, 0)
+    while stack:
+        frame = stack[-1]
+        pairs, depth, closing, separate = frame
+        pair = next(pairs, None)
+        if pair is None:
+            stack.pop()
+            write(closing)
+            continue
+        if separate:
+            write(', ')
+        frame[3] = True
+        name, value = pair
+        if name is not None:
+            write(f'"{name}": ')
+        start(value, depth)
+    write('\n')
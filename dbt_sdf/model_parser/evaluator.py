@@ -0,0 +1,281 @@
+import operator
+import re
+from typing import Any, Dict, List, NamedTuple
+
+from dbt_sdf.model_parser.parser import (
+    AttributeAccess,
+    BinaryOp,
+    ForStatement,
+    FunctionCall,
+    IfStatement,
+    IndexAccess,
+    Literal,
+    MacroDefinition,
+    Node,
+    SetStatement,
+    UnaryOp,
+    Variable,
+    WithStatement,
+    _node_items,
+)
+
+
+class EvaluatedCall(NamedTuple):
+    """A function call found in a template, with its arguments evaluated where they render."""
+    node: FunctionCall
+    args: List[Any]
+    kwargs: Dict[str, Any]
+    # False if the call may not render, or may render more than once
+    certain: bool
+
+
+class _Unknown:
+    """The value of an expression that cannot be evaluated without rendering the template."""
+
+    def __repr__(self):
+        return 'UNKNOWN'
+
+    def __bool__(self):
+        raise TypeError("UNKNOWN has no truth value")
+
+
+UNKNOWN = _Unknown()
+
+CONSTANTS = {
+    'true': True, 'True': True,
+    'false': False, 'False': False,
+    'none': None, 'None': None,
+}
+
+BINARY_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+}
+
+# The longest string or list an expression may evaluate to, against runaway folding, e.g. 'x' * 99999999999
+MAX_SIZE = 1_000_000
+
+# The mapping key, width and precision of each conversion in a %-format string
+_FORMAT_SPEC = re.compile(r'%(?:\([^)]*\))?[-#0 +]*(\*|\d*)(?:\.(\*|\d*))?')
+
+
+def is_known(value):
+    """Tell whether an evaluated value, including anything nested in it, is known."""
+    if value is UNKNOWN:
+        return False
+    if isinstance(value, list):
+        return all(is_known(item) for item in value)
+    if isinstance(value, dict):
+        return all(is_known(item) for item in value.values())
+    return True
+
+
+class Evaluator:
+    """Folds the constant parts of a parsed template into Python values.
+
+    Literals, list and object literals, var() with known project vars,
+    target attributes, arithmetic, comparisons and boolean operators are
+    evaluated; everything else, e.g. macro calls or loop variables, is UNKNOWN.
+
+    Args:
+        vars: The project vars, merged with any --vars given on the command line.
+        target: The known attributes of the dbt target, e.g. {'name': 'dev'}.
+        max_size: The longest string or list an expression may evaluate to; longer ones are UNKNOWN.
+    """
+
+    def __init__(self, vars=None, target=None, max_size=MAX_SIZE):
+        self.vars = vars or {}
+        self.target = target or {}
+        self.max_size = max_size
+
+    def evaluate(self, node, names=None):
+        """Return the value of an expression node, or UNKNOWN.
+
+        Args:
+            node: An expression node of the parser's AST.
+            names: Values of the template variables set so far.
+        """
+        names = names or {}
+        try:
+            return self._evaluate(node, names)
+        except (TypeError, ValueError, ArithmeticError, LookupError):
+            return UNKNOWN
+
+    def _evaluate(self, node, names):
+        if isinstance(node, Literal):
+            token = node.token
+            if token.type == 'STRING':
+                return token.value[1:-1]
+            if token.type == 'NUMBER':
+                return float(token.value) if '.' in token.value else int(token.value)
+            if token.value == '[':
+                return [self._evaluate(element, names) for element in node.children]
+            if token.value == '{':
+                return {key.value[1:-1] if key.type == 'STRING' else key.value: self._evaluate(value, names)
+                        for key, value in node.children}
+            return UNKNOWN
+        if isinstance(node, Variable):
+            name = node.token.value
+            if name in names:
+                return names[name]
+            return CONSTANTS.get(name, UNKNOWN)
+        if isinstance(node, AttributeAccess):
+            base, field = node.children
+            if isinstance(base, Variable) and base.token.value == 'target' and 'target' not in names:
+                return self.target.get(field.value, UNKNOWN)
+            value = self._evaluate(base, names)
+            # e.g. loop.last, when the caller binds loop to a dict
+            return value.get(field.value, UNKNOWN) if isinstance(value, dict) else UNKNOWN
+        if isinstance(node, IndexAccess):
+            base, index = (self._evaluate(child, names) for child in node.children)
+            if not is_known(base) or not is_known(index):
+                return UNKNOWN
+            return base[index]
+        if isinstance(node, FunctionCall):
+            return self._evaluate_call(node, names)
+        if isinstance(node, UnaryOp):
+            operand = self._evaluate(node.children[0], names)
+            if operand is UNKNOWN:
+                return UNKNOWN
+            return not operand if node.token.value == 'not' else -operand
+        if isinstance(node, BinaryOp):
+            return self._evaluate_binary(node, names)
+        return UNKNOWN
+
+    def _evaluate_call(self, node, names):
+        callee = node.children[0]
+        if not isinstance(callee, Variable) or callee.token.value != 'var' or 'var' in names:
+            return UNKNOWN
+        args, kwargs = self.arguments(node, names)
+        if kwargs or not 1 <= len(args) <= 2 or not isinstance(args[0], str):
+            return UNKNOWN
+        if args[0] in self.vars:
+            return self.vars[args[0]]
+        # dbt fails to compile a var() without a default, but a default is a constant
+        return args[1] if len(args) == 2 else UNKNOWN
+
+    def _evaluate_binary(self, node, names):
+        op = node.token.value
+        left = self._evaluate(node.children[0], names)
+        # 'and' and 'or' return one of their operands, like Python's
+        if op in ('and', 'or'):
+            if left is UNKNOWN:
+                return UNKNOWN
+            if (op == 'and') != bool(left):
+                return left
+            return self._evaluate(node.children[1], names)
+        right = self._evaluate(node.children[1], names)
+        if not is_known(left) or not is_known(right):
+            return UNKNOWN
+        if self._too_large(op, left, right):
+            return UNKNOWN
+        return BINARY_OPERATORS[op](left, right)
+
+    def _too_large(self, op, left, right):
+        # Checked before applying the operator, which could exhaust memory
+        if op == '*':
+            sequence, count = (left, right) if isinstance(right, int) else (right, left)
+            return (isinstance(sequence, (str, list)) and isinstance(count, int)
+                    and len(sequence) * count > self.max_size)
+        if op == '+':
+            return (isinstance(left, (str, list)) and isinstance(right, (str, list))
+                    and len(left) + len(right) > self.max_size)
+        if op == '%' and isinstance(left, str):
+            return any(
+                number == '*' or (number and int(number) > self.max_size)
+                for spec in _FORMAT_SPEC.findall(left) for number in spec
+            )
+        return False
+
+    def arguments(self, call, names=None):
+        """Evaluate the arguments of a FunctionCall node.
+
+        Returns:
+            A list of positional and a dict of keyword argument values, either of
+            which may hold UNKNOWN.
+        """
+        args, kwargs = [], {}
+        for argument in call.children[1:]:
+            if isinstance(argument, tuple):
+                kwargs[argument[0].value] = self.evaluate(argument[1], names)
+            else:
+                args.append(self.evaluate(argument, names))
+        return args, kwargs
+
+    def branch(self, statement, names=None):
+        """Return the block of an if statement that renders, [] if none does, or UNKNOWN."""
+        for clause in statement.clauses:
+            if clause.condition is None:
+                return clause.block
+            condition = self.evaluate(clause.condition, names)
+            if condition is UNKNOWN:
+                return UNKNOWN
+            if condition:
+                return clause.block
+        return []
+
+    def iter_nodes(self, trees):
+        """Yield (node, certain, names) for every node in the branches of trees that may render.
+
+        If conditions are evaluated and only the branch taken is descended into.
+        Nodes below a condition that cannot be evaluated, in a loop or in a macro
+        definition are yielded with certain=False, since they may not render,
+        or render more than once. names holds the values of the variables set
+        before the node; it is updated as the walk goes on.
+        """
+        # Each item is walked with the names in scope where it is: with, for
+        # and macro bodies get a copy, so what they set does not leak out
+        stack = [(trees, True, {})]
+        while stack:
+            item, certain, names = stack.pop()
+            if isinstance(item, (list, tuple)):
+                stack.extend((child, certain, names) for child in reversed(item))
+                continue
+            if not isinstance(item, Node):
+                continue
+            yield item, certain, names
+            if isinstance(item, IfStatement):
+                block = self.branch(item, names) if certain else UNKNOWN
+                if block is UNKNOWN:
+                    stack.append((item.clauses, False, names))
+                else:
+                    stack.append((block, certain, names))
+            elif isinstance(item, SetStatement):
+                var, value = item.children[1], item.children[2]
+                names[var.value] = self.evaluate(value, names) if certain else UNKNOWN
+                stack.append((value, certain, names))
+            elif isinstance(item, WithStatement):
+                pairs, block = item.children[1], item.children[2]
+                # The values are evaluated in the enclosing scope
+                scope = dict(names)
+                for var, value in pairs:
+                    scope[var.value] = self.evaluate(value, names) if certain else UNKNOWN
+                stack.append((block, certain, scope))
+                stack.append((pairs, certain, names))
+            elif isinstance(item, ForStatement):
+                # The iterable is walked first, in the enclosing scope
+                stack.append((item.children[4:], False, dict(names, **{item.children[1].value: UNKNOWN})))
+                stack.append((item.children[2], False, names))
+            elif isinstance(item, MacroDefinition):
+                stack.append((item.children, False, dict(names)))
+            else:
+                stack.append((_node_items(item), certain, names))
+
+    def calls(self, trees, function):
+        """Return an EvaluatedCall for each call of a function in the branches of trees that may render."""
+        calls = []
+        for node, certain, names in self.iter_nodes(trees):
+            if (isinstance(node, FunctionCall) and isinstance(node.children[0], Variable)
+                    and node.children[0].token.value == function):
+                args, kwargs = self.arguments(node, names)
+                calls.append(EvaluatedCall(node, args, kwargs, certain))
+        return calls
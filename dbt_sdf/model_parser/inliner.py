@@ -0,0 +1,233 @@
+from dbt_sdf.model_parser.evaluator import UNKNOWN, Evaluator, is_known
+from dbt_sdf.model_parser.macros import called_name
+from dbt_sdf.model_parser.parser import (
+    Expression,
+    ForStatement,
+    FunctionCall,
+    IfStatement,
+    MacroDefinition,
+    Node,
+    SetStatement,
+    Token,
+)
+
+# How deep macros may call macros before inlining gives up
+MAX_DEPTH = 8
+# Characters a model may render to before inlining gives up, against runaway expansion
+MAX_SIZE = 1_000_000
+# For loop iterations a model may unroll, counting those of nested loops, before inlining gives up
+MAX_ITERATIONS = 100_000
+
+
+class NotInlinable(Exception):
+    """Raised when a template cannot be rendered without dbt."""
+
+
+def _is_output(node):
+    """Tell whether a node is an {{ ... }} statement, as opposed to an expression inside one."""
+    return type(node) is Expression and node.children and isinstance(node.children[0], Token)
+
+
+def _is_simple(block):
+    return all(
+        _is_output(node) or (type(node) is Node and node.token.type in ('TEXT', 'COMMENT'))
+        for node in block
+    )
+
+
+def _to_text(value):
+    # What {{ value }} renders to
+    if value is None:
+        return 'None'
+    return str(value)
+
+
+class _Output:
+    """Rendered text, with Jinja's '-' whitespace control, and the loop iterations unrolled into it."""
+
+    def __init__(self, max_size):
+        self.parts = []
+        self.size = 0
+        self.max_size = max_size
+        self.strip_next = False
+        self.iterations = 0
+
+    def write(self, text):
+        if self.strip_next:
+            text = text.lstrip()
+            self.strip_next = bool(not text)
+        if text:
+            self.parts.append(text)
+            self.size += len(text)
+            if self.size > self.max_size:
+                raise NotInlinable(f"renders to more than {self.max_size} characters")
+
+    def tag(self, open_token, close_token):
+        """Apply the whitespace control of a {{ }} or {% %} tag."""
+        if open_token is not None and open_token.value.endswith('-'):
+            while self.parts:
+                stripped = self.parts[-1].rstrip()
+                self.size -= len(self.parts[-1]) - len(stripped)
+                if stripped:
+                    self.parts[-1] = stripped
+                    break
+                self.parts.pop()
+        if close_token is not None and close_token.value.startswith('-'):
+            self.strip_next = True
+
+    def getvalue(self):
+        return ''.join(self.parts)
+
+
+class Inliner:
+    """Renders templates without dbt by inlining macros whose bodies are only text and {{ }} statements.
+
+    ref() and source() render through a resolve function, config() renders
+    nothing, constants are folded by an Evaluator, if conditions and for
+    loops over known values are unrolled, and calls to simple macros are
+    replaced by their bodies with the arguments substituted. Anything else,
+    e.g. a macro with {% if %} in its body or a call to an unknown macro,
+    raises NotInlinable.
+
+    Args:
+        macros: The MacroIndex the called macros are looked up in.
+        evaluator: Folds constants, e.g. var() and target.name.
+        max_depth: How deep macros may call macros.
+        max_size: How many characters a template may render to.
+        max_iterations: How many for loop iterations a template may unroll.
+    """
+
+    def __init__(self, macros, evaluator=None, max_depth=MAX_DEPTH, max_size=MAX_SIZE, max_iterations=MAX_ITERATIONS):
+        self.macros = macros
+        self.evaluator = evaluator or Evaluator()
+        self.max_depth = max_depth
+        self.max_size = max_size
+        self.max_iterations = max_iterations
+        self._simple = {}
+
+    def render(self, trees, package_name, resolve=None):
+        """Render parsed templates to SQL.
+
+        Args:
+            trees: The nodes returned by Parser.parse().
+            package_name: The package of the template, for macro lookups.
+            resolve: A function from a ref() or source() FunctionCall to the relation it renders as.
+
+        Raises:
+            NotInlinable: If part of the template needs dbt to render.
+        """
+        output = _Output(self.max_size)
+        self._render_block(trees, {}, package_name, resolve, 0, output)
+        return output.getvalue()
+
+    def _render_block(self, block, names, package_name, resolve, depth, output):
+        for node in block:
+            if isinstance(node, IfStatement):
+                self._render_if(node, names, package_name, resolve, depth, output)
+            elif isinstance(node, ForStatement):
+                self._render_for(node, names, package_name, resolve, depth, output)
+            elif isinstance(node, SetStatement):
+                open_token, var, value, close_token = node.children
+                output.tag(open_token, close_token)
+                names[var.value] = self._value(value, names, package_name, resolve, depth)
+            elif isinstance(node, MacroDefinition):
+                # Defining a macro renders nothing, but calls to it cannot be inlined
+                output.tag(node.children[0], node.children[-1])
+            elif _is_output(node):
+                open_token, expression, close_token = node.children
+                output.tag(open_token, None)
+                output.write(_to_text(self._value(expression, names, package_name, resolve, depth)))
+                output.tag(None, close_token)
+            elif type(node) is Node and node.token.type == 'TEXT':
+                output.write(node.token.value)
+            elif type(node) is Node and node.token.type == 'COMMENT':
+                continue
+            else:
+                raise NotInlinable(f"{type(node).__name__} statements are not supported")
+
+    def _render_if(self, statement, names, package_name, resolve, depth, output):
+        block = self.evaluator.branch(statement, names)
+        if block is UNKNOWN:
+            raise NotInlinable("an if condition cannot be evaluated statically")
+        # Each tag's whitespace control applies to the text next to it that renders
+        output.tag(statement.clauses[0].open_token, None)
+        clauses = list(statement.clauses)
+        taken = next((i for i, clause in enumerate(clauses) if clause.block is block), None)
+        if taken is not None:
+            output.tag(None, clauses[taken].close_token)
+            self._render_block(block, names, package_name, resolve, depth, output)
+            following = clauses[taken + 1].open_token if taken + 1 < len(clauses) else statement.endif_token
+            output.tag(following, None)
+        output.tag(None, statement.close_token)
+
+    def _render_for(self, statement, names, package_name, resolve, depth, output):
+        open_token, var, iterable, for_close, block, endfor_open, close_token = statement.children
+        items = self.evaluator.evaluate(iterable, names)
+        if not is_known(items) or not isinstance(items, (list, dict, str)):
+            raise NotInlinable("a for loop iterates over a value that cannot be evaluated statically")
+        output.iterations += len(items)
+        if output.iterations > self.max_iterations:
+            raise NotInlinable(f"for loops iterate more than {self.max_iterations} times")
+        items = list(items)
+        output.tag(open_token, for_close)
+        if not items:
+            output.tag(endfor_open, close_token)
+        for i, item in enumerate(items):
+            # Loop variables do not leak out of the loop
+            scope = dict(names, loop={'index': i + 1, 'index0': i, 'first': i == 0, 'last': i == len(items) - 1,
+                                      'length': len(items)})
+            scope[var.value] = item
+            self._render_block(block, scope, package_name, resolve, depth, output)
+            output.tag(endfor_open, for_close if i < len(items) - 1 else close_token)
+
+    def _value(self, expression, names, package_name, resolve, depth):
+        if isinstance(expression, FunctionCall):
+            name = called_name(expression)
+            if name == 'config':
+                return ''
+            if name in ('ref', 'source'):
+                if resolve is None:
+                    raise NotInlinable(f"{name}() cannot be resolved")
+                return resolve(expression)
+            if name is not None and name != 'var':
+                return self._inline(name, expression, names, package_name, resolve, depth)
+        value = self.evaluator.evaluate(expression, names)
+        if not is_known(value):
+            raise NotInlinable("an expression cannot be evaluated statically")
+        return value
+
+    def _inline(self, name, call, names, package_name, resolve, depth):
+        unique_id = self.macros.resolve(name, package_name)
+        if unique_id is None:
+            raise NotInlinable(f"macro {name} was not found")
+        if depth >= self.max_depth:
+            raise NotInlinable(f"macros call each other more than {self.max_depth} deep")
+        macro = self.macros.macros[unique_id]
+        _, _, _, macro_close, block, endmacro_open, _ = macro.definition.children
+        if unique_id not in self._simple:
+            self._simple[unique_id] = _is_simple(block)
+        if not self._simple[unique_id]:
+            raise NotInlinable(f"macro {name} has statements other than text and {{{{ }}}}")
+
+        bound = {}
+        arguments = call.children[1:]
+        positional = [argument for argument in arguments if not isinstance(argument, tuple)]
+        if len(positional) > len(macro.parameters):
+            raise NotInlinable(f"macro {name} takes {len(macro.parameters)} arguments, got {len(positional)}")
+        for parameter, argument in zip(macro.parameters, positional):
+            bound[parameter] = self._value(argument, names, package_name, resolve, depth)
+        for keyword, argument in (argument for argument in arguments if isinstance(argument, tuple)):
+            if keyword.value not in macro.parameters or keyword.value in bound:
+                raise NotInlinable(f"macro {name} got an unexpected argument {keyword.value}")
+            bound[keyword.value] = self._value(argument, names, package_name, resolve, depth)
+        for parameter in macro.parameters:
+            if parameter not in bound:
+                if parameter not in macro.defaults:
+                    raise NotInlinable(f"macro {name} is missing argument {parameter}")
+                bound[parameter] = self._value(macro.defaults[parameter], {}, macro.package_name, resolve, depth)
+
+        output = _Output(self.max_size)
+        output.tag(None, macro_close)
+        self._render_block(block, bound, macro.package_name, resolve, depth + 1, output)
+        output.tag(endmacro_open, None)
+        return output.getvalue()
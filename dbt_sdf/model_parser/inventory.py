@@ -0,0 +1,116 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dbt_sdf.model_parser.parser import (
+    Literal,
+    Parser,
+    Variable,
+    collect_dbt_calls,
+    tokenize,
+)
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+
+def literal_value(node):
+    """Return the Python value of a literal expression, or None if it is not a literal."""
+    if isinstance(node, Literal):
+        token = node.token
+        if token.type == 'STRING':
+            return token.value[1:-1]
+        if token.type == 'NUMBER':
+            return float(token.value) if '.' in token.value else int(token.value)
+        if token.value == '[':
+            return [literal_value(element) for element in node.children]
+        if token.value == '{':
+            return {key.value[1:-1] if key.type == 'STRING' else key.value: literal_value(value)
+                    for key, value in node.children}
+    if isinstance(node, Variable) and not node.children:
+        return {'true': True, 'True': True, 'false': False, 'False': False}.get(node.token.value)
+    return None
+
+
+def describe_call(call):
+    """Describe a config, source or ref FunctionCall as a JSON-serializable dict.
+
+    Arguments that are not literals are reported as None.
+    """
+    callee = call.children[0]
+    args, kwargs = [], {}
+    for argument in call.children[1:]:
+        if isinstance(argument, tuple):
+            kwargs[argument[0].value] = literal_value(argument[1])
+        else:
+            args.append(literal_value(argument))
+    return {
+        'function': callee.token.value,
+        'line': callee.token.line,
+        'args': args,
+        'kwargs': kwargs,
+    }
+
+
+def inspect_source(path, code):
+    """Return the config, source and ref call sites of one template."""
+    try:
+        trees = Parser(tokenize(code)).parse()
+    except (SyntaxError, RecursionError) as e:
+        return {'path': path, 'calls': [], 'error': str(e)}
+    calls = [call for found in collect_dbt_calls(trees) for call in found]
+    calls.sort(key=lambda call: call.children[0].token.line)
+    return {'path': path, 'calls': [describe_call(call) for call in calls], 'error': None}
+
+
+def inspect_file(path):
+    """Return inspect_source() of a file, or its error if it cannot be read as UTF-8."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            code = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return {'path': path, 'calls': [], 'error': str(e)}
+    return inspect_source(path, code)
+
+
+def find_sql_files(paths):
+    """Expand files and directories into a sorted list of .sql files."""
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs[:] = [d for d in dirs if not d.startswith('.')]
+                files.update(os.path.join(root, name) for name in names if name.endswith('.sql'))
+        else:
+            files.add(path)
+    return sorted(files)
+
+
+def gil_enabled():
+    """Tell whether the interpreter runs Python code on one thread at a time."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+
+def inspect_paths(paths, max_workers=None, threads=None):
+    """Yield inspect_file() results for every .sql file under paths, in path order.
+
+    Files are parsed on a process pool when there are enough of them to make
+    up for starting the workers. On a free-threaded build, or with
+    threads=True, a thread pool is used instead, which saves pickling the
+    results.
+    """
+    files = find_sql_files(paths)
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < PARALLEL_THRESHOLD:
+        yield from map(inspect_file, files)
+        return
+    if threads is None:
+        threads = not gil_enabled()
+    if threads:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(inspect_file, files)
+        return
+    chunksize = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(inspect_file, files, chunksize=chunksize)
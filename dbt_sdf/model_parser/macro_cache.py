@@ -0,0 +1,122 @@
+import dataclasses
+import hashlib
+import os
+import pickle
+import tempfile
+
+from dbt_sdf.__version__ import version as dbt_sdf_version
+from dbt_sdf.model_parser.inventory import find_sql_files
+from dbt_sdf.model_parser.macros import parse_macros
+from dbt_sdf.model_parser.parser import ParseBudgetExceeded
+
+# Bump when MacroInfo or the parser's output changes shape
+CACHE_FORMAT = 2
+
+
+def default_cache_dir():
+    """Return $DBT_SDF_CACHE_DIR, else dbt-sdf under $XDG_CACHE_HOME or ~/.cache."""
+    if os.environ.get("DBT_SDF_CACHE_DIR"):
+        return os.environ["DBT_SDF_CACHE_DIR"]
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "dbt-sdf")
+
+
+def package_key(package_name, version, files):
+    """Return the cache key of a package's macro files.
+
+    Args:
+        package_name: The package, e.g. 'dbt_utils'.
+        version: The package's version, or None.
+        files: (path relative to the package root, file contents as bytes) pairs.
+    """
+    digest = hashlib.sha256(f"{CACHE_FORMAT}\0{dbt_sdf_version}\0{package_name}\0{version or ''}".encode("utf-8"))
+    for path, content in sorted(files):
+        digest.update(b"\0" + path.encode("utf-8") + b"\0" + hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+class MacroCache:
+    """Parsed package macros, content-addressed in a user-level directory.
+
+    A package's entry is keyed by its name, version and the hash of every macro
+    file, so the projects on a machine that install the same package version
+    share one entry, and an edited file misses the cache. Entries are written to
+    a temporary file and renamed into place, so concurrent readers see either
+    no entry or a whole one, and concurrent writers of the same entry write the
+    same content.
+
+    Args:
+        directory: Where entries are kept, defaults to default_cache_dir().
+    """
+
+    def __init__(self, directory=None):
+        self.directory = os.path.join(directory or default_cache_dir(), "macros")
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".pickle")
+
+    def load(self, key):
+        """Return the entry stored under key, or None."""
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            # Unreadable or from an incompatible version: parse again and overwrite it
+            return None
+
+    def store(self, key, entry):
+        """Store an entry under key, atomically. Entries that cannot be written are skipped."""
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError, RecursionError):
+            os.unlink(tmp_path)
+
+    def add_package(self, index, package_name, project_root, macro_paths, version=None):
+        """Add a package's macros to a MacroIndex, parsing them only on a cache miss.
+
+        Returns:
+            True if the package was found in the cache.
+        """
+        files = []
+        for path in find_sql_files(os.path.join(project_root, macro_path) for macro_path in macro_paths):
+            with open(path, "rb") as f:
+                files.append((os.path.relpath(path, project_root), f.read()))
+        key = package_key(package_name, version, files)
+        entry = self.load(key)
+        hit = entry is not None
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+            entry = _parse_package(package_name, files)
+            self.store(key, entry)
+
+        macros, errors = entry
+        for relative_path, message in errors.items():
+            index.errors[os.path.join(project_root, relative_path)] = message
+        for macro in macros:
+            # Entries are shared between projects, so paths are kept relative to the package
+            index.add(dataclasses.replace(macro, path=os.path.join(project_root, macro.path)))
+        return hit
+
+
+def _parse_package(package_name, files):
+    macros, errors = [], {}
+    for relative_path, content in files:
+        try:
+            macros.extend(parse_macros(content.decode("utf-8"), relative_path, package_name))
+        except (SyntaxError, RecursionError, ParseBudgetExceeded, UnicodeDecodeError) as e:
+            errors[relative_path] = str(e)
+    return macros, errors
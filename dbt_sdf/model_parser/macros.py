@@ -0,0 +1,239 @@
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from dbt_sdf.model_parser.inventory import find_sql_files, literal_value
+from dbt_sdf.model_parser.parser import (
+    AttributeAccess,
+    FunctionCall,
+    MacroDefinition,
+    Parser,
+    ParseBudgetExceeded,
+    Variable,
+    iter_nodes,
+    tokenize,
+)
+
+# Called like macros but provided by dbt's context rather than by macro files
+CONTEXT_FUNCTIONS = {
+    'ref', 'source', 'config', 'var', 'env_var', 'return', 'log', 'print', 'exceptions', 'zip',
+    'is_incremental', 'load_result', 'run_query', 'statement', 'caller', 'range', 'dict', 'list',
+}
+
+
+@dataclass
+class MacroInfo:
+    """A {% macro %} block found in a macro file."""
+    name: str
+    package_name: str
+    path: str
+    parameters: List[str]
+    # Parameters with a default, mapped to the default's expression node
+    defaults: Dict[str, Any]
+    # The lines of the {% macro %} and {% endmacro %} tags
+    start_line: int
+    end_line: int
+    # Called names as written, e.g. 'cents_to_dollars' or 'dbt_utils.star'
+    calls: List[str]
+    # Names of the models the macro ref()s
+    refs: List[str]
+    definition: Optional[MacroDefinition] = field(default=None, repr=False, compare=False)
+
+    @property
+    def unique_id(self):
+        return f"macro.{self.package_name}.{self.name}"
+
+
+def called_name(call):
+    """Return the name a FunctionCall calls, e.g. 'star' or 'dbt_utils.star', or None."""
+    callee = call.children[0]
+    if isinstance(callee, Variable):
+        return callee.token.value
+    if isinstance(callee, AttributeAccess) and isinstance(callee.children[0], Variable):
+        return f"{callee.children[0].token.value}.{callee.children[1].value}"
+    return None
+
+
+def _dispatched_name(call):
+    # adapter.dispatch('name', 'package') calls package's <adapter>__name, or default__name
+    args = [literal_value(argument) for argument in call.children[1:3] if not isinstance(argument, tuple)]
+    if not args or not isinstance(args[0], str):
+        return None
+    name = f"default__{args[0]}"
+    return f"{args[1]}.{name}" if len(args) > 1 and isinstance(args[1], str) else name
+
+
+def called_names(trees):
+    """Return the names called anywhere in trees, excluding dbt context functions, in order of first use.
+
+    A macro dispatched with a literal name counts as a call of its default__ implementation.
+    """
+    calls = {}
+    for node in iter_nodes(trees):
+        if isinstance(node, FunctionCall):
+            name = called_name(node)
+            if name == 'adapter.dispatch':
+                name = _dispatched_name(node)
+            if name is not None and name not in CONTEXT_FUNCTIONS:
+                calls[name] = None
+    return list(calls)
+
+
+def _ref_names(trees):
+    refs = {}
+    for node in iter_nodes(trees):
+        if isinstance(node, FunctionCall) and called_name(node) == 'ref' and len(node.children) > 1:
+            name = literal_value(node.children[-1]) if not isinstance(node.children[-1], tuple) else None
+            if isinstance(name, str):
+                refs[name] = None
+    return list(refs)
+
+
+def parse_macros(code, path, package_name):
+    """Parse a macro file into one MacroInfo per top-level {% macro %} block.
+
+    Raises:
+        SyntaxError: If the file cannot be parsed.
+    """
+    macros = []
+    for node in Parser(tokenize(code)).parse():
+        if not isinstance(node, MacroDefinition):
+            continue
+        open_token, name, parameters, _, block, _, close_token = node.children
+        names = [parameter[0].value if isinstance(parameter, tuple) else parameter.value for parameter in parameters]
+        defaults = {parameter[0].value: parameter[1] for parameter in parameters if isinstance(parameter, tuple)}
+        macros.append(MacroInfo(
+            name=name.value,
+            package_name=package_name,
+            path=path,
+            parameters=names,
+            defaults=defaults,
+            start_line=open_token.line,
+            end_line=close_token.line,
+            calls=called_names(block),
+            refs=_ref_names(block),
+            definition=node,
+        ))
+    return macros
+
+
+def parse_macro_file(path, package_name):
+    """Read and parse one macro file, see parse_macros()."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_macros(f.read(), path, package_name)
+
+
+class MacroIndex:
+    """The macros of a project and its packages, and the calls between them.
+
+    Names are resolved like dbt resolves macros: a package-qualified name in
+    that package, otherwise the calling package, then the root project, then
+    any package that defines the name.
+    """
+
+    def __init__(self, root_project=None):
+        self.root_project = root_project
+        # unique_id -> MacroInfo
+        self.macros = {}
+        # name -> package -> unique_id
+        self.by_name = {}
+        # Files that could not be parsed, with the error
+        self.errors = {}
+        self._graph = None
+
+    def add(self, macro):
+        self.macros[macro.unique_id] = macro
+        self.by_name.setdefault(macro.name, {})[macro.package_name] = macro.unique_id
+        self._graph = None
+
+    def add_file(self, path, package_name):
+        try:
+            macros = parse_macro_file(path, package_name)
+        except (SyntaxError, RecursionError, ParseBudgetExceeded, UnicodeDecodeError) as e:
+            self.errors[path] = str(e)
+            return []
+        for macro in macros:
+            self.add(macro)
+        return macros
+
+    def add_package(self, package_name, project_root, macro_paths):
+        """Parse every .sql file under the macro paths of a package, each file once."""
+        for path in find_sql_files(os.path.join(project_root, macro_path) for macro_path in macro_paths):
+            self.add_file(path, package_name)
+
+    def resolve(self, name, package_name=None):
+        """Return the unique_id of the macro a name refers to, or None."""
+        if '.' in name:
+            package, name = name.split('.', 1)
+            return self.by_name.get(name, {}).get(package)
+        packages = self.by_name.get(name)
+        if not packages:
+            return None
+        for candidate in (package_name, self.root_project):
+            if candidate in packages:
+                return packages[candidate]
+        return next(iter(packages.values()))
+
+    def call_graph(self):
+        """Return a map from each macro's unique_id to the unique_ids of the macros it calls."""
+        if self._graph is None:
+            self._graph = {
+                unique_id: {callee for callee in (self.resolve(name, macro.package_name) for name in macro.calls)
+                            if callee is not None}
+                for unique_id, macro in self.macros.items()
+            }
+        return self._graph
+
+    def dependencies(self, calls, package_name=None):
+        """Return the unique_ids of the macros reached, directly or not, from the called names."""
+        graph = self.call_graph()
+        reached = set()
+        stack = [callee for callee in (self.resolve(name, package_name) for name in calls) if callee is not None]
+        while stack:
+            unique_id = stack.pop()
+            if unique_id in reached:
+                continue
+            reached.add(unique_id)
+            stack.extend(graph[unique_id] - reached)
+        return reached
+
+    def digest(self, unique_ids):
+        """Return a hex digest of the given macros' definitions, which changes when any of them is edited."""
+        digest = hashlib.blake2b(digest_size=16)
+        for unique_id in sorted(unique_ids):
+            macro = self.macros[unique_id]
+            digest.update(unique_id.encode("utf-8") + b"\0")
+            # Position independent, so moving a macro within its file keeps the digest
+            definition = macro.definition
+            digest.update(definition.fingerprint() if definition is not None else repr(macro).encode("utf-8"))
+        return digest.hexdigest()
+
+    def dependents(self, macros):
+        """Return the given macros and every macro that calls them, directly or not."""
+        callers = {}
+        for caller, callees in self.call_graph().items():
+            for callee in callees:
+                callers.setdefault(callee, set()).add(caller)
+        reached = set()
+        stack = list(macros)
+        while stack:
+            unique_id = stack.pop()
+            if unique_id in reached:
+                continue
+            reached.add(unique_id)
+            stack.extend(callers.get(unique_id, ()))
+        return reached
+
+    def affected_models(self, changed_macros, model_calls):
+        """Return the models that depend, directly or not, on any of the changed macros.
+
+        Args:
+            changed_macros: unique_ids of macros that changed.
+            model_calls: A map from model unique_id to (package name, names the model calls).
+        """
+        affected = self.dependents(changed_macros)
+        return {
+            unique_id for unique_id, (package_name, calls) in model_calls.items()
+            if any(self.resolve(name, package_name) in affected for name in calls)
+        }
@@ -1,4 +1,12 @@
+import os
 import re
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from hashlib import blake2b
+from typing import Any, Callable, ClassVar, Iterator, List, Optional, Tuple, Union
+
+from mypy_extensions import mypyc_attr
 
 # Token definitions for inside Jinja2 blocks
 TOKEN_SPECIFICATION = [
@@ -27,33 +35,98 @@ TOKEN_RE = re.compile(TOKEN_REGEX)
 
 
 class Token:
-    EMPTY = None  # Placeholder for the empty token, defined below
+    EMPTY: ClassVar['Token']  # The empty token, defined below
 
-    def __init__(self, type_, value, line, column):
+    def __init__(self, type_: str, value: str, line: int, column: int) -> None:
         self.type = type_
         self.value = value
         self.line = line
         self.column = column
 
-    def __repr__(self):
+    def __repr__(self) -> str:
         return f"Token({repr(self.type)}, {repr(self.value)}, {self.line}, {self.column})"
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+        return (self.type == other.type and self.value == other.value and self.line == other.line
+                and self.column == other.column)
 
-Token.EMPTY = Token('EMPTY', '', 0, 0)
+    def __hash__(self) -> int:
+        return hash((self.type, self.value, self.line, self.column))
 
+    def __reduce__(self) -> Union[str, Tuple[Any, ...]]:
+        # Explicit, since a compiled Token cannot be created without its arguments
+        return Token, (self.type, self.value, self.line, self.column)
 
-def tokenize_jinja_block(code, line_number, line_start):
-    """Tokenize content inside Jinja2 blocks, handling nested structures."""
-    tokens = []
-    pos = 0
-    brace_stack = []
+
+class _EmptyToken(Token):
+    """The token of nodes that have none. It is shared by every tree, so it cannot be changed."""
+
+    def __init__(self) -> None:
+        for name, value in (('type', 'EMPTY'), ('value', ''), ('line', 0), ('column', 0)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Token.EMPTY cannot be changed")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Token.EMPTY cannot be changed")
+
+    def __reduce__(self) -> str:
+        # Copies and unpickled trees share the one instance too
+        return 'Token.EMPTY'
+
+
+Token.EMPTY = _EmptyToken()
+
+
+class ParseBudgetExceeded(Exception):
+    """Raised when tokenizing or parsing a template runs past its deadline."""
+
+
+# Where a Jinja2 block, expression or comment starts in template text
+JINJA_START_RE = re.compile(r'\{\{|\{%|\{#')
+
+# Templates at least this long are tokenized in chunks on a process pool
+PARALLEL_THRESHOLD = 16 * 1024 * 1024
+# The length a chunk is cut at, before moving the cut to a safe boundary
+CHUNK_SIZE = 4 * 1024 * 1024
+# How far back from a cut chunk_boundaries() looks for block delimiters
+PRESCAN_WINDOW = 64 * 1024
+
+# A token as it is sent between processes: type, value, line and column
+TokenTuple = Tuple[str, str, int, int]
+
+
+def tokenize_jinja_block(code: str, pos: int, line_number: int, line_start: int) -> Tuple[List[Token], int, bool]:
+    """Tokenize content inside Jinja2 blocks, handling nested structures.
+
+    Args:
+        code: The template.
+        pos: The offset of the block's {{ or {% in code.
+        line_number: The line the block starts on.
+        line_start: The offset the columns of the block's tokens count from.
+
+    Returns:
+        The tokens, the offset after the block and whether the block was
+        closed, rather than ended by the end of code or a character no token
+        matches.
+    """
+    tokens: List[Token] = []
+    start = pos
+    brace_stack: List[str] = []
 
     while pos < len(code):
-        match = TOKEN_RE.match(code[pos:])
+        match = TOKEN_RE.match(code, pos)
         if match:
-            kind = match.lastgroup
+            kind = match.lastgroup or ''
             value = match.group(kind)
-            column = line_start + pos + 1  # Adjusted to 1-based index for column
+            column = line_start + pos - start + 1  # Adjusted to 1-based index for column
+
+            # Inside an object literal '}}' closes braces, not the expression
+            if kind == 'EXPR_CLOSE' and brace_stack:
+                kind, value = ('OP', '-') if value[0] == '-' else ('PUNCT', '}')
 
             # Handle brace nesting
             if value == '{':
@@ -65,103 +138,248 @@ def tokenize_jinja_block(code, line_number, line_start):
             # Append token to the list
             tokens.append(Token(kind, value, line_number, column))
             pos += len(value)
+            if kind == 'NEWLINE' or kind == 'STRING' or kind == 'COMMENT':
+                line_number += value.count('\n')
 
             # If EXPR_CLOSE or STM_CLOSE is found and stack is empty, break
             if (kind == 'EXPR_CLOSE' or kind == 'STM_CLOSE') and not brace_stack:
-                break
+                return tokens, pos, True
         else:
             break
 
-    return tokens, pos
+    return tokens, pos, False
+
+
+def _tokenize(code: str, line_number: int = 1, line_start: int = 0, base: int = 0, deadline: Optional[float] = None,
+              chunk: bool = False, last: bool = True) -> Tuple[List[Token], bool]:
+    """Tokenize code, whose first character is at offset base of the template.
 
+    In chunk mode code is a slice of a template, starting outside any Jinja2
+    block. Unless the slice is the last, tokenizing stops early, returning
+    clean=False, at anything that may tokenize differently once the rest of
+    the template follows: a comment that is not closed, a block not closed
+    before the end of the slice, or a block ended by a quote or '#' no token
+    matches, which may start a string or comment running past the slice. A
+    clean slice that is not the last ends with TEXT.
 
-def tokenize(code):
-    """Tokenize the input string."""
-    line_number = 1
-    line_start = 0
-    tokens = []
+    Returns:
+        The tokens, including SKIP and NEWLINE ones, and clean.
+
+    Raises:
+        SyntaxError: If a comment is not closed by the end of the template.
+    """
+    tokens: List[Token] = []
     pos = 0
+    length = len(code)
 
-    while pos < len(code):
+    while pos < length:
+        if deadline is not None and time.perf_counter() > deadline:
+            raise ParseBudgetExceeded(f"tokenizing stopped at offset {base + pos} of {base + length}")
         # Look for the next Jinja2 block start
-        jinja_start = re.search(r'(\{\{|\{%|\{#)', code[pos:])
+        jinja_start = JINJA_START_RE.search(code, pos)
         if jinja_start:
-            start_pos = jinja_start.start() + pos
+            start_pos = jinja_start.start()
             if start_pos > pos:
                 # Capture the text before the Jinja2 block as a TEXT token
                 text_value = code[pos:start_pos]
                 tokens.append(Token('TEXT', text_value,
-                              line_number, pos - line_start + 1))
+                              line_number, base + pos - line_start + 1))
+                line_number += text_value.count('\n')
                 pos = start_pos
-                line_start = pos  # Update line_start after TEXT token
+                line_start = base + pos  # Update line_start after TEXT token
 
             # Now tokenize the Jinja2 block
             jinja_type = jinja_start.group(0)
             if jinja_type in ('{{', '{%'):
-                block_tokens, consumed = tokenize_jinja_block(
-                    code[start_pos:], line_number, line_start)
+                block_tokens, pos, closed = tokenize_jinja_block(
+                    code, start_pos, line_number, line_start)
                 tokens.extend(block_tokens)
-                pos = start_pos + consumed
+                line_number += code.count('\n', start_pos, pos)
+                if chunk and not last and not closed and (pos == length or code[pos] in '\'"#'):
+                    return tokens, False
             else:  # For comments {#
-                end_pos = code.find('#}', start_pos) + 2
+                end_pos = code.find('#}', start_pos)
+                if end_pos == -1:
+                    if chunk and not last:
+                        return tokens, False
+                    raise SyntaxError("Unterminated comment")
+                end_pos += 2
                 tokens.append(Token(
-                    'COMMENT', code[start_pos:end_pos], line_number, start_pos - line_start + 1))
+                    'COMMENT', code[start_pos:end_pos], line_number, base + start_pos - line_start + 1))
+                line_number += code.count('\n', start_pos, end_pos)
                 pos = end_pos
         else:
             # No more Jinja2 blocks, capture the rest as TEXT
             tokens.append(
-                Token('TEXT', code[pos:], line_number, pos - line_start + 1))
+                Token('TEXT', code[pos:], line_number, base + pos - line_start + 1))
             break
 
-    return [tok for tok in tokens if tok.type != 'SKIP']
+    return tokens, last or (bool(tokens) and tokens[-1].type == 'TEXT')
 
-# Example usage
 
+def _significant(tokens: List[Token]) -> List[Token]:
+    # Line breaks inside a Jinja2 block are whitespace, like spaces and tabs
+    return [tok for tok in tokens if tok.type != 'SKIP' and tok.type != 'NEWLINE']
 
-def test_scanner0():
-    code = "Hello, {{ user.name }} is logged in. {% if user.is_admin %}Admin{% endif %}"
-    tokens = tokenize(code)
-    for token in tokens:
-        print(token)
-# test_scanner0()
 
+def tokenize(code: str, deadline: Optional[float] = None, max_workers: Optional[int] = None) -> List[Token]:
+    """Tokenize the input string.
 
-def test_scanner():
-    code = "{{ result = 42 }}bla {  { {% if x > 10 %}haha_)*&^ {% endif %}"
-    print(code)
-    tokens = tokenize(code)
-    for token in tokens:
-        print(token)
+    If deadline (a time.perf_counter() value) is given, ParseBudgetExceeded is
+    raised once it has passed. Templates of PARALLEL_THRESHOLD characters or
+    more are tokenized in chunks on up to max_workers processes, by default
+    one per CPU, see tokenize_chunked(). With a single worker, or a single
+    CPU, where a process pool only adds overhead, templates are always
+    tokenized in this process.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if len(code) >= PARALLEL_THRESHOLD and workers > 1:
+        return tokenize_chunked(code, deadline=deadline, max_workers=workers)
+    tokens, _ = _tokenize(code, deadline=deadline)
+    return _significant(tokens)
 
 
-def test_scanner2():
-    code = "{% for item in list %}Item: {{ item }}{% endfor %}"
-    print(code)
-    tokens = tokenize(code)
-    for token in tokens:
-        print(token)
-# test_scanner2()
+def chunk_boundaries(code: str, chunk_size: int = CHUNK_SIZE) -> List[int]:
+    """Return offsets to cut a template at, each likely outside any Jinja2 block.
+
+    A cut is placed after the first line break past every multiple of
+    chunk_size where the last block delimiter before it is a closing one. This
+    is only a prescan of delimiters: a '}}' inside a string, or a block longer
+    than PRESCAN_WINDOW, may fool it, which tokenize_chunked() detects.
+    """
+    boundaries: List[int] = []
+    target = chunk_size
+    while target < len(code):
+        newline = code.find('\n', target)
+        cut: Optional[int] = None
+        while newline != -1 and newline < target + chunk_size:
+            begin = max(boundaries[-1] if boundaries else 0, newline - PRESCAN_WINDOW)
+            opened = max(code.rfind('{{', begin, newline), code.rfind('{%', begin, newline),
+                         code.rfind('{#', begin, newline))
+            closed = max(code.rfind('}}', begin, newline), code.rfind('%}', begin, newline),
+                         code.rfind('#}', begin, newline))
+            # The next line must not continue a delimiter, and the cut must leave text on its left
+            if closed >= opened and newline + 1 < len(code):
+                cut = newline + 1
+                break
+            newline = code.find('\n', newline + 1)
+        if cut is not None:
+            boundaries.append(cut)
+            target = cut + chunk_size
+        else:
+            target += chunk_size
+    return boundaries
+
+
+def _tokenize_chunk(code: str, line_number: int, base: int, last: bool,
+                    deadline_seconds: Optional[float]) -> Tuple[List[TokenTuple], bool]:
+    deadline = None if deadline_seconds is None else time.perf_counter() + deadline_seconds
+    tokens, clean = _tokenize(code, line_number, base, base, deadline, chunk=True, last=last)
+    # Plain tuples pickle much faster than Token objects
+    return [(tok.type, tok.value, tok.line, tok.column) for tok in _significant(tokens)], clean
+
+
+def _append(tokens: List[Token], chunk_tokens: List[Token]) -> None:
+    # A TEXT token cut in two by a chunk boundary is joined again
+    if tokens and chunk_tokens and tokens[-1].type == 'TEXT' and chunk_tokens[0].type == 'TEXT':
+        last = tokens[-1]
+        tokens[-1] = Token('TEXT', last.value + chunk_tokens[0].value, last.line, last.column)
+        chunk_tokens = chunk_tokens[1:]
+    tokens.extend(chunk_tokens)
+
 
-# def test_whitespace_control():
-#         code = "{%- if x > 10 -%}\n \
-#                {{- result = 42 -}}{% endif -%}"
-#         print(code)
-#         tokens = tokenize(code)
-#         for token in tokens:
-#             print(token)
+def tokenize_chunked(code: str, deadline: Optional[float] = None, max_workers: Optional[int] = None,
+                     chunk_size: int = CHUNK_SIZE, executor: Optional[Executor] = None) -> List[Token]:
+    """Tokenize a large template in chunks, in parallel, returning what tokenize() returns.
 
-# test_whitespace_control()
+    The template is cut at chunk_boundaries(), the chunks are tokenized on a
+    process pool and their tokens joined. A chunk whose end turns out not to
+    be outside a block is tokenized again, with the rest of the template, in
+    this process, so the result is always that of sequential tokenizing.
+
+    Args:
+        executor: A concurrent.futures executor to use instead of a new process pool.
+    """
+    boundaries = chunk_boundaries(code, chunk_size)
+    if not boundaries:
+        return _significant(_tokenize(code, deadline=deadline)[0])
+    starts = [0] + boundaries
+    ends = boundaries + [len(code)]
+    line_numbers = [1]
+    for start, end in zip(starts, boundaries):
+        line_numbers.append(line_numbers[-1] + code.count('\n', start, end))
+    deadline_seconds = None if deadline is None else deadline - time.perf_counter()
+
+    pool = executor if executor is not None else ProcessPoolExecutor(max_workers=max_workers)
+    tokens: List[Token] = []
+    futures: List[Any] = []
+    try:
+        futures = [
+            pool.submit(_tokenize_chunk, code[start:end], line_number, start, end == len(code), deadline_seconds)
+            for start, end, line_number in zip(starts, ends, line_numbers)
+        ]
+        for start, line_number, future in zip(starts, line_numbers, futures):
+            chunk_tokens, clean = future.result()
+            if clean:
+                _append(tokens, [Token(*token) for token in chunk_tokens])
+                continue
+            # The chunk may end inside a block: tokenize the rest of the template sequentially
+            rest, _ = _tokenize(code[start:], line_number, start, start, deadline)
+            _append(tokens, _significant(rest))
+            break
+    finally:
+        # Chunks after one tokenized again are not needed; cancel_futures= needs Python 3.9
+        for future in futures:
+            future.cancel()
+        if executor is None:
+            pool.shutdown(wait=False)
+    return tokens
 
 
 class Node:
-    def __init__(self, token, children=None):
+    """A node of the parsed template.
+
+    Nodes compare equal when they are the same kind of node with equal tokens
+    and equal children, i.e. when their reprs are equal. Their hash is that of
+    fingerprint(), so trees should not be changed once hashed.
+    """
+
+    def __init__(self, token: Token, children: Optional[List[Any]] = None) -> None:
         self.token = token
-        self.children = children or []
+        self.children: List[Any] = children or []
+        self._fingerprint: Optional[bytes] = None
 
-    def __repr__(self):
+    def __repr__(self) -> str:
         return self.pretty_repr()
 
-    def pretty_repr(self, indent=0):
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return type(self), (self.token, self.children)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Node):
+            return NotImplemented
+        return _equal(self, other)
+
+    def __hash__(self) -> int:
+        return hash(self.fingerprint())
+
+    def _fields(self) -> List[Any]:
+        """Return the values the node is made of, in the order its repr shows them."""
+        return [self.token, self.children]
+
+    def fingerprint(self) -> bytes:
+        """Return a digest of the node's structure, computed once for the whole subtree.
+
+        Nodes that differ only in where they are in a template, e.g. the same
+        config() call in two models, have the same fingerprint, so identical
+        subtrees can be found and deduplicated by it. Lazy bodies are parsed.
+        """
+        fingerprint = self._fingerprint
+        if fingerprint is None:
+            fingerprint = _fingerprint(self)
+        return fingerprint
+
+    def pretty_repr(self, indent: int = 0) -> str:
         """Recursively generate a pretty representation of the node."""
         ind = '    ' * indent  # 4 spaces per indent level
         token_repr = repr(self.token)
@@ -172,12 +390,15 @@ class Node:
         else:
             return f"{ind}{self.__class__.__name__}({token_repr}, [])"
 
-    def _child_repr(self, child, indent):
+    def _child_repr(self, child: Any, indent: int) -> str:
         """Helper method to represent a child."""
         ind = '    ' * indent
         if isinstance(child, Node):
             return child.pretty_repr(indent)
         elif isinstance(child, list):
+            if isinstance(child, LazyBlock):
+                # Compiled, the list operations below bypass LazyBlock's own
+                child._load()
             if not child:
                 return f"{ind}[]"
             list_repr = ',\n'.join(self._child_repr(
@@ -198,15 +419,20 @@ class Expression(Node):
 # class IfStatement(Statement):
 #     pass
 class ConditionBlock(Node):
-    def __init__(self, open_token, condition, close_token, block):
+    def __init__(self, open_token: Token, condition: Optional[Node], close_token: Token, block: List[Any]) -> None:
         super().__init__(Token.EMPTY)
         self.open_token = open_token
         self.condition = condition
         self.close_token = close_token
         self.block = block
 
-    def __repr__(self):
-        # print(self)
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return ConditionBlock, (self.open_token, self.condition, self.close_token, self.block)
+
+    def _fields(self) -> List[Any]:
+        return [self.open_token, self.condition, self.close_token, self.block]
+
+    def __repr__(self) -> str:
         return (f"ConditionBlock(\n"
                 f"    {repr(self.open_token)},\n"
                 f"    {repr(self.condition)},\n"
@@ -216,13 +442,19 @@ class ConditionBlock(Node):
 
 
 class IfStatement(Node):
-    def __init__(self, clauses, endif_token, close_token):
+    def __init__(self, clauses: List[ConditionBlock], endif_token: Optional[Token], close_token: Token) -> None:
         super().__init__(Token.EMPTY)
         self.clauses = clauses  # List of ConditionBlock or simple else clause
         self.endif_token = endif_token
         self.close_token = close_token
 
-    def __repr__(self):
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return IfStatement, (self.clauses, self.endif_token, self.close_token)
+
+    def _fields(self) -> List[Any]:
+        return [self.clauses, self.endif_token, self.close_token]
+
+    def __repr__(self) -> str:
         clauses_repr = ',\n'.join(repr(clause) for clause in self.clauses)
         return (f"IfStatement(\n"
                 f"    [\n{clauses_repr}\n    ],\n"
@@ -282,38 +514,187 @@ class AttributeAccess(Node):
 class IndexAccess(Node):
     pass
 
+# Statements with a body, and the tag that ends it
+BLOCK_STATEMENTS = {'if': 'endif', 'for': 'endfor', 'macro': 'endmacro', 'with': 'endwith'}
+BLOCK_ENDS = set(BLOCK_STATEMENTS.values())
+
+
+@mypyc_attr(native_class=False)
+class LazyBlock(List[Any]):
+    """The body of a block statement, parsed from its token range on first use.
+
+    It behaves like the list of nodes Parser.parse_template() returns; every
+    list method, reading or changing it, parses the range once first and
+    keeps the result. A body that turns out not to parse raises SyntaxError
+    on that first use. Only C functions reading list items directly, e.g.
+    str.join() and json.dumps(), see an unparsed body as empty.
+    """
+
+    def __init__(self, tokens: List[Token], start: int, end: int, end_tokens: List[str],
+                 deadline: Optional[float] = None) -> None:
+        super().__init__()
+        self._pending: Optional[Tuple[List[Token], int, int, List[str], Optional[float]]] = (
+            tokens, start, end, end_tokens, deadline)
+        # Threads reading the same tree parse each body once
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        pending = self._pending
+        if pending is None:
+            return
+        with self._lock:
+            # Another thread may have parsed the body while this one waited
+            pending = self._pending
+            if pending is None:
+                return
+            tokens, start, end, end_tokens, deadline = pending
+            parser = Parser(tokens, deadline=deadline, lazy=True, start=start, end=end)
+            block = parser.parse_template(end_tokens=end_tokens)
+            if parser.current_token is not None:
+                raise SyntaxError(f"Unexpected token {parser.current_token}")
+            list.extend(self, block)
+            self._pending = None
+
+    def __reduce_ex__(self, protocol: Any) -> Tuple[Any, ...]:
+        # Copies and pickles are plain lists of the parsed nodes
+        self._load()
+        return list, (list(list.__iter__(self)),)
+
+    def __radd__(self, other: Any) -> Any:
+        # list.__add__ reads the items of a list subclass directly, so [] + block needs this
+        if not isinstance(other, list):
+            return NotImplemented
+        self._load()
+        return other + list(list.__iter__(self))
+
+
+def _load_then(name: str) -> Callable[..., Any]:
+    method = getattr(list, name)
+
+    def load_then(self: LazyBlock, *args: Any) -> Any:
+        self._load()
+        return method(self, *args)
+    load_then.__name__ = name
+    return load_then
+
+
+# Every method of list, since the ones changing the list must act on the parsed nodes too
+for _name in ('__len__', '__iter__', '__reversed__', '__getitem__', '__contains__', '__eq__', '__ne__',
+              '__lt__', '__le__', '__gt__', '__ge__', '__add__', '__mul__', '__rmul__', '__iadd__', '__imul__',
+              '__setitem__', '__delitem__', '__repr__', '__sizeof__', 'index', 'count', 'copy', 'append',
+              'extend', 'insert', 'pop', 'remove', 'reverse', 'sort', 'clear'):
+    setattr(LazyBlock, _name, _load_then(_name))
+del _name
+LazyBlock.__hash__ = None
+
+
 class Parser:
-    def __init__(self, tokens):
+    """Parses tokens into a list of nodes.
+
+    With lazy=True, the bodies of if, for, macro and with statements are
+    skipped over and parsed only when first read, as LazyBlocks. The tree
+    they unfold into is the same as an eager parse's.
+
+    Args:
+        tokens: The tokens returned by tokenize().
+        deadline: A time.perf_counter() value after which ParseBudgetExceeded is raised.
+        lazy: Defer parsing block bodies until they are read.
+        start: The index of the first token to parse.
+        end: The index after the last token to parse, defaults to all tokens.
+    """
+    # How many tokens are consumed between two deadline checks
+    DEADLINE_CHECK_INTERVAL: ClassVar[int] = 256
+
+    def __init__(self, tokens: List[Token], deadline: Optional[float] = None, lazy: bool = False, start: int = 0,
+                 end: Optional[int] = None) -> None:
         self.tokens = tokens
-        self.current_token = None
-        self.index = 0
+        self.current_token: Optional[Token] = None
+        self.index = start
+        self.end = len(tokens) if end is None else end
+        self.deadline = deadline
+        self.lazy = lazy
         self.next_token()
 
-    def next_token(self):
-        if self.index < len(self.tokens):
+    def next_token(self) -> None:
+        if self.index < self.end:
             self.current_token = self.tokens[self.index]
             self.index += 1
+            if (self.deadline is not None and self.index % self.DEADLINE_CHECK_INTERVAL == 0
+                    and time.perf_counter() > self.deadline):
+                raise ParseBudgetExceeded(f"parsing stopped at token {self.index} of {len(self.tokens)}")
         else:
             self.current_token = None
 
-    def expect(self, token_type):
+    def parse_block(self, end_tokens: List[str]) -> List[Any]:
+        """Parse the body of a block statement, up to the tag starting with one of end_tokens."""
+        if not self.lazy:
+            return self.parse_template(end_tokens=end_tokens)
+        start = self.index - 1 if self.current_token is not None else self.index
+        end = self.skip_block(start, end_tokens)
+        # Continue at the end tag, as parse_template() would have
+        self.index = end
+        self.next_token()
+        return LazyBlock(self.tokens, start, end, end_tokens, self.deadline)
+
+    def skip_block(self, start: int, end_tokens: List[str]) -> int:
+        """Return the index of the tag that ends a block body starting at start.
+
+        This follows the tags parse_template() would stop at without building
+        nodes: a '{%' followed by one of end_tokens outside any nested block,
+        or a token that cannot start a template element.
+        """
+        tokens = self.tokens
+        depth = 0
+        in_tag = False
+        i = start
+        while i < self.end:
+            if self.deadline is not None and i % self.DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+                raise ParseBudgetExceeded(f"parsing stopped at token {i} of {len(tokens)}")
+            kind = tokens[i].type
+            if in_tag:
+                if kind == 'STM_CLOSE' or kind == 'EXPR_CLOSE':
+                    in_tag = False
+            elif kind == 'STM_OPEN':
+                name = tokens[i + 1].value if i + 1 < self.end and tokens[i + 1].type == 'IDENTIFIER' else None
+                if depth == 0 and name in end_tokens:
+                    return i
+                if name in BLOCK_STATEMENTS:
+                    depth += 1
+                elif name in BLOCK_ENDS:
+                    depth -= 1
+                in_tag = True
+            elif kind == 'EXPR_OPEN':
+                in_tag = True
+            elif kind != 'TEXT' and kind != 'COMMENT':
+                if depth == 0:
+                    return i
+            i += 1
+        return i
+
+    def current(self) -> Token:
+        """Return the current token, raising SyntaxError past the last one."""
+        if self.current_token is None:
+            raise SyntaxError("Unexpected end of template")
+        return self.current_token
+
+    def expect(self, token_type: str) -> Token:
         if self.current_token and self.current_token.type == token_type:
             token = self.current_token
             self.next_token()
             return token
         raise SyntaxError(f"Expected token {token_type}, got {self.current_token}")
 
-    def parse(self):
+    def parse(self) -> List[Any]:
         return self.parse_template()
 
-    def parse_template(self, end_tokens=None):
+    def parse_template(self, end_tokens: Optional[List[str]] = None) -> List[Any]:
         if end_tokens is None:
             end_tokens = []  # Treat None as an empty list
-        elements = []
+        elements: List[Any] = []
         while self.current_token:
             if self.current_token.type == 'STM_OPEN':
                 # Check if there are more tokens to peek at
-                if self.index < len(self.tokens):
+                if self.index < self.end:
                     next_token = self.tokens[self.index]
                     if next_token.type == 'IDENTIFIER' and next_token.value in end_tokens:
                         break
@@ -330,88 +711,71 @@ class Parser:
                 break  # Should not happen, but ensures safety
         return elements
 
-    def next_token(self):
-        if self.index < len(self.tokens):
-            self.current_token = self.tokens[self.index]
-            self.index += 1
-        else:
-            self.current_token = None
-
-    def parse_text(self):
+    def parse_text(self) -> Optional[Node]:
         """Parses contiguous text as a single TEXT node."""
-        text_content = []
-        if self.current_token and self.current_token.type == 'TEXT':
-            start_line = self.current_token.line
-            start_column = self.current_token.column
-            while self.current_token and self.current_token.type == 'TEXT':
-                text_content.append(self.current_token.value)
+        text_content: List[str] = []
+        # A local, since next_token() changes what mypy would take current_token to be
+        token = self.current_token
+        if token and token.type == 'TEXT':
+            start_line = token.line
+            start_column = token.column
+            while token and token.type == 'TEXT':
+                text_content.append(token.value)
                 self.next_token()
+                token = self.current_token
             if text_content:
                 combined_text = ''.join(text_content)
                 return Node(Token('TEXT', combined_text, start_line, start_column))
         return None
 
 
-    def parse_comment(self):
+    def parse_comment(self) -> Node:
         """Parses a comment and returns a Node."""
         start_token = self.expect(
             'COMMENT')  # Expect the '{# ... #}' comment token
         return Node(start_token)
 
-    def expect(self, token_type):
-        if self.current_token and self.current_token.type == token_type:
-            token = self.current_token
-            self.next_token()
-            return token
-        raise SyntaxError(f"Expected token {token_type}, got {self.current_token}")
-
-    def next_token(self):
-        if self.index < len(self.tokens):
-            self.current_token = self.tokens[self.index]
-            self.index += 1
-        else:
-            self.current_token = None
-
-    def peek_next_token(self):
+    def peek_next_token(self) -> Optional[Token]:
         """Peek at the next token without advancing the current position."""
         next_index = self.index + 1
-        if next_index < len(self.tokens):
+        if next_index < self.end:
             return self.tokens[next_index]
         return None
 
-    def peek_next_token2(self):
+    def peek_next_token2(self) -> Optional[Token]:
         """Peek at the next token without advancing the current position."""
         # next_index = self.index + 1
-        if  self.index < len(self.tokens):
+        if  self.index < self.end:
             return self.tokens[self.index]
         return None
-    def parse_statement(self):
-        if self.current_token.type == 'STM_OPEN':
-            open_token = self.current_token
+    def parse_statement(self) -> Node:
+        if self.current().type == 'STM_OPEN':
+            open_token = self.current()
             self.next_token()
-            if self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'if':
+            keyword = self.current()
+            if keyword.type == 'IDENTIFIER' and keyword.value == 'if':
                 return self.parse_if_statement(open_token)
-            elif self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'for':
+            elif keyword.type == 'IDENTIFIER' and keyword.value == 'for':
                 return self.parse_for_statement(open_token)
-            elif self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'set':
+            elif keyword.type == 'IDENTIFIER' and keyword.value == 'set':
                 return self.parse_set_statement(open_token)
-            elif self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'macro':
+            elif keyword.type == 'IDENTIFIER' and keyword.value == 'macro':
                 return self.parse_macro_definition(open_token)
-            elif self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'return':
+            elif keyword.type == 'IDENTIFIER' and keyword.value == 'return':
                 return self.parse_return_statement(open_token)
-            elif self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'do':
+            elif keyword.type == 'IDENTIFIER' and keyword.value == 'do':
                 return self.parse_do_statement(open_token)
-            elif self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'with':
+            elif keyword.type == 'IDENTIFIER' and keyword.value == 'with':
                 return self.parse_with_statement(open_token)
             else:
-                raise SyntaxError(f"Unexpected statement type {self.current_token}")
-        elif self.current_token.type == 'EXPR_OPEN':
+                raise SyntaxError(f"Unexpected statement type {keyword}")
+        elif self.current().type == 'EXPR_OPEN':
             return self.parse_expression_statement()
         else:
             raise SyntaxError(f"Unexpected token {self.current_token}")
 
-    def parse_if_statement(self, open_token):
-        clauses = []
+    def parse_if_statement(self, open_token: Token) -> IfStatement:
+        clauses: List[ConditionBlock] = []
 
         # Parse the main if condition
         if_condition_token = self.expect('IDENTIFIER')  # Expect 'if'
@@ -419,29 +783,29 @@ class Parser:
         if_close_token = self.expect('STM_CLOSE')  # Expect closing '%}'
 
         # Parse the block after the if condition
-        block = self.parse_template(end_tokens=['elif', 'else', 'endif'])
+        block = self.parse_block(['elif', 'else', 'endif'])
         clauses.append(ConditionBlock(open_token, condition, if_close_token, block))
 
         # Parse elif and else clauses
-        open_token = None
+        clause_open_token: Optional[Token] = None
         while self.current_token and self.current_token.type == 'STM_OPEN':
-            open_token = self.current_token
+            clause_open_token = self.current_token
             self.next_token()  # Skip '{%'
 
-            if self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'elif':
+            if self.current().type == 'IDENTIFIER' and self.current().value == 'elif':
                 condition_token = self.expect('IDENTIFIER')  # Expect 'elif'
                 elif_condition = self.parse_expression()
                 elif_close_token = self.expect('STM_CLOSE')  # Expect closing '%}'
-                elif_block = self.parse_template(end_tokens=['elif', 'else', 'endif'])
-                clauses.append(ConditionBlock(open_token, elif_condition, elif_close_token, elif_block))
+                elif_block = self.parse_block(['elif', 'else', 'endif'])
+                clauses.append(ConditionBlock(clause_open_token, elif_condition, elif_close_token, elif_block))
 
-            elif self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'else':
+            elif self.current().type == 'IDENTIFIER' and self.current().value == 'else':
                 condition_token = self.expect('IDENTIFIER')  # Expect 'else'
                 else_close_token = self.expect('STM_CLOSE')  # Expect closing '%}'
-                else_block = self.parse_template(end_tokens=['endif'])
-                clauses.append(ConditionBlock(open_token, None, else_close_token, else_block))
+                else_block = self.parse_block(['endif'])
+                clauses.append(ConditionBlock(clause_open_token, None, else_close_token, else_block))
 
-            elif self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'endif':
+            elif self.current().type == 'IDENTIFIER' and self.current().value == 'endif':
                 # We encountered 'endif', so break out of the loop
                 break
 
@@ -453,20 +817,21 @@ class Parser:
         endif_token = self.expect('IDENTIFIER')  # Expect 'endif'
         close_token = self.expect('STM_CLOSE')
 
-        return IfStatement(clauses, open_token, close_token)
-    def parse_for_statement(self, open_token):
+        return IfStatement(clauses, clause_open_token, close_token)
+
+    def parse_for_statement(self, open_token: Token) -> ForStatement:
         token = self.expect('IDENTIFIER')
         var = self.expect('IDENTIFIER')
         self.expect('IDENTIFIER')  # "in"
         iterable = self.parse_expression()
         for_close_token = self.expect('STM_CLOSE')
-        block = self.parse_template(end_tokens=['endfor'])
+        block = self.parse_block(['endfor'])
         endfor_open_token = self.expect('STM_OPEN')
         self.expect('IDENTIFIER')
         close_token = self.expect('STM_CLOSE')
         return ForStatement(token, [open_token, var, iterable, for_close_token, block, endfor_open_token, close_token])
 
-    def parse_set_statement(self, open_token):
+    def parse_set_statement(self, open_token: Token) -> SetStatement:
         token = self.expect('IDENTIFIER')
         var = self.expect('IDENTIFIER')
         self.expect('ASSIGN')
@@ -474,70 +839,80 @@ class Parser:
         close_token = self.expect('STM_CLOSE')
         return SetStatement(token, [open_token, var, value, close_token])
 
-    def parse_do_statement(self, open_token):
+    def parse_do_statement(self, open_token: Token) -> DoStatement:
         token = self.expect('IDENTIFIER')
         expr = self.parse_expression()
         close_token = self.expect('STM_CLOSE')
         return DoStatement(token, [open_token, expr, close_token])
 
-    def parse_macro_definition(self, open_token):
+    def parse_macro_definition(self, open_token: Token) -> MacroDefinition:
         token = self.expect('IDENTIFIER')
         name = self.expect('IDENTIFIER')
         self.expect('PUNCT')  # "("
-        parameters = []
-        if self.current_token.type != 'PUNCT' or self.current_token.value != ')':
-            parameters.append(self.expect('IDENTIFIER'))
-            while self.current_token.type == 'PUNCT' and self.current_token.value == ',':
+        parameters: List[Union[Token, Tuple[Token, Node]]] = []
+        if self.current().type != 'PUNCT' or self.current().value != ')':
+            parameters.append(self.parse_macro_parameter())
+            while self.current().type == 'PUNCT' and self.current().value == ',':
                 self.next_token()
-                parameters.append(self.expect('IDENTIFIER'))
+                parameters.append(self.parse_macro_parameter())
         self.expect('PUNCT')  # ")"
         macro_end_token = self.expect('STM_CLOSE')
-        block = self.parse_template(end_tokens=['endmacro'])
+        block = self.parse_block(['endmacro'])
         end_macro_open_token = self.expect('STM_OPEN')
         self.expect('IDENTIFIER')
         close_token = self.expect('STM_CLOSE')
         return MacroDefinition(token, [open_token, name, parameters, macro_end_token, block, end_macro_open_token, close_token])
 
-    def parse_return_statement(self, open_token):
+    def parse_macro_parameter(self) -> Union[Token, Tuple[Token, Node]]:
+        """Parse a macro parameter, a name optionally followed by '=' and a default value."""
+        name = self.expect('IDENTIFIER')
+        if self.current().type == 'ASSIGN':
+            self.next_token()
+            # parameters with a default are tuples of (name, default), like named arguments
+            return (name, self.parse_expression())
+        return name
+
+    def parse_return_statement(self, open_token: Token) -> ReturnStatement:
         token = self.expect('IDENTIFIER')
-        if self.current_token.type != 'STM_CLOSE':
+        value: Optional[Node]
+        if self.current().type != 'STM_CLOSE':
             value = self.parse_expression()
         else:
             value = None
         close_token = self.expect('STM_CLOSE')
         return ReturnStatement(token, [open_token, value, close_token])
 
-    def parse_with_statement(self, open_token):
+    def parse_with_statement(self, open_token: Token) -> WithStatement:
         token = self.expect('IDENTIFIER')
         pairs = []
         pairs.append(self.parse_with_pair())
-        while self.current_token.type == 'PUNCT' and self.current_token.value == ',':
+        while self.current().type == 'PUNCT' and self.current().value == ',':
             self.next_token()
             pairs.append(self.parse_with_pair())
         self.expect('STM_CLOSE')
-        block = self.parse_template(end_tokens=['endwith'])
+        block = self.parse_block(['endwith'])
         self.expect('STM_OPEN')
         self.expect('IDENTIFIER')
         close_token = self.expect('STM_CLOSE')
         return WithStatement(token, [open_token, pairs, block, close_token])
 
-    def parse_with_pair(self):
+    def parse_with_pair(self) -> Tuple[Token, Node]:
         var = self.expect('IDENTIFIER')
         self.expect('ASSIGN')
         value = self.parse_expression()
         return (var, value)
 
-    def parse_expression_statement(self):
+    def parse_expression_statement(self) -> Expression:
         open_token = self.expect('EXPR_OPEN')
         expr = self.parse_expression()
         close_token = self.expect('EXPR_CLOSE')
         return Expression(Token.EMPTY, [open_token, expr, close_token])
 
-    def parse_expression(self):
+    def parse_expression(self) -> Node:
         return self.parse_logical_or()
 
-    def parse_logical_or(self):
-        node = self.parse_logical_and()
+    def parse_logical_or(self) -> Node:
+        node: Node = self.parse_logical_and()
         while self.current_token and self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'or':
             op_token = self.current_token
             self.next_token()
@@ -545,9 +920,9 @@ class Parser:
             node = BinaryOp(op_token, [node, right])
         return node
 
-    def parse_logical_and(self):
+    def parse_logical_and(self) -> Node:
 
-        node = self.parse_equality()
+        node: Node = self.parse_equality()
         while self.current_token and self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'and':
             op_token = self.current_token
             self.next_token()
@@ -555,8 +930,8 @@ class Parser:
             node = BinaryOp(op_token, [node, right])
         return node
 
-    def parse_equality(self):
-        node = self.parse_comparison()
+    def parse_equality(self) -> Node:
+        node: Node = self.parse_comparison()
         while self.current_token and self.current_token.type == 'COMPARE' and self.current_token.value in ('==', '!='):
             op_token = self.current_token
             self.next_token()
@@ -564,8 +939,8 @@ class Parser:
             node = BinaryOp(op_token, [node, right])
         return node
 
-    def parse_comparison(self):
-        node = self.parse_arithmetic()
+    def parse_comparison(self) -> Node:
+        node: Node = self.parse_arithmetic()
         while self.current_token and self.current_token.type == 'COMPARE' and self.current_token.value in ('>', '<', '>=', '<='):
             op_token = self.current_token
             self.next_token()
@@ -573,9 +948,9 @@ class Parser:
             node = BinaryOp(op_token, [node, right])
         return node
 
-    def parse_arithmetic(self):
+    def parse_arithmetic(self) -> Node:
 
-        node = self.parse_term()
+        node: Node = self.parse_term()
         while self.current_token and self.current_token.type == 'OP' and self.current_token.value in ('+', '-'):
             op_token = self.current_token
             self.next_token()
@@ -583,9 +958,9 @@ class Parser:
             node = BinaryOp(op_token, [node, right])
         return node
 
-    def parse_term(self):
+    def parse_term(self) -> Node:
 
-        node = self.parse_factor()
+        node: Node = self.parse_factor()
         while self.current_token and self.current_token.type == 'OP' and self.current_token.value in ('*', '/', '%'):
             op_token = self.current_token
             self.next_token()
@@ -593,25 +968,27 @@ class Parser:
             node = BinaryOp(op_token, [node, right])
         return node
 
-    def parse_factor(self):
+    def parse_factor(self) -> Node:
         # Handle unary operators: '-' and 'not'
-        if (self.current_token.type == 'OP' and self.current_token.value == '-') or \
-                (self.current_token.type == 'IDENTIFIER' and self.current_token.value == 'not'):
-            op_token = self.current_token
+        op_token = self.current()
+        if (op_token.type == 'OP' and op_token.value == '-') or \
+                (op_token.type == 'IDENTIFIER' and op_token.value == 'not'):
             self.next_token()
             right = self.parse_factor()  # Recursively parse the next factor
             return UnaryOp(op_token, [right])
 
         return self.parse_primary()
 
-    def parse_primary(self):
+    def parse_primary(self) -> Node:
+        if self.current_token is None:
+            raise SyntaxError("Unexpected token in primary expression: None")
         token = self.current_token
         if token.type == 'NUMBER' or token.type == 'STRING':
             self.next_token()
             return Literal(token)
         elif token.type == 'IDENTIFIER':
             self.next_token()
-            node = Variable(token)
+            node: Node = Variable(token)
             while self.current_token and self.current_token.type == 'PUNCT':
                 if self.current_token.value == '.':
                     node = self.parse_attribute_access(node)
@@ -635,25 +1012,25 @@ class Parser:
             raise SyntaxError(
                 f"Unexpected token in primary expression: {token}")
 
-    def parse_attribute_access(self, base):
+    def parse_attribute_access(self, base: Node) -> AttributeAccess:
         """Parse object field access."""
         self.expect('PUNCT')  # Expecting '.'
         field = self.expect('IDENTIFIER')
         return AttributeAccess(Token.EMPTY, [base, field])
 
-    def parse_index_access(self, base):
+    def parse_index_access(self, base: Node) -> IndexAccess:
         """Parse array index access."""
         self.expect('PUNCT')  # Expecting '['
         index = self.parse_expression()
         self.expect('PUNCT')  # Expecting ']'
         return IndexAccess(Token.EMPTY, [base, index])
 
-    def parse_function_call(self, base):
+    def parse_function_call(self, base: Node) -> FunctionCall:
         self.expect('PUNCT')  # Expecting '('
-        args = []
-        if self.current_token.type != 'PUNCT' or self.current_token.value != ')':
+        args: List[Any] = []
+        if self.current().type != 'PUNCT' or self.current().value != ')':
             args.append(self.parse_argument())
-            while self.current_token.type == 'PUNCT' and self.current_token.value == ',':
+            while self.current().type == 'PUNCT' and self.current().value == ',':
                 self.next_token()
                 args.append(self.parse_argument())
         self.expect('PUNCT')  # Expecting ')'
@@ -662,13 +1039,13 @@ class Parser:
         return FunctionCall(Token.EMPTY,args)
 
 
-    def parse_argument(self):
+    def parse_argument(self) -> Union[Node, Tuple[Token, Node]]:
         """Parse an argument, which can be either positional or named."""
-        if self.current_token.type == 'IDENTIFIER':
+        if self.current().type == 'IDENTIFIER':
             # Peek ahead to see if this is a named argument
             next_token = self.peek_next_token2()
             if next_token and next_token.type == 'ASSIGN':
-                name_token = self.current_token
+                name_token = self.current()
                 self.next_token()  # Skip the identifier
                 self.next_token()  #Skip the '='
                 value = self.parse_expression()
@@ -679,32 +1056,32 @@ class Parser:
 
 
 
-    def parse_list_literal(self):
+    def parse_list_literal(self) -> Literal:
         token = self.expect('PUNCT')  # Expecting '['
-        elements = []
-        if self.current_token.type != 'PUNCT' or self.current_token.value != ']':
+        elements: List[Any] = []
+        if self.current().type != 'PUNCT' or self.current().value != ']':
             elements.append(self.parse_expression())
-            while self.current_token.type == 'PUNCT' and self.current_token.value == ',':
+            while self.current().type == 'PUNCT' and self.current().value == ',':
                 self.next_token()
                 elements.append(self.parse_expression())
         self.expect('PUNCT')  # Expecting ']'
         return Literal(token, elements)
 
-    def parse_object_literal(self):
+    def parse_object_literal(self) -> Literal:
         token = self.expect('PUNCT')  # Expecting '{'
-        pairs = []
-        if self.current_token.type != 'PUNCT' or self.current_token.value != '}':
+        pairs: List[Any] = []
+        if self.current().type != 'PUNCT' or self.current().value != '}':
             pairs.append(self.parse_key_value_pair())
-            while self.current_token.type == 'PUNCT' and self.current_token.value == ',':
+            while self.current().type == 'PUNCT' and self.current().value == ',':
                 self.next_token()
                 pairs.append(self.parse_key_value_pair())
         self.expect('PUNCT')  # Expecting '}'
         return Literal(token, pairs)
 
-    def parse_key_value_pair(self):
+    def parse_key_value_pair(self) -> Tuple[Token, Node]:
         # Keys can be either IDENTIFIER or STRING
-        if self.current_token.type in ('IDENTIFIER', 'STRING'):
-            key = self.current_token
+        if self.current().type in ('IDENTIFIER', 'STRING'):
+            key = self.current()
             self.next_token()
         else:
             raise SyntaxError(f"Unexpected token {self.current_token}, expected IDENTIFIER or STRING as key")
@@ -713,33 +1090,134 @@ class Parser:
         value = self.parse_expression()
         return (key, value)
 
-    def extract_dbt_calls(code):
-        tree = self.parse_code(code)
-        config_calls, source_calls, ref_calls = walk_ast(tree)
-        return config_calls, source_calls, ref_calls
 
-def test_expression():
-    code = "arr[0].b()"
-    tokens = tokenize("{{" + code + "}}")
-    for token in tokens:
-        token.column -= 2
-        print(token)
-    expression_node = Parser(tokens).parse()[0]  # Get the Expression node
-    print(expression_node)
+def _node_items(node: Node) -> List[Any]:
+    """Return the values a node holds that may contain further nodes."""
+    if isinstance(node, IfStatement):
+        return node.clauses
+    if isinstance(node, ConditionBlock):
+        return [node.condition, node.block]
+    return node.children
+
+
+def _equal(left: Node, right: Node) -> bool:
+    # Iterative, so deep trees compare without recursing, and stopping at the first difference
+    stack: List[Tuple[Any, Any]] = [(left, right)]
+    while stack:
+        a, b = stack.pop()
+        if a is b:
+            continue
+        if isinstance(a, Node):
+            if type(a) is not type(b):
+                return False
+            # Different structures cannot be equal, whatever their positions
+            if a._fingerprint is not None and b._fingerprint is not None and a._fingerprint != b._fingerprint:
+                return False
+            stack.append((a._fields(), b._fields()))
+        elif isinstance(a, Token):
+            if (not isinstance(b, Token) or a.value != b.value or a.type != b.type or a.line != b.line
+                    or a.column != b.column):
+                return False
+        elif isinstance(a, (list, tuple)):
+            if not isinstance(b, (list, tuple)) or isinstance(a, list) != isinstance(b, list):
+                return False
+            for block in (a, b):
+                if isinstance(block, LazyBlock):
+                    block._load()
+            if len(a) != len(b):
+                return False
+            stack.extend(zip(a, b))
+        elif not a == b:
+            return False
+    return True
+
+
+def _update(digest: Any, value: Any) -> None:
+    """Add a field of a node whose child nodes already have their fingerprints to digest."""
+    if isinstance(value, Node):
+        digest.update(b'N')
+        digest.update(value.fingerprint())
+    elif isinstance(value, Token):
+        # Positions are left out, so the same code anywhere has the same fingerprint
+        type_ = value.type.encode('utf-8', 'surrogatepass')
+        text = value.value.encode('utf-8', 'surrogatepass')
+        digest.update(b'T%d:%d:' % (len(type_), len(text)))
+        digest.update(type_)
+        digest.update(text)
+    elif isinstance(value, (list, tuple)):
+        if isinstance(value, LazyBlock):
+            value._load()
+        digest.update(b'%s%d:' % (b'L' if isinstance(value, list) else b'U', len(value)))
+        for item in value:
+            _update(digest, item)
+    elif value is None:
+        digest.update(b'0')
+    else:
+        text = repr(value).encode('utf-8', 'surrogatepass')
+        digest.update(b'R%d:' % len(text))
+        digest.update(text)
+
+
+def _child_nodes(node: Node) -> List[Node]:
+    """Return the nodes directly below a node, without descending into them."""
+    children: List[Node] = []
+    stack: List[Any] = node._fields()
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Node):
+            children.append(item)
+        elif isinstance(item, (list, tuple)):
+            if isinstance(item, LazyBlock):
+                item._load()
+            stack.extend(item)
+    return children
+
+
+def _fingerprint(root: Node) -> bytes:
+    # Bottom-up: a node is hashed once the nodes below it are, each only once
+    stack: List[Tuple[Node, bool]] = [(root, False)]
+    while stack:
+        node, ready = stack.pop()
+        if node._fingerprint is not None:
+            continue
+        if not ready:
+            stack.append((node, True))
+            stack.extend((child, False) for child in _child_nodes(node) if child._fingerprint is None)
+            continue
+        digest = blake2b(type(node).__name__.encode('utf-8'), digest_size=16)
+        for field in node._fields():
+            _update(digest, field)
+        # Threads racing here compute and store the same value
+        node._fingerprint = digest.digest()
+    fingerprint = root._fingerprint
+    assert fingerprint is not None
+    return fingerprint
+
+
+def iter_nodes(trees: Any) -> Iterator[Node]:
+    """Yield every node reachable from trees in document order.
+
+    Unlike a walk over ``children`` this also descends into nested lists and
+    tuples (blocks, named arguments) and into if/elif/else clauses.
+    """
+    stack: List[Any] = [trees]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Node):
+            yield item
+            stack.append(_node_items(item))
+        elif isinstance(item, (list, tuple)):
+            if isinstance(item, LazyBlock):
+                item._load()
+            stack.extend(reversed(item))
 
 
-def test_statement():
-    code = "{% if x > 10 %}High{% elif x > 5 %}Medium{% else %}Low{% endif %}"
-    tokens = tokenize(code)
-    for token in tokens:
-        print(token)
-    parser = Parser(tokens)
-    tree = parser.parse()
-    print(tree)
+def count_nodes(trees: Any) -> int:
+    """Count the nodes reachable from trees."""
+    return sum(1 for _ in iter_nodes(trees))
 
-test_statement()
 
-def extract_dbt_calls(code):
+def extract_dbt_calls(code: str) -> Tuple[List[FunctionCall], List[FunctionCall], List[FunctionCall]]:
     """Parse the input string and return lists of config, source, and ref calls.
     Args:
         code: A string containing the Jinja2 template code.
@@ -748,21 +1226,26 @@ def extract_dbt_calls(code):
     """
     # Step 1: Tokenize and parse the code
     tokens = tokenize(code)
-    for token in tokens:
-        print(token)
     parser = Parser(tokens)
-    trees = parser.parse() # Assuming parse() returns a list of nodes
+    trees = parser.parse()
 
     # Step 2: Walk the AST and collect the desired calls
-    config_calls = []
-    source_calls = []
-    ref_calls = []
+    return collect_dbt_calls(trees)
 
-    def walk_ast(node):
-        if node is None:
-            return
 
-        if isinstance(node, FunctionCall):
+def collect_dbt_calls(trees: List[Any]) -> Tuple[List[FunctionCall], List[FunctionCall], List[FunctionCall]]:
+    """Return lists of config, source, and ref calls found in already parsed trees.
+    Args:
+        trees: The list of nodes returned by Parser.parse().
+    Returns:
+        A tuple of three lists: (config_calls, source_calls, ref_calls)
+    """
+    config_calls: List[FunctionCall] = []
+    source_calls: List[FunctionCall] = []
+    ref_calls: List[FunctionCall] = []
+
+    for node in iter_nodes(trees):
+        if isinstance(node, FunctionCall) and isinstance(node.children[0], Variable):
             func_name = node.children[0].token.value
             if func_name == 'config':
                 config_calls.append(node)
@@ -771,23 +1254,4 @@ def extract_dbt_calls(code):
             elif func_name == 'ref':
                 ref_calls.append(node)
 
-        for child in node.children:
-            if isinstance(child, Node):
-                walk_ast(child)
-    for tree in trees:
-        walk_ast(tree)
-
     return config_calls, source_calls, ref_calls
-
-def test_extract_dbt_calls(): 
-        code = """
-        {{ config(materialization = 'view') }}
-        {{ source('my_source', 'my_table') }}
-        {{ ref('my_model') }}
-        """
-        config_calls, source_calls, ref_calls = extract_dbt_calls(code)
-        print(config_calls)
-        print(source_calls)
-        print(ref_calls)
-
-# test_extract_dbt_calls() 
\ No newline at end of file
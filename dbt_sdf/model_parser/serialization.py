@@ -0,0 +1,251 @@
+import hashlib
+import marshal
+import struct
+import sys
+from array import array
+
+from dbt_sdf.model_parser.parser import (
+    AttributeAccess,
+    BinaryOp,
+    ConditionBlock,
+    DoStatement,
+    Expression,
+    ForStatement,
+    FunctionCall,
+    IfStatement,
+    IndexAccess,
+    LazyBlock,
+    Literal,
+    MacroDefinition,
+    Node,
+    ReturnStatement,
+    SetStatement,
+    Statement,
+    Token,
+    UnaryOp,
+    Variable,
+    WithStatement,
+)
+
+MAGIC = b'dbt-sdf'
+# Bump when the layout below, or the fields of a node class, change
+FORMAT_VERSION = 2
+# After MAGIC: the format version, then the length and blake2b digest of the
+# marshalled body, checked before it is loaded since marshal can fail in
+# worse ways than ValueError, e.g. MemoryError, on corrupt data
+_HEADER = struct.Struct('<HQ16s')
+_DIGEST_SIZE = 16
+
+# Node kinds by their index in the format; new classes are appended
+NODE_CLASSES = (
+    Node, Statement, Expression, ConditionBlock, IfStatement, ForStatement, SetStatement, MacroDefinition,
+    ReturnStatement, DoStatement, WithStatement, FunctionCall, Literal, Variable, BinaryOp, UnaryOp,
+    AttributeAccess, IndexAccess,
+)
+_KINDS = {cls: kind for kind, cls in enumerate(NODE_CLASSES)}
+# The number of values each kind is made of, the arguments its class is created with
+_FIELD_COUNTS = tuple({ConditionBlock: 4, IfStatement: 3}.get(cls, 2) for cls in NODE_CLASSES)
+
+# The operations a tree is written as, in document order. A node is
+# followed by its fields, a list or tuple by its length and then its items.
+_NONE, _TOKEN, _LIST, _TUPLE, _NODE = range(5)
+
+
+def _pack(values):
+    """Return the smallest array typecode holding values, and the values as little-endian bytes."""
+    largest = max(values, default=0)
+    typecode = 'B' if largest < 1 << 8 else 'H' if largest < 1 << 16 else 'I'
+    packed = array(typecode, values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return typecode, packed.tobytes()
+
+
+def _unpack(typecode, data):
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return unpacked
+
+
+def _encode_tokens(tokens):
+    # Types and values repeat a lot, so both are indices into one table of strings
+    strings, string_index = [], {}
+    types, values, lines, columns = [], [], [], []
+    for token in tokens:
+        for string, indices in ((token.type, types), (token.value, values)):
+            index = string_index.get(string)
+            if index is None:
+                index = string_index[string] = len(strings)
+                strings.append(string)
+            indices.append(index)
+        lines.append(token.line)
+        columns.append(token.column)
+    return strings, _pack(types), _pack(values), _pack(lines), _pack(columns)
+
+
+def _decode_tokens(section):
+    strings, types, values, lines, columns = section
+    tokens = []
+    for type_, value, line, column in zip(*(_unpack(*packed) for packed in (types, values, lines, columns))):
+        if strings[type_] == 'EMPTY':
+            tokens.append(Token.EMPTY)
+        else:
+            tokens.append(Token(strings[type_], strings[value], line, column))
+    return tokens
+
+
+def _digest(body):
+    return hashlib.blake2b(body, digest_size=_DIGEST_SIZE).digest()
+
+
+def _dumps(kind, payload):
+    body = marshal.dumps((kind, payload), 4)
+    return MAGIC + _HEADER.pack(FORMAT_VERSION, len(body), _digest(body)) + body
+
+
+def _loads(data, kind):
+    if not data.startswith(MAGIC):
+        raise ValueError("Not serialized by dbt_sdf.model_parser.serialization")
+    try:
+        version, length, digest = _HEADER.unpack_from(data, len(MAGIC))
+    except struct.error as e:
+        raise ValueError(f"Corrupt serialized {kind}: {e}") from e
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Serialized in format {version}, this version reads format {FORMAT_VERSION}")
+    body = memoryview(data)[len(MAGIC) + _HEADER.size:]
+    if len(body) != length:
+        raise ValueError(f"Corrupt serialized {kind}: {len(body)} bytes, expected {length}")
+    if _digest(body) != digest:
+        raise ValueError(f"Corrupt serialized {kind}: checksum mismatch")
+    try:
+        found_kind, payload = marshal.loads(body)
+    except (EOFError, TypeError, ValueError) as e:
+        raise ValueError(f"Corrupt serialized {kind}: {e}") from e
+    if found_kind != kind:
+        raise ValueError(f"Serialized {found_kind}, not {kind}")
+    return payload
+
+
+def dumps_tokens(tokens):
+    """Serialize a list of tokens, as tokenize() returns, to bytes.
+
+    Token types, values, lines and columns are stored as flat arrays with
+    marshal, which is several times smaller and faster to load than a pickle.
+    A checksum of the data is stored with it, so corruption is detected
+    before anything is loaded.
+    """
+    return _dumps('tokens', _encode_tokens(tokens))
+
+
+def loads_tokens(data):
+    """Return the tokens serialized by dumps_tokens().
+
+    Like pickle and marshal, only load data from a trusted source.
+
+    Raises:
+        ValueError: If data was not written by dumps_tokens() in this format version.
+    """
+    try:
+        return _decode_tokens(_loads(data, 'tokens'))
+    except (IndexError, TypeError) as e:
+        raise ValueError(f"Corrupt serialized tokens: {e}") from e
+
+
+def dumps_trees(trees):
+    """Serialize parsed trees, e.g. the nodes Parser.parse() returns, to bytes.
+
+    The trees are written as a flat array of operations in document order,
+    with tokens stored as by dumps_tokens(). A token held in several places
+    is stored once. Lazy bodies are parsed first.
+
+    Raises:
+        TypeError: If the trees hold a value that is not a node, token, list, tuple or None.
+    """
+    tokens, token_index = [], {}
+    ops = []
+    stack = [trees]
+    while stack:
+        value = stack.pop()
+        if value is None:
+            ops.append(_NONE)
+        elif isinstance(value, Token):
+            # By identity, so tokens shared in the trees are shared once loaded
+            index = token_index.get(id(value))
+            if index is None:
+                index = token_index[id(value)] = len(tokens)
+                tokens.append(value)
+            ops += (_TOKEN, index)
+        elif isinstance(value, Node):
+            kind = _KINDS.get(type(value))
+            if kind is None:
+                raise TypeError(f"Cannot serialize {type(value).__name__} nodes")
+            ops.append(_NODE + kind)
+            stack.extend(reversed(value._fields()))
+        elif isinstance(value, (list, tuple)):
+            if isinstance(value, LazyBlock):
+                value._load()
+            ops += (_LIST if isinstance(value, list) else _TUPLE, len(value))
+            stack.extend(reversed(value))
+        else:
+            raise TypeError(f"Cannot serialize {type(value).__name__} values in trees")
+    return _dumps('trees', (_encode_tokens(tokens), _pack(ops)))
+
+
+def loads_trees(data):
+    """Return the trees serialized by dumps_trees(), equal to the ones dumped.
+
+    Like pickle and marshal, only load data from a trusted source.
+
+    Raises:
+        ValueError: If data was not written by dumps_trees() in this format version.
+    """
+    try:
+        token_section, packed_ops = _loads(data, 'trees')
+        return _decode_trees(_unpack(*packed_ops), _decode_tokens(token_section))
+    except (IndexError, TypeError) as e:
+        raise ValueError(f"Corrupt serialized trees: {e}") from e
+
+
+def _decode_trees(ops, tokens):
+    # Iterative, so deep trees load without recursing. Each frame is a node
+    # class, or _LIST or _TUPLE, with the number of values it still expects.
+    frames = []
+    pos = 0
+    while True:
+        op = ops[pos]
+        pos += 1
+        if op == _NONE:
+            value = None
+        elif op == _TOKEN:
+            value = tokens[ops[pos]]
+            pos += 1
+        elif op in (_LIST, _TUPLE):
+            length = ops[pos]
+            pos += 1
+            if length:
+                frames.append((op, length, []))
+                continue
+            value = [] if op == _LIST else ()
+        else:
+            frames.append((NODE_CLASSES[op - _NODE], _FIELD_COUNTS[op - _NODE], []))
+            continue
+
+        # Hand the value to the enclosing frames, completing the ones that are full
+        while frames:
+            kind, length, items = frames[-1]
+            items.append(value)
+            if len(items) < length:
+                break
+            frames.pop()
+            if kind == _LIST:
+                value = items
+            elif kind == _TUPLE:
+                value = tuple(items)
+            else:
+                value = kind(*items)
+        if not frames:
+            if pos != len(ops):
+                raise ValueError("Corrupt serialized trees: trailing data")
+            return value
@@ -0,0 +1,122 @@
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Return the peak resident set size of this process, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    """Render an allocation site relative to sys.path so reports diff cleanly across machines."""
+    filename = frame.filename
+    for entry in sorted((p for p in sys.path if p), key=len, reverse=True):
+        prefix = os.path.join(os.path.abspath(entry), "")
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    return f"{filename}:{frame.lineno}"
+
+
+class MemoryProfiler:
+    """Attributes memory to the phases of a migration using tracemalloc snapshots.
+
+    Call ``start()`` before the first phase and ``snapshot()`` at the end of each
+    phase. Every snapshot is compared to the previous one, so the bytes a phase
+    leaves behind are attributed to that phase together with its top
+    allocating sites.
+    """
+
+    def __init__(self, top_n: int = 20, frames: int = 1):
+        self.top_n = top_n
+        self.frames = frames
+        self.phases: List[Dict[str, Any]] = []
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    def start(self):
+        tracemalloc.start(self.frames)
+        self._previous = self._take_snapshot()
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ])
+
+    def snapshot(self, phase: str, models: int = 0, **counts: int) -> Dict[str, Any]:
+        """Record the end of a phase.
+
+        Args:
+            phase: The name of the phase that just finished.
+            models: The number of models the phase worked on.
+            counts: Sizes of the structures the phase built, e.g. ``tokens=...``.
+        Returns:
+            The recorded phase entry.
+        """
+        snapshot = self._take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        stats = snapshot.compare_to(self._previous, "lineno")
+        retained = sum(stat.size_diff for stat in stats)
+
+        structures = {}
+        for name, total in counts.items():
+            structures[name] = {
+                "total": total,
+                "per_model": total / models if models else None,
+                "retained_bytes_each": retained / total if total else None,
+            }
+
+        entry = {
+            "phase": phase,
+            "models": models,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "retained_bytes": retained,
+            "retained_bytes_per_model": retained / models if models else None,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "structures": structures,
+            "top_sites": [
+                {
+                    "site": _site(stat.traceback[0]),
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:self.top_n]
+            ],
+        }
+        self.phases.append(entry)
+        self._previous = snapshot
+        return entry
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "python": platform.python_version(),
+            "platform": sys.platform,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "traced_peak_bytes": max((p["traced_peak_bytes"] for p in self.phases), default=0),
+            "phases": self.phases,
+        }
+
+    def write(self, path: str):
+        """Write the report as JSON with sorted keys so runs can be diffed."""
+        with open(path, "w") as report_file:
+            json.dump(self.report(), report_file, indent=2, sort_keys=True)
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Iterable, List
+
+
+@dataclass
+class ModelTiming:
+    """Wall-clock time spent on one model in each static migration stage."""
+    unique_id: str
+    path: str
+    size_bytes: int
+    tokens: int = 0
+    tokenize_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    extract_seconds: float = 0.0
+    # Spent rendering the model through dbt after it fell back, not part of total_seconds
+    render_seconds: float = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        return self.tokenize_seconds + self.parse_seconds + self.extract_seconds
+
+
+def slowest_models(timings: Iterable[ModelTiming], n: int = 10) -> List[ModelTiming]:
+    """Return the n models that took longest, slowest first."""
+    return sorted(timings, key=lambda timing: timing.total_seconds, reverse=True)[:n]
+
+
+def format_slowest_models(timings: Iterable[ModelTiming], n: int = 10) -> str:
+    """Render the n slowest models as a plain-text table."""
+    header = f"{'total s':>9} {'tokenize':>9} {'parse':>9} {'extract':>9} {'bytes':>10} {'tokens':>8}  model"
+    lines = [f"Slowest {n} models:", header]
+    for timing in slowest_models(timings, n):
+        lines.append(
+            f"{timing.total_seconds:9.4f} {timing.tokenize_seconds:9.4f} {timing.parse_seconds:9.4f} "
+            f"{timing.extract_seconds:9.4f} {timing.size_bytes:10d} {timing.tokens:8d}  {timing.path}"
+        )
+    return "\n".join(lines)
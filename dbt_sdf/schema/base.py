@@ -1,6 +1,62 @@
+from enum import Enum
+
 from pydantic import BaseModel as _BaseModel
 
 class BaseModel(_BaseModel):
     class Config:
         arbitrary_types_allowed = True
         extra = 'forbid'
+
+
+class Mirror:
+    """Base class of the plain __slots__ mirrors in generated/mirrors.py.
+
+    Mirrors hold the same fields as their pydantic model but do no validation,
+    so the migration can build them cheaply and convert to the model only when
+    it validates or serializes.
+    """
+    __slots__ = ()
+
+    # Set by each generated mirror
+    __model__ = None
+    __aliases__ = {}
+
+    def to_dict(self):
+        """Return the fields that are set, keyed by alias, like model_dump(mode='json', by_alias=True)."""
+        data = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                data[self.__aliases__.get(name, name)] = _plain(value)
+        return data
+
+    def to_model(self, validate=True):
+        """Convert to the pydantic model, validating unless the data is known to be valid."""
+        if validate:
+            return self.__model__.model_validate(self.to_dict())
+        from dbt_sdf.schema.validation import construct
+        return construct(self.__model__, self.to_dict())
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__
+                           if getattr(self, name) is not None)
+        return f'{type(self).__name__}({fields})'
+
+
+def _plain(value):
+    if isinstance(value, Mirror):
+        return value.to_dict()
+    if isinstance(value, _BaseModel):
+        return value.model_dump(mode='json', by_alias=True, exclude_none=True)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
@@ -0,0 +1,298 @@
+# generated by scripts/generate_mirrors.py from models.py, do not edit
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Union
+
+from dbt_sdf.schema.base import Mirror
+from dbt_sdf.schema.generated import models
+
+
+class Table(Mirror):
+    """Plain mirror of models.Table."""
+
+    __slots__ = (
+        'name',
+        'description',
+        'dialect',
+        'materialization',
+        'purpose',
+        'origin',
+        'exists_remotely',
+        'table_location',
+        'creation_flags',
+        'incremental_options',
+        'snapshot_options',
+        'dependencies',
+        'depended_on_by',
+        'columns',
+        'partitioned_by',
+        'severity',
+        'tests',
+        'schedule',
+        'starting',
+        'classifiers',
+        'reclassify',
+        'lineage',
+        'location',
+        'file_format',
+        'with_header',
+        'delimiter',
+        'compression',
+        'cycle_cut_point',
+        'source_locations',
+        'sealed',
+        'meta',
+    )
+    __model__ = models.Table
+    __aliases__ = {
+        'exists_remotely': 'exists-remotely',
+        'table_location': 'table-location',
+        'creation_flags': 'creation-flags',
+        'incremental_options': 'incremental-options',
+        'snapshot_options': 'snapshot-options',
+        'depended_on_by': 'depended-on-by',
+        'partitioned_by': 'partitioned-by',
+        'file_format': 'file-format',
+        'with_header': 'with-header',
+        'cycle_cut_point': 'cycle-cut-point',
+        'source_locations': 'source-locations',
+    }
+
+    name: str
+    description: Optional[str]
+    dialect: Optional[models.Dialect]
+    materialization: Optional[Union[models.Materialization, models.Materialization10]]
+    purpose: Optional[models.TablePurpose]
+    origin: Optional[models.TableOrigin]
+    exists_remotely: Optional[bool]
+    table_location: Optional[models.TableLocation]
+    creation_flags: Optional[models.TableCreationFlags]
+    incremental_options: Optional[models.IncrementalOptions]
+    snapshot_options: Optional[models.SnapshotOptions]
+    dependencies: Optional[List[str]]
+    depended_on_by: Optional[List[str]]
+    columns: Optional[List[Column]]
+    partitioned_by: Optional[List[Partition]]
+    severity: Optional[models.Severity]
+    tests: Optional[List[Constraint]]
+    schedule: Optional[str]
+    starting: Optional[str]
+    classifiers: Optional[List[str]]
+    reclassify: Optional[List[models.Reclassify]]
+    lineage: Optional[Lineage]
+    location: Optional[str]
+    file_format: Optional[models.FileFormat]
+    with_header: Optional[bool]
+    delimiter: Optional[str]
+    compression: Optional[models.CompressionType]
+    cycle_cut_point: Optional[bool]
+    source_locations: Optional[List[models.FilePath]]
+    sealed: Optional[bool]
+    meta: Optional[Dict[str, str]]
+
+    def __init__(
+        self,
+        name,
+        *,
+        description=None,
+        dialect=None,
+        materialization=None,
+        purpose=None,
+        origin=None,
+        exists_remotely=None,
+        table_location=None,
+        creation_flags=None,
+        incremental_options=None,
+        snapshot_options=None,
+        dependencies=None,
+        depended_on_by=None,
+        columns=None,
+        partitioned_by=None,
+        severity=None,
+        tests=None,
+        schedule=None,
+        starting=None,
+        classifiers=None,
+        reclassify=None,
+        lineage=None,
+        location=None,
+        file_format=None,
+        with_header=None,
+        delimiter=None,
+        compression=None,
+        cycle_cut_point=None,
+        source_locations=None,
+        sealed=None,
+        meta=None,
+    ):
+        self.name = name
+        self.description = description
+        self.dialect = dialect
+        self.materialization = materialization
+        self.purpose = purpose
+        self.origin = origin
+        self.exists_remotely = exists_remotely
+        self.table_location = table_location
+        self.creation_flags = creation_flags
+        self.incremental_options = incremental_options
+        self.snapshot_options = snapshot_options
+        self.dependencies = dependencies
+        self.depended_on_by = depended_on_by
+        self.columns = columns
+        self.partitioned_by = partitioned_by
+        self.severity = severity
+        self.tests = tests
+        self.schedule = schedule
+        self.starting = starting
+        self.classifiers = classifiers
+        self.reclassify = reclassify
+        self.lineage = lineage
+        self.location = location
+        self.file_format = file_format
+        self.with_header = with_header
+        self.delimiter = delimiter
+        self.compression = compression
+        self.cycle_cut_point = cycle_cut_point
+        self.source_locations = source_locations
+        self.sealed = sealed
+        self.meta = meta
+
+
+class Column(Mirror):
+    """Plain mirror of models.Column."""
+
+    __slots__ = (
+        'name',
+        'description',
+        'datatype',
+        'classifiers',
+        'lineage',
+        'forward_lineage',
+        'reclassify',
+        'samples',
+        'default_severity',
+        'tests',
+    )
+    __model__ = models.Column
+    __aliases__ = {
+        'forward_lineage': 'forward-lineage',
+        'default_severity': 'default-severity',
+    }
+
+    name: str
+    description: Optional[str]
+    datatype: Optional[str]
+    classifiers: Optional[List[str]]
+    lineage: Optional[Lineage]
+    forward_lineage: Optional[Lineage]
+    reclassify: Optional[List[models.Reclassify]]
+    samples: Optional[List[str]]
+    default_severity: Optional[models.Severity]
+    tests: Optional[List[Constraint]]
+
+    def __init__(
+        self,
+        name,
+        *,
+        description=None,
+        datatype=None,
+        classifiers=None,
+        lineage=None,
+        forward_lineage=None,
+        reclassify=None,
+        samples=None,
+        default_severity=None,
+        tests=None,
+    ):
+        self.name = name
+        self.description = description
+        self.datatype = datatype
+        self.classifiers = classifiers
+        self.lineage = lineage
+        self.forward_lineage = forward_lineage
+        self.reclassify = reclassify
+        self.samples = samples
+        self.default_severity = default_severity
+        self.tests = tests
+
+
+class Lineage(Mirror):
+    """Plain mirror of models.Lineage."""
+
+    __slots__ = (
+        'copy_',
+        'modify',
+        'scan',
+        'apply',
+    )
+    __model__ = models.Lineage
+    __aliases__ = {
+        'copy_': 'copy',
+    }
+
+    copy_: Optional[List[str]]
+    modify: Optional[List[str]]
+    scan: Optional[List[str]]
+    apply: Optional[List[str]]
+
+    def __init__(
+        self,
+        *,
+        copy_=None,
+        modify=None,
+        scan=None,
+        apply=None,
+    ):
+        self.copy_ = copy_
+        self.modify = modify
+        self.scan = scan
+        self.apply = apply
+
+
+class Constraint(Mirror):
+    """Plain mirror of models.Constraint."""
+
+    __slots__ = (
+        'expect',
+        'severity',
+    )
+    __model__ = models.Constraint
+
+    expect: str
+    severity: Optional[models.Severity]
+
+    def __init__(
+        self,
+        expect,
+        *,
+        severity=None,
+    ):
+        self.expect = expect
+        self.severity = severity
+
+
+class Partition(Mirror):
+    """Plain mirror of models.Partition."""
+
+    __slots__ = (
+        'name',
+        'description',
+        'format',
+    )
+    __model__ = models.Partition
+
+    name: str
+    description: Optional[str]
+    format: Optional[str]
+
+    def __init__(
+        self,
+        name,
+        *,
+        description=None,
+        format=None,
+    ):
+        self.name = name
+        self.description = description
+        self.format = format
@@ -5,69 +5,31 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Union
+from typing_extensions import Annotated
 
 from dbt_sdf.schema.base import BaseModel
 from pydantic import Extra, Field, conint
 
 
-class IncludeType1(Enum):
+class IncludeType(Enum):
     model = 'model'
-
-
-class IncludeType2(Enum):
     test = 'test'
-
-
-class IncludeType3(Enum):
     check = 'check'
-
-
-class IncludeType4(Enum):
     report = 'report'
-
-
-class IncludeType5(Enum):
     stat = 'stat'
-
-
-class IncludeType6(Enum):
     resource = 'resource'
-
-
-class IncludeType7(Enum):
     metadata = 'metadata'
-
-
-class IncludeType8(Enum):
     spec = 'spec'
-
-
-class IncludeType9(Enum):
     macro = 'macro'
-
-
-class IncludeType10(Enum):
     seed = 'seed'
 
 
-class IndexMethod1(Enum):
+class IndexMethod(Enum):
     scan_dbt = 'scan-dbt'
-
-
-class IndexMethod2(Enum):
     none = 'none'
-
-
-class IndexMethod3(Enum):
     table_name = 'table-name'
-
-
-class IndexMethod4(Enum):
     schema_table_name = 'schema-table-name'
-
-
-class IndexMethod5(Enum):
     catalog_schema_table_name = 'catalog-schema-table-name'
 
 
@@ -87,39 +49,15 @@ class Preprocessor(Enum):
     all = 'all'
 
 
-class Materialization1(Enum):
+class Materialization(Enum):
     table = 'table'
-
-
-class Materialization2(Enum):
     transient_table = 'transient-table'
-
-
-class Materialization3(Enum):
     temporary_table = 'temporary-table'
-
-
-class Materialization4(Enum):
     external_table = 'external-table'
-
-
-class Materialization5(Enum):
     view = 'view'
-
-
-class Materialization6(Enum):
     materialized_view = 'materialized-view'
-
-
-class Materialization7(Enum):
     incremental_table = 'incremental-table'
-
-
-class Materialization8(Enum):
     snapshot_table = 'snapshot-table'
-
-
-class Materialization9(Enum):
     recursive_table = 'recursive-table'
 
 
@@ -130,39 +68,18 @@ class Materialization10(BaseModel):
     other: str
 
 
-class TableCreationFlags1(Enum):
+class TableCreationFlags(Enum):
     create_new = 'create-new'
-
-
-class TableCreationFlags2(Enum):
     drop_if_exists = 'drop-if-exists'
-
-
-class TableCreationFlags3(Enum):
     skip_if_exists = 'skip-if-exists'
-
-
-class TableCreationFlags4(Enum):
     create_or_replace = 'create-or-replace'
-
-
-class TableCreationFlags5(Enum):
     create_if_not_exists = 'create-if-not-exists'
 
 
-class SyncType1(Enum):
+class SyncType(Enum):
     always = 'always'
-
-
-class SyncType2(Enum):
     on_pull = 'on-pull'
-
-
-class SyncType3(Enum):
     on_push = 'on-push'
-
-
-class SyncType4(Enum):
     never = 'never'
 
 
@@ -171,28 +88,16 @@ class Severity(Enum):
     error = 'error'
 
 
-class CompressionType1(Enum):
+class CompressionType(Enum):
     tar = 'tar'
     zstd = 'zstd'
-
-
-class CompressionType2(Enum):
     bzip2 = 'bzip2'
-
-
-class CompressionType3(Enum):
     gzip = 'gzip'
-
-
-class CompressionType4(Enum):
     none = 'none'
 
 
-class ExcludeType1(Enum):
+class ExcludeType(Enum):
     content = 'content'
-
-
-class ExcludeType2(Enum):
     path = 'path'
 
 
@@ -298,31 +203,13 @@ class SystemTime(BaseModel):
     nanos_since_epoch: conint(ge=0)
 
 
-class TablePurpose1(Enum):
+class TablePurpose(Enum):
     report = 'report'
-
-
-class TablePurpose2(Enum):
     model = 'model'
-
-
-class TablePurpose3(Enum):
     check = 'check'
-
-
-class TablePurpose4(Enum):
     test = 'test'
-
-
-class TablePurpose5(Enum):
     stat = 'stat'
-
-
-class TablePurpose6(Enum):
     system = 'system'
-
-
-class TablePurpose7(Enum):
     external_system = 'external-system'
 
 
@@ -344,15 +231,9 @@ class IncrementalStrategy(Enum):
     delete_insert = 'delete+insert'
 
 
-class OnSchemaChange1(Enum):
+class OnSchemaChange(Enum):
     fail = 'fail'
-
-
-class OnSchemaChange2(Enum):
     append = 'append'
-
-
-class OnSchemaChange3(Enum):
     sync = 'sync'
 
 
@@ -461,19 +342,10 @@ class Cardinality(Enum):
     zero_or_more = 'zero-or-more'
 
 
-class Variadic1(Enum):
+class Variadic(Enum):
     non_uniform = 'non-uniform'
-
-
-class Variadic2(Enum):
     uniform = 'uniform'
-
-
-class Variadic3(Enum):
     even_odd = 'even-odd'
-
-
-class Variadic4(Enum):
     any = 'any'
 
 
@@ -532,15 +404,9 @@ class TypeBound(BaseModel):
     datatypes: List[str]
 
 
-class Volatility1(Enum):
+class Volatility(Enum):
     pure = 'pure'
-
-
-class Volatility2(Enum):
     stable = 'stable'
-
-
-class Volatility3(Enum):
     volatile = 'volatile'
 
 
@@ -556,11 +422,8 @@ class Example(BaseModel):
     )
 
 
-class FunctionImplSpec1(Enum):
+class FunctionImplSpec(Enum):
     builtin = 'builtin'
-
-
-class FunctionImplSpec4(Enum):
     sql = 'sql'
 
 
@@ -595,26 +458,6 @@ class Config(BaseModel):
     properties: Optional[Dict[str, Any]] = None
 
 
-class Type(Enum):
-    sdf = 'sdf'
-
-
-class Type2(Enum):
-    snowflake = 'snowflake'
-
-
-class Type3(Enum):
-    aws = 'aws'
-
-
-class Type4(Enum):
-    openai = 'openai'
-
-
-class Type5(Enum):
-    empty = 'empty'
-
-
 class SdfAuthVariant(Enum):
     interactive = 'interactive'
     headless = 'headless'
@@ -698,32 +541,11 @@ class Defaults(BaseModel):
         alias='schema',
         description="Defines a default schema,  If not set, defaults to the schema name in an outer scope, if not set, defaults to 'pub'",
     )
-    materialization: Optional[
-        Union[
-            Materialization1,
-            Materialization2,
-            Materialization3,
-            Materialization4,
-            Materialization5,
-            Materialization6,
-            Materialization7,
-            Materialization8,
-            Materialization9,
-            Materialization10,
-        ]
-    ] = Field(
+    materialization: Optional[Union[Materialization, Materialization10]] = Field(
         None,
         description='Defines the default materialization, if not set defaults to materialization in outer scope, if not set defaults to base-table',
     )
-    creation_flag: Optional[
-        Union[
-            TableCreationFlags1,
-            TableCreationFlags2,
-            TableCreationFlags3,
-            TableCreationFlags4,
-            TableCreationFlags5,
-        ]
-    ] = Field(
+    creation_flag: Optional[TableCreationFlags] = Field(
         None,
         alias='creation-flag',
         description='Defines table creation flags, defaults to  if not set',
@@ -747,28 +569,13 @@ class Defaults(BaseModel):
         None,
         description='The named lint rule set, uses defaults (from sdftarget/<environment>/lint.sdf.yml) if not set',
     )
-    index_method: Optional[
-        Union[IndexMethod1, IndexMethod2, IndexMethod3, IndexMethod4, IndexMethod5]
-    ] = Field(
+    index_method: Optional[IndexMethod] = Field(
         None, alias='index-method', description='The default index for this tables'
     )
-    include_type: Optional[
-        Union[
-            IncludeType1,
-            IncludeType2,
-            IncludeType3,
-            IncludeType4,
-            IncludeType5,
-            IncludeType6,
-            IncludeType7,
-            IncludeType8,
-            IncludeType9,
-            IncludeType10,
-        ]
-    ] = Field(
+    include_type: Optional[IncludeType] = Field(
         None, alias='include-type', description='The default index for this tables'
     )
-    sync_method: Optional[Union[SyncType1, SyncType2, SyncType3, SyncType4]] = Field(
+    sync_method: Optional[SyncType] = Field(
         None, alias='sync-method', description='The default index for this tables'
     )
     severity: Optional[Severity] = Field(
@@ -784,9 +591,7 @@ class Defaults(BaseModel):
         alias='csv-delimiter',
         description='CSV data is separated by this delimiter [only for external tables]',
     )
-    csv_compression: Optional[
-        Union[CompressionType1, CompressionType2, CompressionType3, CompressionType4]
-    ] = Field(
+    csv_compression: Optional[CompressionType] = Field(
         None,
         alias='csv-compression',
         description='Json or CSV data is compressed with this method [only for external tables]',
@@ -798,7 +603,7 @@ class ExcludePath(BaseModel):
         extra = 'forbid'
 
     path: str = Field(..., description='A filepath')
-    exclude_type: Optional[Union[ExcludeType1, ExcludeType2]] = Field(
+    exclude_type: Optional[ExcludeType] = Field(
         None, alias='exclude-type', description='Type of excluded artifacts'
     )
 
@@ -876,9 +681,7 @@ class IncrementalOptions(BaseModel):
         alias='merge-exclude-columns',
         description='List of column names to exclude from updating as part of Merge strategy; Only one of merge_update_columns or merge_exclude_columns may be specified',
     )
-    on_schema_change: Optional[
-        Union[OnSchemaChange1, OnSchemaChange2, OnSchemaChange3]
-    ] = Field(
+    on_schema_change: Optional[OnSchemaChange] = Field(
         None,
         alias='on-schema-change',
         description='Method for reacting to changing schema in the source of the incremental table Possible values are `fail`, `append`, and `sync`. If left unspecified, the default behavior is to ignore the change and possibly error out if the schema change is incompatible. `fail` causes a failure whenever any deviation in the schema of the source is detected; `append` adds new columns but does not delete the columns removed from the source; `sync` adds new columns and deletess the columns removed from the source;',
@@ -997,7 +800,7 @@ class Credential1(BaseModel):
         alias='source-locations',
         description='Credential defined by these set of .sdf files',
     )
-    type: Type
+    type: Literal['sdf']
     variant: SdfAuthVariant = Field(..., description='Variant of the credential')
     headless_creds: Optional[HeadlessCredentials] = Field(
         None, alias='headless-creds', description='Headless Credentials'
@@ -1016,7 +819,7 @@ class Credential2(BaseModel):
         alias='source-locations',
         description='Credential defined by these set of .sdf files',
     )
-    type: Type2
+    type: Literal['snowflake']
     account_id: str = Field(
         ...,
         alias='account-id',
@@ -1042,7 +845,7 @@ class Credential3(BaseModel):
         alias='source-locations',
         description='Credential defined by these set of .sdf files',
     )
-    type: Type3
+    type: Literal['aws']
     profile: Optional[str] = Field(
         None, description='The name of th profile to use in the AWS credentials file'
     )
@@ -1091,7 +894,7 @@ class Credential4(BaseModel):
         alias='source-locations',
         description='Credential defined by these set of .sdf files',
     )
-    type: Type4
+    type: Literal['openai']
     api_key: str = Field(
         ..., alias='api-key', description='The api key to use for the connection'
     )
@@ -1109,7 +912,7 @@ class Credential5(BaseModel):
         alias='source-locations',
         description='Credential defined by these set of .sdf files',
     )
-    type: Type5
+    type: Literal['empty']
 
 
 class SyntaxRules(BaseModel):
@@ -1247,26 +1050,11 @@ class IncludePath(BaseModel):
         extra = 'forbid'
 
     path: str = Field(..., description='A filepath')
-    type: Optional[
-        Union[
-            IncludeType1,
-            IncludeType2,
-            IncludeType3,
-            IncludeType4,
-            IncludeType5,
-            IncludeType6,
-            IncludeType7,
-            IncludeType8,
-            IncludeType9,
-            IncludeType10,
-        ]
-    ] = Field(
+    type: Optional[IncludeType] = Field(
         None,
         description='Type of included artifacts: model | test | stats | metadata | resource',
     )
-    index: Optional[
-        Union[IndexMethod1, IndexMethod2, IndexMethod3, IndexMethod4, IndexMethod5]
-    ] = Field(
+    index: Optional[IndexMethod] = Field(
         None,
         description='Index method for this include path: scan | table | schema-table | catalog-schema-table',
     )
@@ -1331,31 +1119,12 @@ class Table(BaseModel):
     dialect: Optional[Dialect] = Field(
         None, description='The dialect of this table, defaults to `trino`'
     )
-    materialization: Optional[
-        Union[
-            Materialization1,
-            Materialization2,
-            Materialization3,
-            Materialization4,
-            Materialization5,
-            Materialization6,
-            Materialization7,
-            Materialization8,
-            Materialization9,
-            Materialization10,
-        ]
-    ] = Field(None, description='The table-type of this table (new version)')
-    purpose: Optional[
-        Union[
-            TablePurpose1,
-            TablePurpose2,
-            TablePurpose3,
-            TablePurpose4,
-            TablePurpose5,
-            TablePurpose6,
-            TablePurpose7,
-        ]
-    ] = Field(None, description='Specify what kind of table or view this is')
+    materialization: Optional[Union[Materialization, Materialization10]] = Field(
+        None, description='The table-type of this table (new version)'
+    )
+    purpose: Optional[TablePurpose] = Field(
+        None, description='Specify what kind of table or view this is'
+    )
     origin: Optional[TableOrigin] = Field(
         None, description='The origin of this table <remote> or <local>'
     )
@@ -1369,15 +1138,7 @@ class Table(BaseModel):
         alias='table-location',
         description='Specify table ,location, defaults to none if not set',
     )
-    creation_flags: Optional[
-        Union[
-            TableCreationFlags1,
-            TableCreationFlags2,
-            TableCreationFlags3,
-            TableCreationFlags4,
-            TableCreationFlags5,
-        ]
-    ] = Field(
+    creation_flags: Optional[TableCreationFlags] = Field(
         None,
         alias='creation-flags',
         description='Defines the table creation options, defaults to none if not set',
@@ -1443,9 +1204,7 @@ class Table(BaseModel):
         None,
         description='CSV data is separated by this delimiter [only for external tables]',
     )
-    compression: Optional[
-        Union[CompressionType1, CompressionType2, CompressionType3, CompressionType4]
-    ] = Field(
+    compression: Optional[CompressionType] = Field(
         None,
         description='Json or CSV data is compressed with this method [only for external tables]',
     )
@@ -1481,7 +1240,7 @@ class Function(BaseModel):
     description: Optional[str] = Field(
         None, description='A description of this function'
     )
-    variadic: Optional[Union[Variadic1, Variadic2, Variadic3, Variadic4]] = Field(
+    variadic: Optional[Variadic] = Field(
         None,
         description='Arbitrary number of arguments of an common type out of a list of valid types',
     )
@@ -1498,7 +1257,7 @@ class Function(BaseModel):
     binds: Optional[List[TypeBound]] = Field(
         None, description='The generic type bounds'
     )
-    volatility: Optional[Union[Volatility1, Volatility2, Volatility3]] = Field(
+    volatility: Optional[Volatility] = Field(
         None, description='volatility - The volatility of the function.'
     )
     examples: Optional[List[Example]] = Field(
@@ -1520,9 +1279,7 @@ class Function(BaseModel):
         description='Function defined by these set of .sdf files',
     )
     implemented_by: Optional[
-        Union[
-            FunctionImplSpec1, FunctionImplSpec2, FunctionImplSpec3, FunctionImplSpec4
-        ]
+        Union[FunctionImplSpec, FunctionImplSpec2, FunctionImplSpec3]
     ] = Field(None, alias='implemented-by')
     special: Optional[bool] = Field(
         None,
@@ -1611,6 +1368,9 @@ class Definition(BaseModel):
     function: Optional[Function] = Field(None, description='A function definition')
     config: Optional[Config] = Field(None, description='A config definition')
     credential: Optional[
-        Union[Credential1, Credential2, Credential3, Credential4, Credential5]
+        Annotated[
+            Union[Credential1, Credential2, Credential3, Credential4, Credential5],
+            Field(discriminator='type'),
+        ]
     ] = Field(None, description='A credential definition')
     linter: Optional[Linter] = Field(None, description='A config definition')
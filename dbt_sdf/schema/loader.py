@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML was built without libyaml
+    from yaml import SafeLoader
+
+from dbt_sdf.schema.generated.models import Definition
+from dbt_sdf.schema.validation import validate_definitions
+
+SDF_YML_SUFFIX = ".sdf.yml"
+# Written by migrate --output-format json and ndjson
+SDF_JSON_SUFFIX = ".sdf.json"
+SDF_NDJSON_SUFFIX = ".sdf.ndjson"
+SDF_SUFFIXES = (SDF_YML_SUFFIX, SDF_JSON_SUFFIX, SDF_NDJSON_SUFFIX)
+
+# Directories sdf writes its own output to
+IGNORED_DIRECTORIES = {"sdftarget"}
+
+
+class LazyDefinition:
+    """One document of a .sdf.yml file, validated into a Definition on first access.
+
+    Scanning a workspace for kinds, names and hashes only needs the parsed YAML,
+    so validation is left until .definition is read.
+    """
+
+    def __init__(self, path, index, data):
+        self.path = path
+        self.index = index
+        self.data = data
+        self._definition = None
+        self._hash = None
+
+    @property
+    def kind(self):
+        """The kind of definition, e.g. 'table' or 'workspace'."""
+        return next(iter(self.data), None)
+
+    @property
+    def name(self):
+        body = self.data.get(self.kind)
+        return body.get("name") if isinstance(body, dict) else None
+
+    @property
+    def key(self):
+        return self.kind, self.name
+
+    @property
+    def hash(self):
+        """A sha256 of the document that does not depend on key order or formatting."""
+        if self._hash is None:
+            canonical = json.dumps(self.data, sort_keys=True, separators=(",", ":"), default=str)
+            self._hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return self._hash
+
+    @property
+    def definition(self):
+        """The validated Definition.
+
+        Raises:
+            pydantic.ValidationError: If the document is not a valid definition.
+        """
+        if self._definition is None:
+            self._definition = Definition.model_validate(self.data)
+        return self._definition
+
+    def __repr__(self):
+        return f"LazyDefinition({self.path!r}, {self.index}, kind={self.kind!r}, name={self.name!r})"
+
+
+def _read_documents(path, f):
+    if path.endswith(SDF_JSON_SUFFIX):
+        return json.load(f)
+    if path.endswith(SDF_NDJSON_SUFFIX):
+        return [json.loads(line) if line.strip() else None for line in f]
+    return yaml.load_all(f, Loader=SafeLoader)
+
+
+def load_file(path):
+    """Read the definitions of one .sdf.yml, .sdf.json or .sdf.ndjson file, without validating them."""
+    with open(path, "rb") as f:
+        documents = _read_documents(path, f)
+        return [LazyDefinition(path, index, data) for index, data in enumerate(documents) if data]
+
+
+def find_sdf_yml_files(root):
+    """Return the definition files under root, sorted, skipping hidden and sdf output directories."""
+    files = []
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in IGNORED_DIRECTORIES]
+        files.extend(os.path.join(directory, name) for name in names if name.endswith(SDF_SUFFIXES))
+    return sorted(files)
+
+
+def load_workspace(root, max_workers=None):
+    """Read every definition of a workspace, parsing files on a thread pool.
+
+    Args:
+        root: The workspace directory.
+        max_workers: The number of threads, defaults to ThreadPoolExecutor's default.
+
+    Returns:
+        A list of LazyDefinitions in file order.
+    """
+    files = find_sdf_yml_files(root)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [definition for loaded in executor.map(load_file, files) for definition in loaded]
+
+
+def validate_all(definitions):
+    """Validate LazyDefinitions in one batch instead of one at a time on access."""
+    pending = [definition for definition in definitions if definition._definition is None]
+    for definition, validated in zip(pending, validate_definitions(d.data for d in pending)):
+        definition._definition = validated
+    return [definition.definition for definition in definitions]
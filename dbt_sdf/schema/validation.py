@@ -0,0 +1,149 @@
+from enum import Enum
+from functools import lru_cache
+from typing import List, Literal, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import Annotated
+
+from dbt_sdf.schema.generated.models import Definition
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model):
+    """Return a cached TypeAdapter for List[model].
+
+    Building an adapter compiles a pydantic-core validator, so they are built
+    once per model and reused.
+    """
+    return TypeAdapter(List[model])
+
+
+def validate_definitions(definitions):
+    """Validate definition dicts in a single pydantic-core call.
+
+    Args:
+        definitions: An iterable of dicts keyed by field alias, as found in .sdf.yml files.
+
+    Returns:
+        A list of Definition instances.
+
+    Raises:
+        pydantic.ValidationError: Reporting every invalid definition at once.
+    """
+    return list_adapter(Definition).validate_python(list(definitions))
+
+
+def construct_definitions(definitions):
+    """Build Definition instances from dicts without validating them.
+
+    Only use this for data the migration generates itself and knows to be
+    valid: nothing is checked, but nested dicts still become models and enum
+    values become enum members so that the result serializes like a validated
+    Definition.
+
+    Args:
+        definitions: An iterable of dicts keyed by field alias or field name.
+
+    Returns:
+        A list of Definition instances.
+    """
+    return [construct(Definition, definition) for definition in definitions]
+
+
+@lru_cache(maxsize=None)
+def _converters(model):
+    """Work out once per model how to convert the values of a dict to its fields.
+
+    Returns:
+        A map from each accepted key, alias or field name, to the field name and a
+        converter for its value (None when the value is used as is).
+    """
+    converters = {}
+    for name, info in model.model_fields.items():
+        converters[name] = converters[info.alias or name] = (name, _converter(info.annotation))
+    return converters
+
+
+def construct(model, data):
+    """Recursively build a model from a dict with model_construct(), without validating it.
+
+    Raises:
+        ValueError: If data has a key that is not a field of the model, and the model forbids extra fields.
+    """
+    converters = _converters(model)
+    allow_extra = model.model_config.get('extra') == 'allow'
+    values = {}
+    for key, value in data.items():
+        if key not in converters:
+            if allow_extra:
+                values[key] = value
+                continue
+            raise ValueError(f"{model.__name__} has no field {key!r}")
+        name, convert = converters[key]
+        values[name] = value if convert is None or value is None else convert(value)
+    return model.model_construct(**values)
+
+
+def _converter(annotation):
+    """Return a function turning a plain value into an instance of annotation, or None."""
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _converter(get_args(annotation)[0])
+    if origin is Union:
+        arms = [(_acceptor(arm), _converter(arm)) for arm in get_args(annotation) if arm is not type(None)]
+        if len(arms) == 1:
+            return arms[0][1]
+
+        def convert_union(value):
+            for accepts, convert in arms:
+                if accepts(value):
+                    return value if convert is None else convert(value)
+            return value
+        return convert_union
+    if origin is list:
+        convert_item = _converter(get_args(annotation)[0])
+        if convert_item is None:
+            return None
+        return lambda value: [convert_item(item) for item in value]
+    if origin is dict:
+        convert_item = _converter(get_args(annotation)[1])
+        if convert_item is None:
+            return None
+        return lambda value: {key: convert_item(item) for key, item in value.items()}
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return lambda value: construct(annotation, value) if isinstance(value, dict) else value
+        if issubclass(annotation, Enum):
+            # Members hash differently from their values, so they are returned as is
+            members = annotation._value2member_map_
+            return lambda value: members.get(value, value)
+    return None
+
+
+def _acceptor(arm):
+    """Return a predicate telling whether a value looks like an instance of one arm of a Union."""
+    origin = get_origin(arm)
+    if origin is Annotated:
+        return _acceptor(get_args(arm)[0])
+    if origin is Union:
+        acceptors = [_acceptor(inner) for inner in get_args(arm)]
+        return lambda value: any(accepts(value) for accepts in acceptors)
+    if origin is Literal:
+        values = get_args(arm)
+        return lambda value: value in values
+    if origin is not None:
+        return lambda value: isinstance(value, origin)
+    if issubclass(arm, BaseModel):
+        keys = set()
+        literals = {}
+        for name, info in arm.model_fields.items():
+            keys.update((name, info.alias or name))
+            if get_origin(info.annotation) is Literal:
+                literals[name] = literals[info.alias or name] = get_args(info.annotation)
+        # Discriminated arms pin a field to a Literal
+        return lambda value: (isinstance(value, dict) and keys.issuperset(value)
+                              and all(value[key] in allowed for key, allowed in literals.items() if key in value))
+    if issubclass(arm, Enum):
+        members = arm._value2member_map_
+        return lambda value: isinstance(value, arm) or (isinstance(value, str) and value in members)
+    return lambda value: isinstance(value, arm)
@@ -1,30 +1,309 @@
+import ast
 import re
 import sys
+from collections import Counter
 
-def update_config(file_path):
+def update_config(content):
+    # Replace the deprecated Extra configuration with the new string literal
+    return re.sub(r'extra = Extra\.([a-z]+)', r"extra = '\1'", content)
+
+
+# datamodel-codegen turns a oneOf of string constants into one Enum class per
+# constant, e.g. Union[Materialization1, ..., Materialization9]. Pydantic tries
+# every arm of a Union in turn, so those fields are rewritten to use a single
+# Enum holding all the constants.
+
+def _is_enum(cls):
+    return any(isinstance(base, ast.Name) and base.id == 'Enum' for base in cls.bases)
+
+
+def _union_arms(node):
+    """Return the Name arms of a Union[...] subscript, or None for anything else."""
+    if not (isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name)
+            and node.value.id == 'Union' and isinstance(node.slice, ast.Tuple)):
+        return None
+    if not all(isinstance(arm, ast.Name) for arm in node.slice.elts):
+        return None
+    return [arm.id for arm in node.slice.elts]
+
+
+def _annotations(tree):
+    for cls in tree.body:
+        if isinstance(cls, ast.ClassDef):
+            for stmt in cls.body:
+                if isinstance(stmt, ast.AnnAssign):
+                    yield cls, stmt
+
+
+def _enum_groups(tree, classes):
+    """Map merged enum names to the Enum classes that are merged into them."""
+    groups = {}
+    for _, stmt in _annotations(tree):
+        for node in ast.walk(stmt.annotation):
+            arms = _union_arms(node) or []
+            enums = [arm for arm in arms if arm in classes and _is_enum(classes[arm])]
+            bases = {re.sub(r'\d+$', '', arm) for arm in enums}
+            if len(enums) < 2 or len(bases) != 1:
+                continue
+            members = groups.setdefault(bases.pop(), [])
+            members.extend(arm for arm in enums if arm not in members)
+
+    references = Counter(node.id for node in ast.walk(tree) if isinstance(node, ast.Name))
+    union_references = Counter()
+    for _, stmt in _annotations(tree):
+        for node in ast.walk(stmt.annotation):
+            union_references.update(_union_arms(node) or [])
+
+    merged = {}
+    for name, arms in groups.items():
+        values = [stmt.value.value for arm in arms for stmt in classes[arm].body]
+        if name in classes or len(values) != len(set(values)):
+            continue
+        # Only merge classes that are never used on their own
+        if any(references[arm] != union_references[arm] for arm in arms):
+            continue
+        merged[name] = arms
+    return merged
+
+
+class _ReplaceArms(ast.NodeTransformer):
+    def __init__(self, renamed):
+        self.renamed = renamed
+
+    def visit_Subscript(self, node):
+        self.generic_visit(node)
+        arms = _union_arms(node)
+        if arms is None or not any(arm in self.renamed for arm in arms):
+            return node
+        names = []
+        for arm in arms:
+            name = self.renamed.get(arm, arm)
+            if name not in names:
+                names.append(name)
+        if len(names) == 1:
+            return ast.Name(names[0])
+        node.slice.elts = [ast.Name(name) for name in names]
+        return node
+
+
+def _enum_fields(cls, classes):
+    """Map the fields of a model that are typed as a single-member Enum to that Enum."""
+    return {
+        field.target.id: field.annotation.id
+        for field in cls.body
+        if isinstance(field, ast.AnnAssign) and isinstance(field.annotation, ast.Name)
+        and field.annotation.id in classes and _is_enum(classes[field.annotation.id])
+        and len(classes[field.annotation.id].body) == 1
+    }
+
+
+def _discriminated_unions(tree, classes):
+    """Find Unions of models that each pin a field to a different single-member Enum.
+
+    Returns a map from each such Union's arms to the discriminating field name.
+    """
+    found = {}
+    for _, stmt in _annotations(tree):
+        for node in ast.walk(stmt.annotation):
+            arms = _union_arms(node)
+            if not arms or not all(arm in classes and not _is_enum(classes[arm]) for arm in arms):
+                continue
+            tags = [_enum_fields(classes[arm], classes) for arm in arms]
+            for field in tags[0]:
+                values = [fields.get(field) for fields in tags]
+                if None not in values and len(set(values)) == len(values):
+                    found[tuple(arms)] = field
+                    break
+    return found
+
+
+class _Discriminate(ast.NodeTransformer):
+    def __init__(self, unions):
+        self.unions = unions
+
+    def visit_Subscript(self, node):
+        self.generic_visit(node)
+        arms = _union_arms(node)
+        if arms is None or tuple(arms) not in self.unions:
+            return node
+        discriminator = ast.Call(
+            ast.Name('Field'), [], [ast.keyword('discriminator', ast.Constant(self.unions[tuple(arms)]))])
+        return ast.Subscript(ast.Name('Annotated'), ast.Tuple([node, discriminator]))
+
+
+class _Source:
+    """Splices replacements into the source by AST position, leaving everything else untouched."""
+
+    def __init__(self, content):
+        self.lines = content.splitlines(keepends=True)
+        self.edits = []
+
+    def _column(self, lineno, col_offset):
+        # AST columns are UTF-8 byte offsets
+        return len(self.lines[lineno - 1].encode('utf-8')[:col_offset].decode('utf-8'))
+
+    def replace(self, node, text):
+        self.edits.append((node.lineno, self._column(node.lineno, node.col_offset),
+                           node.end_lineno, self._column(node.end_lineno, node.end_col_offset), text))
+
+    def replace_lines(self, first, last, text):
+        self.edits.append((first, 0, last + 1, 0, text))
+
+    def render(self):
+        lines = self.lines + ['']
+        for first, col, last, end_col, text in sorted(self.edits, reverse=True):
+            lines[first - 1:last] = [lines[first - 1][:col] + text + lines[last - 1][end_col:]]
+        return ''.join(lines)
+
+
+LINE_LENGTH = 88
+
+
+def _format_annotation(node, indent, split=False):
+    """Format an annotation the way black does, splitting brackets until each line fits."""
+    text = ast.unparse(node)
+    if not isinstance(node, ast.Subscript) or (not split and len(indent) + len(text) <= LINE_LENGTH):
+        return text
+    inner = indent + '    '
+    if isinstance(node.slice, ast.Tuple):
+        elements = ', '.join(ast.unparse(element) for element in node.slice.elts)
+        if len(inner) + len(elements) <= LINE_LENGTH:
+            body = inner + elements
+        else:
+            body = ',\n'.join(inner + _format_annotation(element, inner) for element in node.slice.elts) + ','
+    else:
+        body = inner + _format_annotation(node.slice, inner)
+    return f'{ast.unparse(node.value)}[\n{body}\n{indent}]'
+
+
+def _format_call(node, content, indent):
+    """Split a one-line call black-style: arguments on their own line, or one per line."""
+    args = [ast.get_source_segment(content, arg) for arg in node.args]
+    args += [ast.get_source_segment(content, keyword) for keyword in node.keywords]
+    inner = indent + '    '
+    if len(inner) + len(', '.join(args)) <= LINE_LENGTH:
+        body = inner + ', '.join(args)
+    else:
+        body = ',\n'.join(inner + arg for arg in args) + ','
+    return f'{ast.unparse(node.func)}(\n{body}\n{indent})'
+
+
+def _format_field(stmt, annotation, content):
+    """Render a model field with a new annotation, keeping the line length black uses."""
+    indent = ' ' * stmt.col_offset
+    value = ast.get_source_segment(content, stmt.value)
+    head = f'{stmt.target.id}: {ast.unparse(annotation)} = '
+    if len(indent) + len(head) + len(value) <= LINE_LENGTH and '\n' not in value:
+        return head + value
+    if len(indent) + len(head) + len(value.split('(')[0]) + 1 > LINE_LENGTH:
+        head = f'{stmt.target.id}: {_format_annotation(annotation, indent, split=True)} = '
+    last_line = indent + head.rsplit('\n', 1)[-1]
+    if '\n' in value or not isinstance(stmt.value, ast.Call) or len(last_line) + len(value) <= LINE_LENGTH:
+        return head + value
+    return head + _format_call(stmt.value, content, indent)
+
+
+def _class_lines(cls, lines):
+    """Return the first and last line of a class, including the blank lines after it."""
+    last = cls.end_lineno
+    while last < len(lines) and not lines[last].strip():
+        last += 1
+    return cls.lineno, last
+
+
+def collapse_unions(content):
+    """Merge Unions of single-member Enums into one Enum and discriminate Unions of tagged models."""
+    tree = ast.parse(content)
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+    groups = _enum_groups(tree, classes)
+    unions = _discriminated_unions(tree, classes)
+    if not groups and not unions:
+        return content
+
+    source = _Source(content)
+    renamed = {arm: name for name, arms in groups.items() for arm in arms}
+    tags = {}
+    for arms, field in unions.items():
+        for arm in arms:
+            for stmt in classes[arm].body:
+                if isinstance(stmt, ast.AnnAssign) and stmt.target.id == field:
+                    tags[id(stmt)] = stmt.annotation.id
+
+    for _, stmt in _annotations(tree):
+        if id(stmt) in tags:
+            # Discriminators must be Literals; the single-member Enum is dropped below
+            value = classes[tags[id(stmt)]].body[0].value.value
+            source.replace(stmt.annotation, f'Literal[{value!r}]')
+            continue
+        annotation = _Discriminate(unions).visit(_ReplaceArms(renamed).visit(
+            ast.parse(ast.unparse(stmt.annotation), mode='eval').body))
+        if ast.unparse(annotation) == ast.unparse(stmt.annotation):
+            continue
+        if stmt.value is None:
+            source.replace(stmt.annotation, _format_annotation(annotation, ' ' * stmt.col_offset))
+        else:
+            source.replace(stmt, _format_field(stmt, annotation, content))
+
+    for name, arms in groups.items():
+        members = [ast.get_source_segment(content, stmt) for arm in arms for stmt in classes[arm].body]
+        for index, arm in enumerate(arms):
+            first, last = _class_lines(classes[arm], source.lines)
+            text = ''
+            if index == 0:
+                text = f'class {name}(Enum):\n' + ''.join(f'    {member}\n' for member in members) + '\n\n'
+            source.replace_lines(first, last, text)
+
+    references = Counter(node.id for node in ast.walk(tree) if isinstance(node, ast.Name))
+    for tag, count in Counter(tags.values()).items():
+        if references[tag] == count:
+            source.replace_lines(*_class_lines(classes[tag], source.lines), '')
+
+    content = source.render()
+    if unions:
+        content = _import_from(content, 'typing', 'Literal')
+        # typing.Annotated is new in Python 3.9, and the package still supports 3.8
+        content = _import_from(content, 'typing_extensions', 'Annotated')
+    return content
+
+
+def _import_from(content, module, *names):
+    """Add names to the `from module import ...` line, adding the line after the typing one if there is none."""
+    match = re.search(rf'^from {module} import (.+)$', content, flags=re.MULTILINE)
+    if match is None:
+        typing_import = re.search(r'^from typing import .+$', content, flags=re.MULTILINE)
+        line = f"\nfrom {module} import {', '.join(sorted(names))}"
+        return content[:typing_import.end()] + line + content[typing_import.end():]
+    imported = sorted(set(match.group(1).split(', ')) | set(names))
+    return content[:match.start(1)] + ', '.join(imported) + content[match.end(1):]
+
+
+def cleanup(file_path):
     with open(file_path, 'r') as file:
         content = file.read()
 
-    # Replace the deprecated Extra configuration with the new string literal
-    content = re.sub(r'extra = Extra\.([a-z]+)', r"extra = '\1'", content)
+    content = collapse_unions(update_config(content))
 
     with open(file_path, 'w') as file:
         file.write(content)
 
 if __name__ == "__main__":
+    # The generated code supports Python 3.8, but generating it needs ast.unparse
+    if sys.version_info < (3, 9):
+        print("Error: cleanup_codegen.py needs Python 3.9 or later.")
+        sys.exit(1)
     if len(sys.argv) != 2:
         print("Usage: python cleanup_codegen_output.py <file_path>")
         sys.exit(1)
 
     file_path = sys.argv[1]
-    
+
     if not file_path.endswith('.py'):
         print("Error: The provided file is not a Python file.")
         sys.exit(1)
-    
+
     try:
-        update_config(file_path)
+        cleanup(file_path)
         print(f"Cleanup completed for {file_path}")
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,106 @@
+import ast
+import sys
+import typing
+
+# The models the migration builds once per dbt node or column
+MIRRORED = ['Table', 'Column', 'Lineage', 'Constraint', 'Partition']
+
+HEADER = '''\
+# generated by scripts/generate_mirrors.py from models.py, do not edit
+
+from __future__ import annotations
+
+from typing import {typing_names}
+
+from dbt_sdf.schema.base import Mirror
+from dbt_sdf.schema.generated import models
+'''
+
+
+class _Qualify(ast.NodeTransformer):
+    """Point annotation names at the pydantic models unless they have a mirror."""
+
+    def __init__(self, classes):
+        self.classes = classes
+
+    def visit_Name(self, node):
+        if node.id in self.classes and node.id not in MIRRORED:
+            return ast.Attribute(ast.Name('models'), node.id)
+        return node
+
+
+def _fields(cls, classes):
+    """Return (name, alias, required, annotation source) for each field of a generated model."""
+    fields = []
+    for stmt in cls.body:
+        if not isinstance(stmt, ast.AnnAssign):
+            continue
+        alias = None
+        default = stmt.value
+        if isinstance(default, ast.Call):  # Field(default, alias=..., description=...)
+            keywords = {keyword.arg: keyword.value for keyword in default.keywords}
+            if 'alias' in keywords:
+                alias = keywords['alias'].value
+            default = default.args[0] if default.args else keywords.get('default')
+        required = default is None or default.value is Ellipsis
+        if not required and default.value is not None:
+            raise ValueError(f'{cls.name}.{stmt.target.id}: only None defaults are supported')
+        annotation = ast.unparse(_Qualify(classes).visit(stmt.annotation))
+        fields.append((stmt.target.id, alias, required, annotation))
+    return fields
+
+
+def _mirror(cls, classes):
+    fields = _fields(cls, classes)
+    required = [name for name, _, is_required, _ in fields if is_required]
+    optional = [name for name, _, is_required, _ in fields if not is_required]
+    aliases = {name: alias for name, alias, _, _ in fields if alias}
+
+    lines = [f'class {cls.name}(Mirror):', f'    """Plain mirror of models.{cls.name}."""', '']
+    lines.append('    __slots__ = (' + ''.join(f'\n        {name!r},' for name, _, _, _ in fields) + '\n    )')
+    lines.append(f'    __model__ = models.{cls.name}')
+    if aliases:
+        lines.append('    __aliases__ = {' + ''.join(
+            f'\n        {name!r}: {alias!r},' for name, alias in aliases.items()) + '\n    }')
+    lines.append('')
+    for name, _, _, annotation in fields:
+        lines.append(f'    {name}: {annotation}')
+    lines.append('')
+
+    parameters = ''.join(f'\n        {name},' for name in required)
+    if optional:
+        parameters += '\n        *,' + ''.join(f'\n        {name}=None,' for name in optional)
+    lines.append(f'    def __init__(\n        self,{parameters}\n    ):')
+    lines.extend(f'        self.{name} = {name}' for name, _, _, _ in fields)
+    return '\n'.join(lines) + '\n'
+
+
+def generate_mirrors(models_source):
+    tree = ast.parse(models_source)
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+    mirrors = [_mirror(classes[name], classes) for name in MIRRORED]
+    body = '\n\n'.join(mirrors)
+    typing_names = sorted(name for name in typing.__all__ if f'{name}[' in body)
+    return HEADER.format(typing_names=', '.join(typing_names)) + '\n\n' + body
+
+
+if __name__ == "__main__":
+    # The generated code supports Python 3.8, but generating it needs ast.unparse
+    if sys.version_info < (3, 9):
+        print("Error: generate_mirrors.py needs Python 3.9 or later.")
+        sys.exit(1)
+    if len(sys.argv) != 3:
+        print("Usage: python generate_mirrors.py <models_path> <mirrors_path>")
+        sys.exit(1)
+
+    models_path, mirrors_path = sys.argv[1:]
+    try:
+        with open(models_path, 'r') as file:
+            content = generate_mirrors(file.read())
+    except FileNotFoundError:
+        print(f"Error: File '{models_path}' not found.")
+        sys.exit(1)
+
+    with open(mirrors_path, 'w') as file:
+        file.write(content)
+    print(f"Mirrors generated in {mirrors_path}")
@@ -32,6 +32,15 @@ def _plugin_version() -> str:
     return attributes["version"]
 
 
+# The model parser is compiled with mypyc only when asked to, e.g.
+# DBT_SDF_MYPYC=1 pip wheel . Without a compiled module the pure-Python one is used.
+ext_modules = []
+if os.environ.get("DBT_SDF_MYPYC"):
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["dbt_sdf/model_parser/parser.py"], opt_level="3")
+
+
 package_name = "dbt-sdf"
 description = """The SDF migration tool (dbt-sdf)"""
 
@@ -49,8 +58,11 @@ setup(
     install_requires=[
         "dbt-core>=1.8.0",
         "dbt-adapters>=1.3.0,<2.0",
-        "sdf-cli>=0.3.23"
+        "sdf-cli>=0.3.23",
+        "mypy_extensions>=0.4.3",
+        "typing_extensions>=4.0",
     ],
+    ext_modules=ext_modules,
     zip_safe=False,
     classifiers=[
         "Development Status :: 5 - Production/Stable",
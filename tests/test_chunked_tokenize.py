@@ -0,0 +1,100 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.differential import TemplateGenerator
+from dbt_sdf.model_parser import is_compiled, parser
+from dbt_sdf.model_parser.parser import chunk_boundaries, tokenize, tokenize_chunked
+
+# Delimiters inside strings, unclosed quotes and '#' in blocks may fool the prescan
+TRICKY = """select a,
+{{ ref('x') }} as b
+{{ 'a }}
+string' }}
+{# a
+comment #}
+{% set y = {'k':
+  {'n': 1}} %}
+{{ x | upper }}
+{{ 'unterminated
+{{ a # b
+}}
+"""
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def assert_same_tokens(code, **kwargs):
+    assert tokenize_chunked(code, **kwargs) == tokenize(code, max_workers=1)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 16, 64])
+def test_tricky_template(executor, chunk_size):
+    assert_same_tokens(TRICKY * 3, chunk_size=chunk_size, executor=executor)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_generated_templates(executor, seed):
+    rng = random.Random(seed)
+    code = "\n".join(TemplateGenerator(rng, 3).template() for _ in range(5))
+    assert_same_tokens(code, chunk_size=rng.choice([8, 32, 128]), executor=executor)
+
+
+def test_boundaries_are_after_line_breaks_outside_blocks():
+    code = "select 1\n{{ a\n}}\nfrom b\n{% if c %}\nd\n{% endif %}\n" * 10
+    boundaries = chunk_boundaries(code, 20)
+    assert boundaries
+    for boundary in boundaries:
+        assert code[boundary - 1] == "\n"
+        before = code[:boundary]
+        assert before.count("{{") == before.count("}}") and before.count("{%") == before.count("%}")
+
+
+def test_process_pool():
+    code = TRICKY * 20
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert_same_tokens(code, chunk_size=100, executor=executor)
+
+
+@pytest.mark.parametrize("code", ["select 1 {# oops", "select 1\n{# oops\nfrom a\n{{ b }}\nwhere c\n"])
+def test_unterminated_comments_raise_syntax_error(executor, code):
+    with pytest.raises(SyntaxError, match="Unterminated comment"):
+        tokenize(code, max_workers=1)
+    # Whether the comment starts in the last chunk or in one tokenized again with the rest
+    for chunk_size in (4, 100):
+        with pytest.raises(SyntaxError, match="Unterminated comment"):
+            tokenize_chunked(code, chunk_size=chunk_size, executor=executor)
+
+
+@pytest.mark.skipif(is_compiled(parser), reason="compiled calls between module functions cannot be patched")
+@pytest.mark.parametrize("cpus, max_workers, chunked_workers", [
+    (1, None, None),
+    (None, None, None),
+    (4, 1, None),
+    (4, None, 4),
+    (1, 2, 2),
+])
+def test_default_workers_follow_the_cpu_count(monkeypatch, cpus, max_workers, chunked_workers):
+    # Chunks are only tokenized on a process pool with more than one worker to run them
+    calls = []
+
+    def recording_tokenize_chunked(code, deadline=None, max_workers=None):
+        calls.append(max_workers)
+        return tokenize(code, max_workers=1)
+
+    monkeypatch.setattr(os, "cpu_count", lambda: cpus)
+    monkeypatch.setattr(parser, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr(parser, "tokenize_chunked", recording_tokenize_chunked)
+    assert tokenize(TRICKY, max_workers=max_workers) == tokenize(TRICKY, max_workers=1)
+    assert calls == ([] if chunked_workers is None else [chunked_workers])
+
+
+def test_small_templates_are_tokenized_in_one_piece():
+    assert chunk_boundaries("select {{ a }}", 100) == []
+    assert tokenize_chunked("select {{ a }}", chunk_size=100) == tokenize("select {{ a }}")
@@ -0,0 +1,86 @@
+import importlib.util
+import os
+import sys
+import textwrap
+
+import pytest
+
+spec = importlib.util.spec_from_file_location(
+    "cleanup_codegen", os.path.join(os.path.dirname(__file__), os.pardir, "scripts", "cleanup_codegen.py"))
+cleanup_codegen = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cleanup_codegen)
+
+# The script runs at development time only, and needs ast.unparse
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 9), reason="needs Python 3.9 or later")
+
+GENERATED = textwrap.dedent('''\
+    from enum import Enum
+    from typing import Optional, Union
+
+    from pydantic import BaseModel, Extra, Field
+
+
+    class Kind1(Enum):
+        view = 'view'
+
+
+    class Kind2(Enum):
+        table = 'table'
+
+
+    class Kind3(BaseModel):
+        other: str
+
+
+    class Tag(Enum):
+        a = 'a'
+
+
+    class Tag2(Enum):
+        b = 'b'
+
+
+    class A(BaseModel):
+        type: Tag
+
+
+    class B(BaseModel):
+        type: Tag2
+
+
+    class Model(BaseModel):
+        class Config:
+            extra = Extra.forbid
+
+        kind: Optional[Union[Kind1, Kind2, Kind3]] = Field(None, description='The kind')
+        only_enums: Optional[Union[Kind1, Kind2]] = None
+        tagged: Optional[Union[A, B]] = Field(None)
+    ''')
+
+
+def test_collapse_unions():
+    content = cleanup_codegen.collapse_unions(cleanup_codegen.update_config(GENERATED))
+    assert "extra = 'forbid'" in content
+    assert "class Kind(Enum):\n    view = 'view'\n    table = 'table'\n\n\nclass Kind3" in content
+    assert "kind: Optional[Union[Kind, Kind3]] = Field(None, description='The kind')" in content
+    assert "only_enums: Optional[Kind] = None" in content
+    assert "tagged: Optional[Annotated[Union[A, B], Field(discriminator='type')]] = Field(None)" in content
+    assert "type: Literal['a']" in content and "type: Literal['b']" in content
+    assert "class Tag" not in content and "Kind1" not in content
+    assert "from typing import Literal, Optional, Union\nfrom typing_extensions import Annotated\n" in content
+
+    namespace = {}
+    exec(content, namespace)
+    model = namespace["Model"](kind="table", only_enums="view", tagged={"type": "b"})
+    assert model.kind is namespace["Kind"].table
+    assert type(model.tagged).__name__ == "B"
+
+
+def test_collapse_unions_is_idempotent():
+    content = cleanup_codegen.collapse_unions(GENERATED)
+    assert cleanup_codegen.collapse_unions(content) == content
+
+
+def test_collapse_unions_keeps_enums_used_on_their_own():
+    content = GENERATED + "    standalone: Kind1\n"
+    assert "class Kind1(Enum)" in cleanup_codegen.collapse_unions(content)
@@ -1,5 +1,61 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
 from dbt_sdf.cli.main import cli
 
 
 def test_cli():
-    assert cli() == None
\ No newline at end of file
+    assert cli() == None
+
+def test_parse_calls(tmp_path):
+    model = tmp_path / "model.sql"
+    model.write_text("{{ config(materialized='view') }}\nselect * from {{ ref('upstream') }}")
+    result = CliRunner().invoke(cli, ["parse", str(model), "--calls"])
+    assert result.exit_code == 0
+    assert result.output.startswith("config: FunctionCall(")
+    assert "ref: FunctionCall(" in result.output
+
+
+def test_parse_streams_trees(tmp_path):
+    model = tmp_path / "model.sql"
+    model.write_text("{{ config(materialized='view') }}\nselect * from {{ ref('upstream') }}")
+    result = CliRunner().invoke(cli, ["parse", str(model)])
+    assert result.exit_code == 0
+    assert result.output.startswith("Expression(\n")
+
+    result = CliRunner().invoke(cli, ["parse", str(model), "--format", "json", "--max-depth", "1"])
+    assert result.exit_code == 0
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert [tree["node"] for tree in lines] == ["Expression", "Node", "Expression"]
+    assert lines[0]["children"][1] == {"node": "FunctionCall", "truncated": True}
+
+
+def test_version(monkeypatch):
+    import dbt.version
+
+    monkeypatch.setattr(dbt.version, "get_version_information", lambda: "Core:\n  - installed: 1.0.0")
+    for flag in ("--version", "-V", "-v"):
+        result = CliRunner().invoke(cli, [flag])
+        assert result.exit_code == 0
+        assert result.output == "Core:\n  - installed: 1.0.0\n"
+
+
+@pytest.mark.parametrize("args", [
+    ["--debug", "migrate", "--help"],
+    ["--log-format", "json", "--warn-error", "migrate", "--help"],
+    ["--no-partial-parse", "--quiet", "migrate", "--help"],
+])
+def test_dbt_global_flags_are_accepted_before_migrate(args):
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert "Migrates a dbt project" in result.output
+
+
+def test_dbt_global_flags_only_come_before_dbt_commands(tmp_path):
+    model = tmp_path / "model.sql"
+    model.write_text("select 1")
+    result = CliRunner().invoke(cli, ["--debug", "parse", str(model)])
+    assert result.exit_code == 2
+    assert "No such option '--debug'" in result.output
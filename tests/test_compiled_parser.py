@@ -0,0 +1,34 @@
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.differential import TemplateGenerator
+from dbt_sdf.model_parser import is_compiled, load_source
+from dbt_sdf.model_parser import parser
+
+
+@pytest.fixture(scope="module")
+def pure_parser():
+    return load_source("parser", "dbt_sdf.model_parser._pure_parser")
+
+
+def test_pure_python_can_be_forced():
+    env = dict(os.environ, DBT_SDF_PURE_PYTHON="1")
+    result = subprocess.run(
+        [sys.executable, "-c", "import dbt_sdf.model_parser.parser as p; print(p.__file__)"],
+        capture_output=True, text=True, check=True, env=env,
+    )
+    assert result.stdout.strip().endswith("parser.py")
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_loaded_parser_matches_the_source(pure_parser, seed):
+    code = TemplateGenerator(random.Random(seed), 4).template()
+    assert repr(parser.Parser(parser.tokenize(code)).parse()) == repr(pure_parser.Parser(pure_parser.tokenize(code)).parse())
+
+
+def test_source_module_is_not_compiled(pure_parser):
+    assert not is_compiled(pure_parser)
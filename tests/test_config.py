@@ -0,0 +1,137 @@
+import pytest
+
+from dbt_sdf.migration.config import (
+    ConfigResolver,
+    ConfigTrie,
+    DynamicConfig,
+    apply_config,
+    call_config,
+    merge_configs,
+    properties_configs,
+)
+from dbt_sdf.migration.pipeline import ModelSource, run_pipeline
+from dbt_sdf.model_parser.evaluator import Evaluator
+from dbt_sdf.model_parser.parser import Parser, tokenize
+from dbt_sdf.schema.generated import mirrors
+from dbt_sdf.schema.generated.models import Materialization, Materialization10, Severity
+
+PROJECT_MODELS = {
+    "root": {
+        "+materialized": "view",
+        "+tags": ["root"],
+        "staging": {
+            "+materialized": "table",
+            "+tags": "staging",
+            "+meta": {"owner": "data"},
+            "deep": {"+meta": {"tier": 1}},
+        },
+        "marts": {"materialized": "incremental"},
+    },
+}
+
+
+def config_calls(code, evaluator=None):
+    return (evaluator or Evaluator()).calls(Parser(tokenize(code)).parse(), 'config')
+
+
+def test_merge_configs_follows_dbt_merge_behavior():
+    base = {"tags": ["a"], "meta": {"x": "1"}, "grants": {"select": ["r1"]}, "materialized": "view"}
+    merged = merge_configs(base, {"+tags": "b", "meta": {"y": "2"}, "grants": {"select": "r2"},
+                                  "materialized": "table", "pre-hook": "select 1"})
+    assert merged == {
+        "tags": ["a", "b"],
+        "meta": {"x": "1", "y": "2"},
+        "grants": {"select": ["r1", "r2"]},
+        "materialized": "table",
+        "pre_hook": ["select 1"],
+    }
+    assert base["tags"] == ["a"]
+
+
+def test_trie_merges_down_each_prefix():
+    trie = ConfigTrie.from_project(PROJECT_MODELS)
+    assert trie.resolve(["root", "x"]) == {"materialized": "view", "tags": ["root"]}
+    assert trie.resolve(["root", "staging", "deep", "y"]) == {
+        "materialized": "table", "tags": ["root", "staging"], "meta": {"owner": "data", "tier": 1},
+    }
+    # Keys without '+' are configs when their value is not a dict
+    assert trie.resolve(["root", "marts", "z"])["materialized"] == "incremental"
+    assert trie.resolve(["other_package", "m"]) == {}
+
+
+def test_trie_reads_dict_configs_without_plus():
+    trie = ConfigTrie.from_project({"root": {
+        "meta": {"owner": "data"},
+        "grants": {"select": ["reporter"]},
+        "marts": {"meta": {"tier": 1}, "persist-docs": {"relation": True}},
+    }})
+    assert trie.resolve(["root", "marts", "m"]) == {
+        "meta": {"owner": "data", "tier": 1}, "grants": {"select": ["reporter"]}, "persist_docs": {"relation": True},
+    }
+    assert set(trie.children["root"].children) == {"marts"}
+
+
+def test_properties_configs(tmp_path):
+    (tmp_path / "schema.yml").write_text(
+        "version: 2\nmodels:\n  - name: a\n    config:\n      materialized: table\n  - name: b\n")
+    (tmp_path / "notes.txt").write_text("models: []")
+    assert properties_configs([str(tmp_path)], "root") == {("root", "a"): {"materialized": "table"}}
+
+
+def test_properties_configs_skip_malformed_files(tmp_path):
+    (tmp_path / "a.yml").write_text("models:\n  - name: a\n    config:\n      materialized: table\n")
+    (tmp_path / "broken.yml").write_text("models:\n  - name: [unclosed\n")
+    (tmp_path / "latin1.yml").write_bytes("models:\n  - name: \xe9\n".encode("latin-1"))
+    errors = {}
+    assert properties_configs([str(tmp_path)], "root", errors) == {("root", "a"): {"materialized": "table"}}
+    assert sorted(errors) == [str(tmp_path / "broken.yml"), str(tmp_path / "latin1.yml")]
+    assert properties_configs([str(tmp_path)], "root") == {("root", "a"): {"materialized": "table"}}
+
+
+def test_call_config_literals_and_dynamic_values():
+    calls = config_calls("{{ config(materialized='table', tags=['x'], enabled=true) }}{{ config(tags='y') }}")
+    assert call_config(calls) == {"materialized": "table", "tags": ["x", "y"], "enabled": True}
+    with pytest.raises(DynamicConfig):
+        call_config(config_calls("{{ config(materialized=var('m')) }}"))
+    with pytest.raises(DynamicConfig):
+        call_config(config_calls("{% if is_incremental() %}{{ config(tags='x') }}{% endif %}"))
+    evaluator = Evaluator(vars={"m": "view"}, target={"name": "prod"})
+    calls = config_calls("{% if target.name == 'prod' %}{{ config(materialized=var('m')) }}{% endif %}", evaluator)
+    assert call_config(calls) == {"materialized": "view"}
+
+
+def test_resolver_precedence():
+    resolver = ConfigResolver(ConfigTrie.from_project(PROJECT_MODELS), {
+        ("root", "a"): {"materialized": "ephemeral"},
+        ("other_package", "b"): {"materialized": "ephemeral"},
+    })
+    fqn = ["root", "staging", "a"]
+    assert resolver.resolve(fqn, "a")["materialized"] == "ephemeral"
+    calls = config_calls("{{ config(materialized='view') }}")
+    assert resolver.resolve(fqn, "a", calls)["materialized"] == "view"
+    # Only the b of another package has a properties-file config
+    assert resolver.resolve(["root", "staging", "b"], "b")["materialized"] == "table"
+
+
+def test_apply_config():
+    table = mirrors.Table("t")
+    apply_config(table, {"materialized": "incremental", "severity": "WARN", "meta": {"owner": "a", "tier": 1}})
+    assert table.materialization is Materialization.incremental_table
+    assert table.severity is Severity.warning
+    assert table.meta == {"owner": "a", "tier": "1"}
+    apply_config(table, {"materialized": "ephemeral"})
+    assert table.materialization == Materialization10(other="ephemeral")
+
+
+def test_pipeline_applies_configs():
+    sources = [
+        ModelSource("model.root.a", "a", "root", "models/staging/a.sql", "{{ config(severity='error') }} select 1"),
+        ModelSource("model.root.b", "b", "root", "models/b.sql", "{{ config(materialized=var('m')) }} select 1"),
+    ]
+    assert sources[0].fqn == ["root", "staging", "a"]
+    resolver = ConfigResolver(ConfigTrie.from_project(PROJECT_MODELS))
+    a, b = run_pipeline(sources, configs=resolver)
+    assert a.table.materialization is Materialization.table
+    assert a.table.severity is Severity.error
+    assert a.table.meta == {"owner": "data"}
+    assert b.fallback_reason.startswith("dynamic config")
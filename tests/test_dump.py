@@ -0,0 +1,101 @@
+import io
+import json
+import tracemalloc
+
+from dbt_sdf.model_parser.dump import dump, dump_json
+from dbt_sdf.model_parser.parser import BinaryOp, IfStatement, Literal, Node, Parser, Token, Variable, tokenize
+
+TEMPLATE = """{{ config(materialized='table', tags=['a', 'b']) }}
+select {% if target.name == 'prod' %}{{ ref('a') }}{% elif x %}b{% else %}{{ f(y=1) }}{% endif %}
+{% for i in [1, 2] %}{{ i }}{% endfor %} {{ {'k': v.w[0]} }}
+"""
+
+
+def parse(code, lazy=False):
+    return Parser(tokenize(code), lazy=lazy).parse()
+
+
+def dumped(trees, dumper=dump, **kwargs):
+    stream = io.StringIO()
+    dumper(trees, stream, **kwargs)
+    return stream.getvalue()
+
+
+class NullStream:
+    def write(self, text):
+        pass
+
+
+def test_dump_matches_pretty_repr():
+    # Without keyword arguments or if statements, which pretty_repr() writes differently
+    for tree in parse("{{ config(1, [1, y.z[0]]) }} text {% for i in x %}{{ i }}{% endfor %}{% macro m(a) %}{% endmacro %}"):
+        assert dumped(tree) == tree.pretty_repr() + "\n"
+
+
+def test_dump_writes_if_statements_at_any_depth():
+    text = dumped(parse("{% for i in x %}{% if i %}{{ ref('a') }}{% else %}b{% endif %}{% endfor %}"))
+    assert "        IfStatement(\n" in text
+    assert "ConditionBlock(" in text
+    assert "Token('STRING', \"'a'\"" in text
+
+
+def test_dump_limits_depth():
+    text = dumped(parse(TEMPLATE), max_depth=1)
+    assert "FunctionCall(...)" in text
+    assert "Token(" in text
+    assert "'table'" not in text
+    assert dumped(parse(TEMPLATE), max_depth=100) == dumped(parse(TEMPLATE))
+
+
+def test_dump_parses_lazy_bodies():
+    assert dumped(parse(TEMPLATE, lazy=True)) == dumped(parse(TEMPLATE))
+
+
+def test_dump_json():
+    trees = json.loads(dumped(parse(TEMPLATE), dump_json))
+    assert trees[0]["node"] == "Expression"
+    assert trees[0]["children"][0] == {"type": "EXPR_OPEN", "value": "{{", "line": 1, "column": 1}
+    statement = next(tree for tree in trees if tree["node"] == "IfStatement")
+    assert [clause["node"] for clause in statement["clauses"]] == ["ConditionBlock"] * 3
+    assert statement["clauses"][2]["condition"] is None
+    assert set(statement) == {"node", "clauses", "endif_token", "close_token"}
+
+
+def test_dump_json_limits_depth():
+    trees = json.loads(dumped(parse(TEMPLATE), dump_json, max_depth=1))
+    assert trees[0]["children"][1] == {"node": "FunctionCall", "truncated": True}
+    assert json.loads(dumped(parse(TEMPLATE), dump_json, max_depth=0)) == [
+        {"node": type(tree).__name__, "truncated": True} for tree in parse(TEMPLATE)]
+
+
+def test_dump_json_escapes_text():
+    tree = Node(Token("TEXT", 'say "hi"\n\té', 1, 0))
+    assert json.loads(dumped(tree, dump_json))["token"]["value"] == 'say "hi"\n\té'
+
+
+def test_deep_trees_dump_without_recursing():
+    node = Variable(Token("IDENTIFIER", "x", 1, 0))
+    for _ in range(2_000):
+        node = BinaryOp(Token("OP", "+", 1, 0), [node, Literal(Token("NUMBER", "1", 1, 0))])
+    assert dumped(node).count("BinaryOp(") == 2_000
+    text = dumped(node, dump_json)
+    assert text.startswith('{"node": "BinaryOp", ')
+    assert text.count('"node": "BinaryOp"') == 2_000
+
+
+def test_dumping_wide_trees_takes_constant_memory():
+    trees = [Node(Token("TEXT", "x" * 10, i, 0)) for i in range(20_000)]
+    for dumper in (dump, dump_json):
+        tracemalloc.start()
+        try:
+            dumper(trees, NullStream())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak < 64 * 1024
+
+
+def test_if_statements_dump_their_clauses():
+    statement = parse("{% if a %}x{% endif %}")[0]
+    assert isinstance(statement, IfStatement)
+    assert dumped(statement).startswith("IfStatement(\n    [\n        ConditionBlock(\n")
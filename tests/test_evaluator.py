@@ -0,0 +1,141 @@
+import pytest
+
+from dbt_sdf.model_parser.evaluator import UNKNOWN, Evaluator, is_known
+from dbt_sdf.model_parser.parser import Parser, tokenize
+
+
+def parse(code):
+    return Parser(tokenize(code)).parse()
+
+
+def expression(code):
+    return parse("{{ " + code + " }}")[0].children[1]
+
+
+@pytest.fixture
+def evaluator():
+    return Evaluator(vars={"schema_suffix": "x", "days": 7, "enabled_models": ["a"]}, target={"name": "prod"})
+
+
+@pytest.mark.parametrize("code, expected", [
+    ("'table'", "table"),
+    ("3", 3),
+    ("2.5", 2.5),
+    ("true", True),
+    ("none", None),
+    ("['a', 'b']", ["a", "b"]),
+    ("{'k': 1, other: [2]}", {"k": 1, "other": [2]}),
+    ("var('days')", 7),
+    ("var('missing', 'fallback')", "fallback"),
+    ("var('enabled_models')[0]", "a"),
+    ("target.name", "prod"),
+    ("target.name == 'prod'", True),
+    ("target.name != 'prod' and 'table' or 'view'", "view"),
+    ("var('days') * 2 + 1", 15),
+    ("not (var('days') > 10)", True),
+    ("-var('days')", -7),
+    ("'a' + 'b'", "ab"),
+])
+def test_constant_expressions(evaluator, code, expected):
+    assert evaluator.evaluate(expression(code)) == expected
+
+
+@pytest.mark.parametrize("code", [
+    "var('missing')",
+    "target.schema",
+    "my_macro()",
+    "adapter.dispatch('x')",
+    "this",
+    "var('days') / 0",
+    "['a', unknown_name]",
+    "target.name == unknown_name",
+    "unknown_name and true",
+])
+def test_unknown_expressions(evaluator, code):
+    assert not is_known(evaluator.evaluate(expression(code)))
+
+
+def test_boolean_operators_short_circuit_over_unknowns(evaluator):
+    assert evaluator.evaluate(expression("false and unknown_name")) is False
+    assert evaluator.evaluate(expression("'x' or unknown_name")) == "x"
+
+
+def test_unknown_has_no_truth_value():
+    with pytest.raises(TypeError):
+        bool(UNKNOWN)
+
+
+def test_arguments(evaluator):
+    call = expression("config(materialized=var('m', 'view'), tags=['t', target.name], post_hook=my_macro())")
+    args, kwargs = evaluator.arguments(call)
+    assert args == []
+    assert kwargs["materialized"] == "view"
+    assert kwargs["tags"] == ["t", "prod"]
+    assert kwargs["post_hook"] is UNKNOWN
+
+
+def test_if_branches(evaluator):
+    trees = parse(
+        "{% if target.name == 'dev' %}{{ config(materialized='view') }}"
+        "{% elif var('days') > 1 %}{{ config(materialized='table') }}"
+        "{% else %}{{ config(materialized='incremental') }}{% endif %}"
+    )
+    assert [(call.kwargs, call.certain) for call in evaluator.calls(trees, 'config')] == [
+        ({"materialized": "table"}, True),
+    ]
+
+
+def test_undecidable_conditions_loops_and_macros_are_uncertain(evaluator):
+    trees = parse(
+        "{% if is_incremental() %}{{ config(materialized='table') }}{% endif %}"
+        "{% for m in ['a'] %}{{ config(tags=[m]) }}{% endfor %}"
+        "{% macro helper() %}{{ config(tags=['x']) }}{% endmacro %}"
+        "{{ config(alias='a') }}"
+    )
+    assert [call.certain for call in evaluator.calls(trees, 'config')] == [False, False, False, True]
+
+
+def test_set_statements_are_tracked(evaluator):
+    trees = parse(
+        "{% set materialization = var('m', 'view') %}{% set tags = [materialization, other()] %}"
+        "{{ config(materialized=materialization, tags=tags) }}"
+    )
+    call, = evaluator.calls(trees, 'config')
+    assert call.certain
+    assert call.kwargs["materialized"] == "view"
+    assert not is_known(call.kwargs["tags"])
+
+
+def test_with_and_for_bindings_do_not_leak(evaluator):
+    trees = parse(
+        "{% set x = 'outer' %}"
+        "{% with x = 'a', y = x %}{{ config(materialized=x, alias=y) }}{% set z = 1 %}{% endwith %}"
+        "{% for x in items %}{% set z = 2 %}{% endfor %}"
+        "{{ config(materialized=x, tags=z) }}"
+    )
+    inner, outer = evaluator.calls(trees, 'config')
+    assert inner.certain and inner.kwargs == {"materialized": "a", "alias": "outer"}
+    assert outer.certain and outer.kwargs == {"materialized": "outer", "tags": UNKNOWN}
+
+    call, = evaluator.calls(parse("{% with x = 'a' %}{% endwith %}{{ config(materialized=x) }}"), 'config')
+    assert call.certain and call.kwargs == {"materialized": UNKNOWN}
+
+
+@pytest.mark.parametrize("code", [
+    "'x' * 99999999999",
+    "99999999999 * ['x']",
+    "('x' * 600000) + ('y' * 600000)",
+    "'%99999999999s' % 'x'",
+    "'%(k).99999999999f' % {'k': 1}",
+    "'%*d' % [99999999999, 1]",
+])
+def test_values_larger_than_max_size_are_unknown(evaluator, code):
+    assert evaluator.evaluate(expression(code)) is UNKNOWN
+
+
+def test_values_up_to_max_size_are_folded():
+    evaluator = Evaluator(max_size=4)
+    assert evaluator.evaluate(expression("'ab' * 2")) == "abab"
+    assert evaluator.evaluate(expression("[1] + [2, 3, 4]")) == [1, 2, 3, 4]
+    assert evaluator.evaluate(expression("'%4s' % 'a'")) == "   a"
+    assert evaluator.evaluate(expression("'ab' * 3")) is UNKNOWN
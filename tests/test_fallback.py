@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import time
+
+from dbt_sdf.migration.fallback import (
+    CACHE,
+    COMPILED_ARTIFACT,
+    COMPILER,
+    MANIFEST,
+    FallbackRenderer,
+    RenderCache,
+    code_checksum,
+    compiled_with,
+    render_key,
+)
+from dbt_sdf.migration.pipeline import MigratedModel, ModelSource
+from dbt_sdf.model_parser.macros import MacroIndex, parse_macros
+from dbt_sdf.model_parser.parser import Parser, tokenize
+
+
+def fallen_back(name, raw_code="{{ dynamic() }}", parsed=False, **kwargs):
+    source = ModelSource(f"model.root.{name}", name, "root", f"models/{name}.sql", raw_code, **kwargs)
+    model = MigratedModel.from_source(source)
+    model.fallback_reason = "unsupported template"
+    if parsed:
+        model.trees = Parser(tokenize(raw_code)).parse()
+    return model
+
+
+def macro_index(code):
+    index = MacroIndex(root_project="root")
+    for macro in parse_macros(code, "macros/m.sql", "root"):
+        index.add(macro)
+    return index
+
+
+class CountingRender:
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.rendered = []
+        self.lock = threading.Lock()
+
+    def __call__(self, source):
+        with self.lock:
+            self.rendered.append(source.name)
+        time.sleep(self.delays.get(source.name, 0))
+        if source.name == "broken":
+            raise RuntimeError("macro not found")
+        return f"select '{source.name}'"
+
+
+def test_render_key_depends_on_target_and_vars():
+    assert render_key("m", "select 1") == render_key("m", "select 1", None, {})
+    assert render_key("m", "select 1") != render_key("n", "select 1")
+    assert render_key("m", "select 1", "dev") != render_key("m", "select 1", "prod")
+    assert render_key("m", "select 1", "dev", {"a": 1}) != render_key("m", "select 1", "dev", {"a": 2})
+
+
+def test_static_models_are_not_rendered():
+    render = CountingRender()
+    model = fallen_back("a")
+    model.fallback_reason = None
+    FallbackRenderer(render).render_all([model])
+    assert render.rendered == []
+    assert model.compiled_code is None
+
+
+def dbt_project(tmp_path, names, target=None, vars=None):
+    """Write model files and target/compiled artifacts as a `dbt compile` with target and vars would."""
+    args = {"which": "compile"}
+    if target is not None:
+        args["target"] = target
+    if vars:
+        args["vars"] = vars
+    (tmp_path / "target").mkdir()
+    (tmp_path / "target" / "run_results.json").write_text(json.dumps({"results": [], "args": args}))
+    for name in names:
+        (tmp_path / "models").mkdir(exist_ok=True)
+        (tmp_path / "models" / f"{name}.sql").write_text("{{ dynamic() }}")
+        artifact = tmp_path / "target" / "compiled" / "root" / "models" / f"{name}.sql"
+        artifact.parent.mkdir(parents=True, exist_ok=True)
+        artifact.write_text(f"select 'artifact {name}'")
+    return dict(target_path=str(tmp_path / "target"), project_root=str(tmp_path))
+
+
+def test_compiled_with_reads_run_results(tmp_path):
+    assert compiled_with(dbt_project(tmp_path, [], "prod", {"a": 1})["target_path"]) == ("prod", {"a": 1})
+    assert compiled_with(str(tmp_path / "missing")) is None
+
+
+def test_manifest_compiled_code_is_reused_when_checksums_match_the_model_file(tmp_path):
+    project = dbt_project(tmp_path, ["a", "b"])
+    (tmp_path / "target" / "compiled" / "root" / "models" / "b.sql").unlink()
+    render = CountingRender()
+    matching = fallen_back("a", checksum=code_checksum("{{ dynamic() }}"), compiled_code="select 'manifest'")
+    # The node was parsed from this raw code, but the file has changed since
+    stale = fallen_back("b", raw_code="older code", checksum=code_checksum("older code"),
+                        compiled_code="select 'stale'")
+    FallbackRenderer(render, render_inputs=(None, {}), **project).render_all([matching, stale])
+    assert (matching.compiled_code, matching.compiled_from) == ("select 'manifest'", MANIFEST)
+    assert (stale.compiled_code, stale.compiled_from) == ("select 'b'", COMPILER)
+    assert render.rendered == ["b"]
+
+
+def test_target_compiled_artifacts_are_reused_unless_older_than_the_model(tmp_path):
+    project = dbt_project(tmp_path, ["fresh", "outdated"])
+    model_file = tmp_path / "models" / "outdated.sql"
+    os.utime(model_file, (time.time() + 10, time.time() + 10))
+
+    render = CountingRender()
+    fresh, outdated = fallen_back("fresh"), fallen_back("outdated")
+    FallbackRenderer(render, render_inputs=(None, {}), **project).render_all([fresh, outdated])
+    assert (fresh.compiled_code, fresh.compiled_from) == ("select 'artifact fresh'", COMPILED_ARTIFACT)
+    assert outdated.compiled_from == COMPILER
+    assert render.rendered == ["outdated"]
+
+
+def test_compiled_sql_is_only_reused_with_the_same_target_and_vars(tmp_path):
+    project = dbt_project(tmp_path, ["a"], target="prod", vars={"day": "2024-01-01"})
+    for render_inputs, reused in [
+        (("prod", {"day": "2024-01-01"}), True),
+        ((None, {"day": "2024-01-01"}), False),
+        (("prod", {}), False),
+        (("prod", {"day": "2024-01-02"}), False),
+        (None, False),
+    ]:
+        model = fallen_back("a", checksum=code_checksum("{{ dynamic() }}"), compiled_code="select 'manifest'")
+        FallbackRenderer(CountingRender(), render_inputs=render_inputs, **project).render_all([model])
+        assert (model.compiled_from == MANIFEST) is reused, render_inputs
+
+
+def test_renders_are_cached_on_disk(tmp_path):
+    path = str(tmp_path / "cache" / "renders.json")
+    render = CountingRender()
+    renderer = FallbackRenderer(render, cache=RenderCache(path), target_name="dev")
+    renderer.render_all([fallen_back("a"), fallen_back("b", raw_code="{{ other() }}")])
+    renderer.cache.save()
+    assert render.rendered == ["a", "b"]
+
+    render = CountingRender()
+    models = [fallen_back("a"), fallen_back("b", raw_code="{{ changed() }}")]
+    assert render_key("model.root.a", "{{ dynamic() }}", "dev") in RenderCache(path).entries
+    FallbackRenderer(render, cache=RenderCache(path), target_name="dev").render_all(models)
+    assert [model.compiled_from for model in models] == [CACHE, COMPILER]
+    assert render.rendered == ["b"]
+
+
+def test_cached_renders_are_invalidated_by_edited_macros(tmp_path):
+    path = str(tmp_path / "renders.json")
+    macros = "{% macro dynamic() %}{{ helper() }}{% endmacro %}{% macro helper() %}1{% endmacro %}"
+    macros += "{% macro other() %}2{% endmacro %}"
+
+    def run(code, parsed=True):
+        render = CountingRender()
+        renderer = FallbackRenderer(render, cache=RenderCache(path), macros=macro_index(code))
+        renderer.render_all([fallen_back("a", parsed=parsed)])
+        renderer.cache.save()
+        return render.rendered
+
+    assert run(macros) == ["a"]
+    assert run(macros) == []
+    # A macro the model does not call changes nothing
+    assert run(macros.replace("2", "3")) == []
+    # One it calls through dynamic() does
+    assert run(macros.replace("1", "one")) == ["a"]
+    assert run(macros.replace("1", "one")) == []
+    # A model that did not parse depends on every macro
+    assert run(macros, parsed=False) == ["a"]
+    assert run(macros.replace("2", "3"), parsed=False) == ["a"]
+
+
+def test_corrupt_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "renders.json"
+    path.write_text("{not json")
+    assert RenderCache(str(path)).entries == {}
+
+
+def test_failures_and_timeouts_are_reported():
+    render = CountingRender(delays={"slow": 0.3})
+    slow, broken = fallen_back("slow"), fallen_back("broken")
+    FallbackRenderer(render, timeout=0.05, max_workers=2).render_all([slow, broken])
+    assert slow.compiled_code is None
+    assert "render timed out" in slow.fallback_reason
+    assert "render failed: macro not found" in broken.fallback_reason
+
+
+def test_timeouts_count_from_the_start_of_each_render():
+    # Renders waiting for a worker are not timed out, and renders timing out
+    # together do not add up their timeouts
+    render = CountingRender(delays={"a": 0.15, "b": 0.15, "c": 0.15, "slow1": 1, "slow2": 1, "slow3": 1})
+    queued = [fallen_back(name) for name in "abc"]
+    FallbackRenderer(render, timeout=0.25, max_workers=1).render_all(queued)
+    assert [model.compiled_from for model in queued] == [COMPILER] * 3
+
+    slow = [fallen_back(f"slow{i}") for i in range(1, 4)]
+    start = time.perf_counter()
+    FallbackRenderer(render, timeout=0.2, max_workers=3).render_all(slow)
+    assert time.perf_counter() - start < 0.4
+    assert all("render timed out" in model.fallback_reason for model in slow)
+
+
+def test_hung_renders_are_abandoned():
+    release = threading.Event()
+
+    def render(source):
+        if source.name == "hung":
+            release.wait()
+        return "select 1"
+
+    hung = fallen_back("hung")
+    models = [hung] + [fallen_back(f"m{i}") for i in range(3)]
+    start = time.perf_counter()
+    try:
+        FallbackRenderer(render, timeout=0.1, max_workers=1).render_all(models)
+        assert time.perf_counter() - start < 1
+        assert "render timed out" in hung.fallback_reason
+        # Another worker took the place of the hung one
+        assert all(model.compiled_from == COMPILER for model in models[1:])
+        hung_threads = [thread for thread in threading.enumerate() if thread.name == "dbt-sdf-render"]
+        assert hung_threads and all(thread.daemon for thread in hung_threads)
+    finally:
+        release.set()
+    # A render finishing after its timeout changes nothing
+    time.sleep(0.05)
+    assert hung.compiled_code is None
+
+
+def test_hung_renders_get_a_bounded_number_of_replacements():
+    release = threading.Event()
+
+    def render(source):
+        if source.name.startswith("hung"):
+            release.wait()
+        return "select 1"
+
+    models = [fallen_back(f"hung{i}") for i in range(4)] + [fallen_back("m")]
+    before = sum(1 for thread in threading.enumerate() if thread.name == "dbt-sdf-render")
+    try:
+        FallbackRenderer(render, timeout=0.05, max_workers=1, max_abandoned=2).render_all(models)
+        hung = sum(1 for thread in threading.enumerate() if thread.name == "dbt-sdf-render") - before
+    finally:
+        release.set()
+    assert hung == 3
+    assert all("render timed out" in model.fallback_reason for model in models[:3])
+    assert [model.fallback_reason.endswith("render skipped after 3 renders timed out") for model in models[3:]] == [
+        True, True]
+
+
+def test_renders_run_on_a_bounded_pool():
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def render(source):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return "select 1"
+
+    models = [fallen_back(f"m{i}") for i in range(8)]
+    FallbackRenderer(render, max_workers=3).render_all(models)
+    assert all(model.compiled_from == COMPILER for model in models)
+    assert peak[0] <= 3
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+# Cumulative import time allowed for the CLI entry point module. Importing
+# click alone takes roughly 30ms; dbt takes seconds.
+CLI_IMPORT_BUDGET_US = 250_000
+
+HEAVY_MODULES = ("dbt", "pydantic", "yaml", "dbt_sdf.schema", "dbt_sdf.migration")
+
+
+def import_times(module):
+    """Return {module: cumulative microseconds} as reported by python -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_does_not_import_heavy_modules():
+    imported = import_times("dbt_sdf.cli.main")
+    heavy = [name for name in imported
+             if any(name == prefix or name.startswith(prefix + ".") for prefix in HEAVY_MODULES)]
+    assert heavy == []
+
+
+def test_cli_import_time_budget():
+    # Take the best of a few runs to keep a loaded machine from failing the test
+    best = min(import_times("dbt_sdf.cli.main")["dbt_sdf.cli.main"] for _ in range(3))
+    assert best < CLI_IMPORT_BUDGET_US
+
+
+def test_parser_import_has_no_side_effects():
+    result = subprocess.run(
+        [sys.executable, "-c", "import dbt_sdf.model_parser.parser"],
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout == ""
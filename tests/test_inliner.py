@@ -0,0 +1,106 @@
+import jinja2
+import pytest
+
+from dbt_sdf.model_parser.evaluator import Evaluator
+from dbt_sdf.model_parser.inliner import Inliner, NotInlinable
+from dbt_sdf.model_parser.macros import MacroIndex, parse_macros
+from dbt_sdf.model_parser.parser import Parser, tokenize
+
+MACROS = """{% macro cents_to_dollars(col, scale=2) %}({{ col }} / 100.0)::numeric(16, {{ scale }}){% endmacro %}
+{% macro money(col) -%}
+  {{ cents_to_dollars(col, scale=4) }}
+{%- endmacro %}
+{% macro qualified(relation, col) %}{{ relation }}.{{ col }}{% endmacro %}
+{% macro branching(col) %}{% if col %}{{ col }}{% endif %}{% endmacro %}
+{% macro recursive(col) %}{{ recursive(col) }}{% endmacro %}
+{% macro doubled(col) %}{{ col }}{{ col }}{% endmacro %}
+{% macro grow(col) %}{{ doubled(doubled(doubled(col))) }}{% endmacro %}
+"""
+
+VARS = {"suffix": "usd", "columns": ["a", "b", "c"]}
+TARGET = {"name": "prod"}
+
+
+@pytest.fixture
+def inliner():
+    index = MacroIndex(root_project="root")
+    for macro in parse_macros(MACROS, "macros/money.sql", "root"):
+        index.add(macro)
+    return Inliner(index, Evaluator(vars=VARS, target=TARGET))
+
+
+def resolve(call):
+    return "db.schema." + call.children[-1].token.value[1:-1]
+
+
+def render(inliner, code):
+    return inliner.render(Parser(tokenize(code)).parse(), "root", resolve)
+
+
+def render_with_jinja(code):
+    """Render with Jinja itself, as dbt would, to check the inlined output against."""
+    environment = jinja2.Environment(extensions=["jinja2.ext.do"])
+    environment.globals.update(
+        ref=lambda name: f"db.schema.{name}",
+        source=lambda source_name, name: f"db.schema.{name}",
+        config=lambda **kwargs: "",
+        var=lambda name, default=None: VARS.get(name, default),
+        target=TARGET,
+    )
+    return environment.from_string(MACROS.replace("\n", "") + code).render()
+
+
+@pytest.mark.parametrize("code", [
+    "select {{ cents_to_dollars('amount') }} from {{ ref('orders') }}",
+    "{{ config(materialized='table') }}\nselect {{ money('amount') }} as amount_{{ var('suffix') }}",
+    "select {{ qualified(source('raw', 'orders'), 'id') }}",
+    "select\n  {%- for column in var('columns') %}\n  {{ column }}{% if not loop.last %},{% endif %}\n  {%- endfor %}\nfrom t",
+    "{% set relation = ref('orders') %}select * from {{ relation }}{# comment #}",
+    "select {% if target.name == 'prod' -%}  {{ cents_to_dollars('x', 3) }}  {%- else %}x{% endif %} from t",
+    "select {{ 1 + 2 }}, {{ true }}, {{ none }}",
+])
+def test_inlined_output_matches_jinja(inliner, code):
+    assert render(inliner, code) == render_with_jinja(code)
+
+
+@pytest.mark.parametrize("code, reason", [
+    ("{{ branching('x') }}", "statements other than text"),
+    ("{{ unknown_macro('x') }}", "was not found"),
+    ("{{ recursive('x') }}", "more than 8 deep"),
+    ("{{ cents_to_dollars() }}", "missing argument col"),
+    ("{{ cents_to_dollars('a', 'b', 'c') }}", "takes 2 arguments"),
+    ("{{ cents_to_dollars('a', precision=1) }}", "unexpected argument precision"),
+    ("{% if is_incremental() %}x{% endif %}", "if condition"),
+    ("{% for x in adapter.get_columns() %}{{ x }}{% endfor %}", "for loop"),
+    ("{{ this }}", "cannot be evaluated"),
+])
+def test_not_inlinable(inliner, code, reason):
+    with pytest.raises(NotInlinable, match=reason):
+        render(inliner, code)
+
+
+def test_size_limit(inliner):
+    inliner.max_size = 50
+    assert render(inliner, "{{ doubled('abcde') }}") == "abcdeabcde"
+    with pytest.raises(NotInlinable, match="more than 50 characters"):
+        render(inliner, "{{ grow('abcdefghij') }}")
+
+
+def test_constant_folding_is_limited(inliner):
+    with pytest.raises(NotInlinable, match="cannot be evaluated"):
+        render(inliner, "{{ 'x' * 99999999999 }}")
+
+
+def test_iteration_limit(inliner):
+    inliner.max_iterations = 20
+    assert render(inliner, "{% for i in 'abcd' %}{% for j in 'abcd' %}.{% endfor %}{% endfor %}") == "." * 16
+    with pytest.raises(NotInlinable, match="more than 20 times"):
+        render(inliner, "{% for i in 'abcde' %}{% for j in 'abcd' %}.{% endfor %}{% endfor %}")
+    inliner.max_iterations = 1_000
+    with pytest.raises(NotInlinable):
+        render(inliner, "{% for i in 'x' * 50000000 %}{% endfor %}")
+
+
+def test_refs_need_a_resolver(inliner):
+    with pytest.raises(NotInlinable):
+        inliner.render(Parser(tokenize("{{ ref('a') }}")).parse(), "root")
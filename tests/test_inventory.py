@@ -0,0 +1,74 @@
+import json
+
+from click.testing import CliRunner
+
+from dbt_sdf.cli.main import cli
+from dbt_sdf.model_parser import inventory
+from dbt_sdf.model_parser.inventory import find_sql_files, inspect_file, inspect_paths, inspect_source
+
+
+def test_inspect_source():
+    code = (
+        "{{ config(materialized='table', tags=['a', 'b'], enabled=true, meta={'owner': 'x'}) }}\n"
+        "select * from {{ ref('orders') }}\n"
+        "join {{ source('raw', 'customers') }} using (id)\n"
+        "where x = {{ ref(var('model')) }}\n"
+    )
+    result = inspect_source("m.sql", code)
+    assert result["error"] is None
+    assert result["calls"] == [
+        {"function": "config", "line": 1, "args": [],
+         "kwargs": {"materialized": "table", "tags": ["a", "b"], "enabled": True, "meta": {"owner": "x"}}},
+        {"function": "ref", "line": 2, "args": ["orders"], "kwargs": {}},
+        {"function": "source", "line": 3, "args": ["raw", "customers"], "kwargs": {}},
+        {"function": "ref", "line": 4, "args": [None], "kwargs": {}},
+    ]
+
+
+def test_inspect_source_reports_syntax_errors():
+    result = inspect_source("bad.sql", "{% if %}")
+    assert result["calls"] == []
+    assert result["error"]
+
+
+def test_unreadable_files_are_reported(tmp_path, monkeypatch):
+    (tmp_path / "a.sql").write_text("select * from {{ ref('b') }}")
+    (tmp_path / "latin1.sql").write_bytes("select 'é'".encode("latin-1"))
+    (tmp_path / "open_comment.sql").write_text("select 1 {# oops")
+    missing = str(tmp_path / "missing.sql")
+    assert inspect_file(missing)["error"]
+
+    monkeypatch.setattr(inventory, "PARALLEL_THRESHOLD", 0)
+    results = list(inspect_paths([str(tmp_path), missing], max_workers=2, threads=True))
+    assert [result["path"] for result in results] == [
+        str(tmp_path / name) for name in ("a.sql", "latin1.sql", "missing.sql", "open_comment.sql")]
+    assert [result["error"] is None for result in results] == [True, False, False, False]
+    assert "utf-8" in results[1]["error"]
+    assert results[3]["error"] == "Unterminated comment"
+
+
+def test_find_sql_files(tmp_path):
+    (tmp_path / "staging").mkdir()
+    (tmp_path / ".hidden").mkdir()
+    for name in ("a.sql", "staging/b.sql", ".hidden/c.sql", "schema.yml"):
+        (tmp_path / name).write_text("select 1")
+    assert find_sql_files([str(tmp_path)]) == [str(tmp_path / "a.sql"), str(tmp_path / "staging" / "b.sql")]
+
+
+def test_inspect_paths_parallel_matches_serial(tmp_path, monkeypatch):
+    for i in range(20):
+        (tmp_path / f"m{i:02}.sql").write_text(f"select * from {{{{ ref('m{i + 1:02}') }}}}")
+    serial = list(inspect_paths([str(tmp_path)], max_workers=1))
+    monkeypatch.setattr(inventory, "PARALLEL_THRESHOLD", 0)
+    assert list(inspect_paths([str(tmp_path)], max_workers=2)) == serial
+    assert list(inspect_paths([str(tmp_path)], max_workers=2, threads=True)) == serial
+    assert [r["calls"][0]["args"] for r in serial] == [[f"m{i + 1:02}"] for i in range(20)]
+
+
+def test_inspect_command(tmp_path):
+    (tmp_path / "a.sql").write_text("select * from {{ ref('b') }}")
+    result = CliRunner().invoke(cli, ["inspect", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert lines == [{"path": str(tmp_path / "a.sql"), "error": None,
+                      "calls": [{"function": "ref", "line": 1, "args": ["b"], "kwargs": {}}]}]
@@ -0,0 +1,14 @@
+import pytest
+
+pytest.importorskip("hypothesis")
+from hypothesis import given, settings, strategies as st
+
+from benchmarks.differential import TemplateGenerator, compare
+
+
+@settings(max_examples=300, deadline=None)
+@given(st.randoms(use_true_random=False), st.integers(min_value=1, max_value=4))
+def test_parse_matches_jinja(rng, max_depth):
+    comparison = compare(TemplateGenerator(rng, max_depth).template())
+    assert comparison.error is None, comparison.code
+    assert comparison.ours == comparison.theirs, comparison.code
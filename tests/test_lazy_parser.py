@@ -0,0 +1,108 @@
+import pickle
+import random
+
+import pytest
+
+from benchmarks.differential import TemplateGenerator
+from dbt_sdf.model_parser.parser import (
+    LazyBlock,
+    Parser,
+    collect_dbt_calls,
+    iter_nodes,
+    tokenize,
+)
+
+TEMPLATE = """{{ config(materialized='table') }}
+{% macro helper(x) %}{% for i in x %}{{ i }}{% endfor %}{% endmacro %}
+select {% if target.name == 'prod' %}{{ ref('a') }}{% elif x %}{% if y %}{{ ref('b') }}{% endif %}{% else %}c{% endif %}
+{% with z = 1 %}{{ source('s', 't') }}{% endwith %}
+"""
+
+
+def parse(code, lazy):
+    return Parser(tokenize(code), lazy=lazy).parse()
+
+
+def test_lazy_tree_matches_eager_tree():
+    assert parse(TEMPLATE, lazy=True) == parse(TEMPLATE, lazy=False)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_lazy_tree_matches_eager_tree_on_generated_templates(seed):
+    code = TemplateGenerator(random.Random(seed), 4).template()
+    assert parse(code, lazy=True) == parse(code, lazy=False)
+
+
+def test_bodies_are_parsed_on_first_read_only():
+    trees = parse(TEMPLATE, lazy=True)
+    macro = trees[2]
+    body = macro.children[4]
+    assert isinstance(body, LazyBlock)
+    assert body._pending is not None
+
+    assert len(body) == 1
+    assert body._pending is None
+    first = body[0]
+    assert first.children[4]._pending is not None  # the nested for body is still pending
+    list(body)
+    assert body[0] is first
+
+
+def test_eager_walks_give_the_same_calls():
+    lazy_calls = collect_dbt_calls(parse(TEMPLATE, lazy=True))
+    eager_calls = collect_dbt_calls(parse(TEMPLATE, lazy=False))
+    assert lazy_calls == eager_calls
+    assert sum(1 for _ in iter_nodes(parse(TEMPLATE, lazy=True))) == sum(1 for _ in iter_nodes(parse(TEMPLATE, lazy=False)))
+
+
+def test_syntax_errors_in_bodies_surface_on_read():
+    trees = parse("{% if x %}{{ 1 + }}{% endif %}after", lazy=True)
+    with pytest.raises(SyntaxError):
+        list(trees[0].clauses[0].block)
+    with pytest.raises(SyntaxError):
+        parse("{% if x %}{{ 1 + }}{% endif %}after", lazy=False)
+
+
+def test_lazy_blocks_pickle_as_their_parsed_nodes():
+    trees = parse(TEMPLATE, lazy=True)
+    assert pickle.loads(pickle.dumps(trees)) == parse(TEMPLATE, lazy=False)
+
+
+def test_every_list_method_parses_the_body_first():
+    def fresh():
+        body = parse("{% if x %}a{{ b }}{% endif %}", lazy=True)[0].clauses[0].block
+        assert isinstance(body, LazyBlock) and body._pending is not None
+        return body
+
+    nodes = parse("{% if x %}a{{ b }}{% endif %}", lazy=False)[0].clauses[0].block
+    assert [] + fresh() == nodes
+    assert fresh() + [] == nodes
+    assert fresh() * 1 == nodes and 1 * fresh() == nodes
+    assert fresh() > [] and not fresh() <= [] and [] < fresh()
+
+    body = fresh()
+    body.append("x")
+    assert body == nodes + ["x"]
+    body = fresh()
+    body.insert(0, "x")
+    assert body == ["x"] + nodes
+    body = fresh()
+    body.extend(["x"])
+    assert body == nodes + ["x"]
+    body = fresh()
+    body += ["x"]
+    assert body == nodes + ["x"]
+    body = fresh()
+    body[0] = "x"
+    assert body == ["x"] + nodes[1:]
+    body = fresh()
+    del body[0]
+    assert body == nodes[1:]
+    body = fresh()
+    assert body.pop() == nodes[-1]
+    body = fresh()
+    body.reverse()
+    assert body == nodes[::-1]
+    body = fresh()
+    body.clear()
+    assert body == [] and body._pending is None
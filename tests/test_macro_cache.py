@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dbt_sdf.model_parser.macro_cache import MacroCache, default_cache_dir
+from dbt_sdf.model_parser.macros import MacroIndex
+
+MACROS = {
+    "macros/star.sql": "{% macro star(from) %}{{ quote_all(from) }}{% endmacro %}",
+    "macros/sub/quote.sql": "{% macro quote_all(relation) %}\"{{ relation }}\"{% endmacro %}",
+    "macros/broken.sql": "{% macro broken( %}{% endmacro %}",
+}
+
+
+def write_package(root):
+    for path, content in MACROS.items():
+        os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok=True)
+        with open(os.path.join(root, path), "w") as f:
+            f.write(content)
+    return str(root)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MacroCache(str(tmp_path / "cache"))
+
+
+def index_package(cache, root, version="1.0.0"):
+    index = MacroIndex()
+    hit = cache.add_package(index, "utils", root, ["macros"], version=version)
+    return index, hit
+
+
+def test_cached_package_matches_a_fresh_parse(cache, tmp_path):
+    root = write_package(tmp_path / "project" / "dbt_packages" / "utils")
+    parsed, hit = index_package(cache, root)
+    assert not hit
+    cached, hit = index_package(cache, root)
+    assert hit
+    assert cached.macros == parsed.macros
+    assert cached.call_graph() == {"macro.utils.star": {"macro.utils.quote_all"}, "macro.utils.quote_all": set()}
+    assert cached.macros["macro.utils.star"].path == os.path.join(root, "macros", "star.sql")
+    assert cached.macros["macro.utils.star"].definition is not None
+    assert list(cached.errors) == [os.path.join(root, "macros", "broken.sql")]
+
+    direct = MacroIndex()
+    direct.add_package("utils", root, ["macros"])
+    assert cached.macros == direct.macros
+
+
+def test_projects_share_entries_for_the_same_package_version(cache, tmp_path):
+    index_package(cache, write_package(tmp_path / "a" / "dbt_packages" / "utils"))
+    index, hit = index_package(cache, write_package(tmp_path / "b" / "dbt_packages" / "utils"))
+    assert hit
+    assert index.macros["macro.utils.star"].path.startswith(str(tmp_path / "b"))
+
+
+def test_version_or_content_changes_miss(cache, tmp_path):
+    root = write_package(tmp_path / "utils")
+    index_package(cache, root)
+    assert not index_package(cache, root, version="1.1.0")[1]
+    with open(os.path.join(root, "macros", "star.sql"), "a") as f:
+        f.write("{% macro extra() %}{% endmacro %}")
+    index, hit = index_package(cache, root)
+    assert not hit
+    assert "macro.utils.extra" in index.macros
+
+
+def test_corrupt_entries_are_parsed_again(cache, tmp_path):
+    root = write_package(tmp_path / "utils")
+    index_package(cache, root)
+    for directory, _, names in os.walk(cache.directory):
+        for name in names:
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(b"truncated")
+    index, hit = index_package(cache, root)
+    assert not hit
+    assert len(index.macros) == 2
+    assert index_package(cache, root)[1]
+
+
+def test_concurrent_writers_and_readers(tmp_path):
+    root = write_package(tmp_path / "utils")
+    directory = str(tmp_path / "cache")
+
+    def run(_):
+        index, _ = index_package(MacroCache(directory), root)
+        return sorted(index.macros)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(run, range(32)))
+    assert all(result == ["macro.utils.quote_all", "macro.utils.star"] for result in results)
+    leftovers = [name for _, _, names in os.walk(directory) for name in names if name.startswith(".tmp-")]
+    assert leftovers == []
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("DBT_SDF_CACHE_DIR", str(tmp_path / "explicit"))
+    assert default_cache_dir() == str(tmp_path / "explicit")
+    monkeypatch.delenv("DBT_SDF_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert default_cache_dir() == os.path.join(str(tmp_path / "xdg"), "dbt-sdf")
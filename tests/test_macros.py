@@ -0,0 +1,95 @@
+import pytest
+
+from dbt_sdf.model_parser.macros import MacroIndex, called_names, parse_macros
+from dbt_sdf.model_parser.parser import Parser, tokenize
+
+UTILS = """{% macro star(from, except=[]) %}{{ adapter.dispatch('star', 'utils')(from, except) }}{% endmacro %}
+
+{% macro default__star(from, except) %}{{ quote_all(from) }}{% endmacro %}
+{% macro quote_all(relation) %}
+  {{ log('quoting') }}"{{ relation }}"
+{% endmacro %}
+"""
+
+PROJECT = """{% macro cents_to_dollars(col, scale=2) %}
+  ({{ col }} / 100.0)::numeric(16, {{ scale }})
+{% endmacro %}
+{% macro all_columns() %}{{ utils.star(ref('orders')) }}{% endmacro %}
+{% macro star(from) %}{{ from }}{% endmacro %}
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    (tmp_path / "utils" / "macros").mkdir(parents=True)
+    (tmp_path / "utils" / "macros" / "star.sql").write_text(UTILS)
+    (tmp_path / "root" / "macros" / "nested").mkdir(parents=True)
+    (tmp_path / "root" / "macros" / "nested" / "money.sql").write_text(PROJECT)
+    (tmp_path / "root" / "macros" / "broken.sql").write_text("{% macro broken( %}{% endmacro %}")
+    index = MacroIndex(root_project="root")
+    index.add_package("utils", str(tmp_path / "utils"), ["macros"])
+    index.add_package("root", str(tmp_path / "root"), ["macros"])
+    return index
+
+
+def test_parse_macros_records_signature_span_and_calls():
+    cents, all_columns, _ = parse_macros(PROJECT, "money.sql", "root")
+    assert cents.unique_id == "macro.root.cents_to_dollars"
+    assert cents.parameters == ["col", "scale"]
+    assert list(cents.defaults) == ["scale"]
+    assert (cents.start_line, cents.end_line) == (1, 3)
+    assert cents.calls == []
+    assert all_columns.calls == ["utils.star"]
+    assert all_columns.refs == ["orders"]
+
+
+def test_called_names_follow_dispatch_and_skip_context_functions():
+    star, default_star, quote_all = parse_macros(UTILS, "star.sql", "utils")
+    assert star.calls == ["utils.default__star"]
+    assert default_star.calls == ["quote_all"]
+    assert quote_all.calls == []
+
+
+def test_index_skips_unparseable_files(index):
+    assert len(index.macros) == 6
+    assert list(index.errors) == [next(path for path in index.errors if path.endswith("broken.sql"))]
+
+
+def test_resolution_prefers_calling_package_then_root(index):
+    assert index.resolve("star", "utils") == "macro.utils.star"
+    assert index.resolve("star", "other") == "macro.root.star"
+    assert index.resolve("utils.star") == "macro.utils.star"
+    assert index.resolve("quote_all", "root") == "macro.utils.quote_all"
+    assert index.resolve("missing") is None
+
+
+def test_call_graph_and_transitive_dependencies(index):
+    assert index.call_graph()["macro.root.all_columns"] == {"macro.utils.star"}
+    assert index.dependencies(["all_columns"], "root") == {
+        "macro.root.all_columns", "macro.utils.star", "macro.utils.default__star", "macro.utils.quote_all",
+    }
+
+
+def test_affected_models(index):
+    model_calls = {
+        "model.root.a": ("root", called_names(Parser(tokenize("select {{ all_columns() }}")).parse())),
+        "model.root.b": ("root", called_names(Parser(tokenize("select {{ cents_to_dollars('x') }}")).parse())),
+        "model.root.c": ("root", []),
+    }
+    assert index.affected_models(["macro.utils.quote_all"], model_calls) == {"model.root.a"}
+    assert index.affected_models(["macro.root.cents_to_dollars"], model_calls) == {"model.root.b"}
+    assert index.affected_models(["macro.root.star"], model_calls) == set()
+
+
+def test_digest_changes_when_a_macro_is_edited(index):
+    dependencies = index.dependencies(["all_columns"], "root")
+    before = index.digest(dependencies)
+    assert index.digest(sorted(dependencies, reverse=True)) == before
+    # Moved down the file, the macro is the same
+    for macro in parse_macros("\n\n" + UTILS, "star.sql", "utils"):
+        index.add(macro)
+    assert index.digest(dependencies) == before
+    for macro in parse_macros(UTILS.replace('"{{ relation }}"', "`{{ relation }}`"), "star.sql", "utils"):
+        index.add(macro)
+    assert index.digest(dependencies) != before
+    assert index.digest(["macro.root.cents_to_dollars"]) != index.digest(dependencies)
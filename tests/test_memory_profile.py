@@ -0,0 +1,49 @@
+import json
+
+from dbt_sdf.migration.pipeline import ModelSource, build_definitions, run_pipeline
+from dbt_sdf.profiling.memory import MemoryProfiler
+
+
+def make_sources(count):
+    return [
+        ModelSource(
+            unique_id=f"model.demo.model_{i}",
+            name=f"model_{i}",
+            package_name="demo",
+            path=f"models/model_{i}.sql",
+            raw_code=f"{{{{ config(materialized='view') }}}}\nselect * from {{{{ ref('model_{i - 1}') }}}}",
+            database="db",
+            schema="analytics",
+        )
+        for i in range(count)
+    ]
+
+
+def test_run_pipeline_extracts_calls():
+    models = run_pipeline(make_sources(3))
+    assert [len(model.ref_calls) for model in models] == [1, 1, 1]
+    assert [len(model.config_calls) for model in models] == [1, 1, 1]
+    assert all(model.is_static for model in models)
+
+
+def test_memory_profile_reports_each_phase(tmp_path):
+    profiler = MemoryProfiler(top_n=5)
+    profiler.start()
+    try:
+        models = run_pipeline(make_sources(20), profiler=profiler)
+        build_definitions("demo", models)
+        profiler.snapshot("definitions", models=len(models))
+    finally:
+        profiler.stop()
+
+    path = tmp_path / "memory.json"
+    profiler.write(str(path))
+    report = json.loads(path.read_text())
+
+    assert [phase["phase"] for phase in report["phases"]] == ["tokenize", "parse", "extract", "definitions"]
+    tokenize_phase = report["phases"][0]
+    assert tokenize_phase["models"] == 20
+    assert tokenize_phase["structures"]["tokens"]["per_model"] > 0
+    assert tokenize_phase["retained_bytes"] > 0
+    assert len(tokenize_phase["top_sites"]) <= 5
+    assert report["phases"][1]["structures"]["ast_nodes"]["total"] > 0
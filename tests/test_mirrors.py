@@ -0,0 +1,66 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+from pydantic import ValidationError
+
+from dbt_sdf.schema.generated import mirrors, models
+
+ROOT = os.path.join(os.path.dirname(__file__), os.pardir)
+
+spec = importlib.util.spec_from_file_location("generate_mirrors", os.path.join(ROOT, "scripts", "generate_mirrors.py"))
+generate_mirrors = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(generate_mirrors)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason="generate_mirrors.py needs ast.unparse")
+def test_mirrors_are_up_to_date():
+    with open(os.path.join(ROOT, "dbt_sdf", "schema", "generated", "models.py")) as f:
+        expected = generate_mirrors.generate_mirrors(f.read())
+    with open(os.path.join(ROOT, "dbt_sdf", "schema", "generated", "mirrors.py")) as f:
+        assert f.read() == expected, "run `make generate-models` or scripts/generate_mirrors.py"
+
+
+@pytest.mark.parametrize("name", generate_mirrors.MIRRORED)
+def test_mirror_fields_match_model(name):
+    mirror, model = getattr(mirrors, name), getattr(models, name)
+    assert mirror.__model__ is model
+    assert list(mirror.__slots__) == list(model.model_fields)
+    assert mirror.__aliases__ == {n: f.alias for n, f in model.model_fields.items() if f.alias}
+
+
+def test_to_dict_and_to_model():
+    table = mirrors.Table(
+        "db.pub.orders",
+        materialization=models.Materialization.view,
+        depended_on_by=["db.pub.report"],
+        columns=[mirrors.Column("id", lineage=mirrors.Lineage(copy_=["db.raw.orders.id"]))],
+        tests=[mirrors.Constraint("std.not_null(id)", severity="error")],
+    )
+    data = {
+        "name": "db.pub.orders",
+        "materialization": "view",
+        "depended-on-by": ["db.pub.report"],
+        "columns": [{"name": "id", "lineage": {"copy": ["db.raw.orders.id"]}}],
+        "tests": [{"expect": "std.not_null(id)", "severity": "error"}],
+    }
+    assert table.to_dict() == data
+    validated = table.to_model()
+    assert isinstance(validated, models.Table)
+    assert validated.model_dump(mode="json", by_alias=True, exclude_none=True) == data
+    assert table.to_model(validate=False) == validated
+
+
+def test_mirrors_do_not_validate_until_converted():
+    table = mirrors.Table("t", purpose="not-a-purpose")
+    assert table.purpose == "not-a-purpose"
+    with pytest.raises(ValidationError):
+        table.to_model()
+
+
+def test_mirrors_have_no_instance_dict():
+    with pytest.raises(AttributeError):
+        mirrors.Partition("day").unknown = 1
+    assert mirrors.Partition("day") == mirrors.Partition("day")
+    assert mirrors.Partition("day") != mirrors.Partition("hour")
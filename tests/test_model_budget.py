@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from dbt_sdf.migration.pipeline import ModelSource, run_pipeline
+from dbt_sdf.model_parser.parser import ParseBudgetExceeded, Parser, tokenize
+from dbt_sdf.profiling.timing import ModelTiming, format_slowest_models, slowest_models
+
+
+def source(name, raw_code):
+    return ModelSource(unique_id=f"model.demo.{name}", name=name, package_name="demo",
+                       path=f"models/{name}.sql", raw_code=raw_code)
+
+
+def test_tokenize_stops_at_deadline():
+    with pytest.raises(ParseBudgetExceeded):
+        tokenize("{{ a }} text " * 100, deadline=time.perf_counter() - 1)
+
+
+def test_parser_stops_at_deadline():
+    tokens = tokenize("{{ a }} text " * 1000)
+    with pytest.raises(ParseBudgetExceeded):
+        Parser(tokens, deadline=time.perf_counter() - 1).parse()
+
+
+def test_models_over_budget_use_fallback():
+    small = source("small", "select 1")
+    huge = source("huge", "{% if x %}{{ ref('a') }}{% endif %}\n" * 5000)
+    models = run_pipeline([small, huge], budget=0.001)
+
+    assert models[0].is_static
+    assert not models[1].is_static
+    assert models[1].fallback_reason.startswith("over budget")
+    assert models[1].ref_calls == []
+
+
+def test_models_over_budget_after_extraction_keep_no_calls(monkeypatch):
+    from dbt_sdf.migration import pipeline
+
+    collect_dbt_calls = pipeline.collect_dbt_calls
+
+    def slow_collect_dbt_calls(trees):
+        time.sleep(0.2)
+        return collect_dbt_calls(trees)
+
+    monkeypatch.setattr(pipeline, "collect_dbt_calls", slow_collect_dbt_calls)
+    models = run_pipeline([source("a", "{{ config(materialized='view') }} select * from {{ ref('b') }}")], budget=0.1)
+
+    assert models[0].fallback_reason.startswith("over budget: took")
+    assert models[0].trees == []
+    assert models[0].config_calls == models[0].ref_calls == models[0].source_calls == []
+
+
+def test_unparseable_models_use_fallback():
+    models = run_pipeline([source("bad", "{% unknown_tag %}"), source("open_comment", "select 1 {# oops")])
+    assert models[0].fallback_reason.startswith("unsupported template")
+    assert models[1].fallback_reason == "unsupported template: Unterminated comment"
+
+
+def test_slowest_models_report():
+    timings = [
+        ModelTiming("model.demo.a", "models/a.sql", 10, tokens=3, parse_seconds=0.5),
+        ModelTiming("model.demo.b", "models/b.sql", 20, tokens=5, tokenize_seconds=2.0),
+        ModelTiming("model.demo.c", "models/c.sql", 30, tokens=7, extract_seconds=1.0),
+    ]
+    assert [t.path for t in slowest_models(timings, 2)] == ["models/b.sql", "models/c.sql"]
+
+    report = format_slowest_models(timings, 2).splitlines()
+    assert len(report) == 4
+    assert report[2].endswith("models/b.sql")
+
+
+def test_pipeline_records_timings():
+    models = run_pipeline([source("a", "select * from {{ ref('b') }}")])
+    timing = models[0].timing
+    assert timing.tokens == len(models[0].tokens)
+    assert timing.size_bytes == len("select * from {{ ref('b') }}")
+    assert timing.total_seconds > 0
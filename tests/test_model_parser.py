@@ -49,7 +49,7 @@ class TestParser(unittest.TestCase):
             Token('STM_OPEN', '{%', 1, 30),
             Token('STM_CLOSE', '%}', 1, 39)
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     def test_if_else_endif(self):
         code = "{% if x > 10 %}High{% elif x > 5 %}Medium{% else %}Low{% endif %}"
@@ -90,7 +90,7 @@ class TestParser(unittest.TestCase):
             Token('STM_OPEN', '{%', 1, 55),
             Token('STM_CLOSE', '%}', 1, 64)
         )
-        self.assertEqual(repr(tree), repr(expect))
+        self.assertEqual(tree, expect)
 
     # Test for 'for' statement
 
@@ -120,7 +120,7 @@ class TestParser(unittest.TestCase):
                 Token('STM_CLOSE', '%}', 1, 39)
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for 'set' statement
     def test_set_statement(self):
@@ -136,7 +136,7 @@ class TestParser(unittest.TestCase):
                 Token('STM_CLOSE', '%}', 1, 17)
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for 'macro' definition
     def test_macro_definition(self):
@@ -167,7 +167,14 @@ class TestParser(unittest.TestCase):
             ]
         )
 
-#         self.assertEqual(repr(tree), repr(expected))
+#         self.assertEqual(tree, expected)
+
+    def test_macro_parameter_defaults(self):
+        code = "{% macro greet(name, greeting='Hello') %}{{ greeting }} {{ name }}{% endmacro %}"
+        tree = self.parse_code(code)
+        name, (greeting, default) = tree.children[2]
+        self.assertEqual((name.value, greeting.value), ('name', 'greeting'))
+        self.assertEqual(default, Literal(Token('STRING', "'Hello'", 1, 31)))
 
     # Test for 'return' statement
     def test_return_statement(self):
@@ -181,7 +188,7 @@ class TestParser(unittest.TestCase):
                 Token('STM_CLOSE', '%}', 1, 15)
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for 'do' statement
     def test_do_statement(self):
@@ -201,7 +208,7 @@ class TestParser(unittest.TestCase):
                 Token('STM_CLOSE', '%}', 1, 19)
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for 'with' statement
     def test_with_statement(self):
@@ -241,7 +248,7 @@ class TestParser(unittest.TestCase):
             ]
         )
 
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for 'expression' statement
     def test_expression_statement(self):
@@ -261,7 +268,7 @@ class TestParser(unittest.TestCase):
                 Token('EXPR_CLOSE', '}}', 1, 14)
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     def test_named_arguments(self):
         code = "{{config(materialization = 'view')}}"
@@ -281,7 +288,7 @@ class TestParser(unittest.TestCase):
                 Token('EXPR_CLOSE', '}}', 1, 35)
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
 
 class TestExpressions(unittest.TestCase):
@@ -312,7 +319,7 @@ class TestExpressions(unittest.TestCase):
                 Literal(Token('NUMBER', '3', 1, 5))
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for a logical 'and' expression
     def test_logical_and_expression(self):
@@ -337,7 +344,7 @@ class TestExpressions(unittest.TestCase):
             ]
         )
         # print("expected" , repr(expected))
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for a logical 'or' expression
     def test_logical_or_expression(self):
@@ -350,7 +357,7 @@ class TestExpressions(unittest.TestCase):
                 Variable(Token('IDENTIFIER', 'b', 1, 6))
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for an equality comparison
     def test_equality_expression(self):
@@ -363,7 +370,7 @@ class TestExpressions(unittest.TestCase):
                 Variable(Token('IDENTIFIER', 'b', 1, 6), [])
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for a comparison (greater than)
     def test_comparison_expression(self):
@@ -376,7 +383,7 @@ class TestExpressions(unittest.TestCase):
                 Literal(Token('NUMBER', '10', 1, 5), [])
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for a unary operation (negation)
     def test_unary_operation(self):
@@ -388,7 +395,7 @@ class TestExpressions(unittest.TestCase):
                 Variable(Token('IDENTIFIER', 'a', 1, 3), [])
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # # Test for a function call
     # def test_function_call(self):
@@ -402,7 +409,7 @@ class TestExpressions(unittest.TestCase):
     #         ]
     #     )
     #     print("expected", expected)
-    #     self.assertEqual(repr(tree), repr(expected))
+    #     self.assertEqual(tree, expected)
 
     # Test for a complex arithmetic expression
     def test_complex_arithmetic_expression(self):
@@ -421,7 +428,7 @@ class TestExpressions(unittest.TestCase):
                 )
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for a list literal
     def test_list_literal(self):
@@ -435,7 +442,7 @@ class TestExpressions(unittest.TestCase):
                 Literal(Token('NUMBER', '3', 1, 8))
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for an object literal (dictionary)
     def test_object_literal(self):
@@ -451,7 +458,7 @@ class TestExpressions(unittest.TestCase):
                     Token('NUMBER', '2', 1, 21), []))
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
     # Test for an index/object/function_call access
 
@@ -477,7 +484,7 @@ class TestExpressions(unittest.TestCase):
                 Literal(Token('NUMBER', '12', 1, 10), [])
             ]
         )
-        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(tree, expected)
 
 
 class TestDbtCallsExtraction(unittest.TestCase):
@@ -523,6 +530,52 @@ class TestDbtCallsExtraction(unittest.TestCase):
         self.assertEqual(len(source_calls), 1)
         self.assertEqual(len(ref_calls), 1)
 
+    def test_calls_nested_in_blocks(self):
+        code = """
+        {% if target.name == 'prod' %}
+            select * from {{ ref('prod_model') }}
+        {% else %}
+            {% for name in ['a', 'b'] %}
+                select * from {{ source('src', name) }}
+            {% endfor %}
+        {% endif %}
+        {{ config(tags=ref_tags(ref('tagged'))) }}
+        """
+        config_calls, source_calls, ref_calls = extract_dbt_calls(code)
+
+        self.assertEqual(len(config_calls), 1)
+        self.assertEqual(len(source_calls), 1)
+        self.assertEqual(len(ref_calls), 2)
+
+    def test_multiline_calls(self):
+        code = """{{
+            config(
+                materialized='table',
+                meta={'owner': {'team': 'data'}}
+            )
+        }}
+        select * from {{ ref(
+            'my_model'
+        ) }}"""
+        config_calls, source_calls, ref_calls = extract_dbt_calls(code)
+
+        self.assertEqual(len(config_calls), 1)
+        self.assertEqual(len(ref_calls), 1)
+        self.assertEqual(config_calls[0].children[0].token.line, 2)
+        self.assertEqual(ref_calls[0].children[0].token.line, 7)
+
+
+class TestTokenizerLines(unittest.TestCase):
+
+    def test_line_numbers_advance(self):
+        tokens = tokenize("select\n{{ a }}\n{# one\ntwo #}\n{% if b\n %}x{% endif %}")
+        lines = [(token.type, token.value, token.line) for token in tokens]
+        self.assertIn(('IDENTIFIER', 'a', 2), lines)
+        self.assertIn(('COMMENT', '{# one\ntwo #}', 3), lines)
+        self.assertIn(('IDENTIFIER', 'b', 5), lines)
+        self.assertIn(('STM_CLOSE', '%}', 6), lines)
+        self.assertNotIn('NEWLINE', [token.type for token in tokens])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import pickle
+import random
+
+import pytest
+
+from benchmarks.differential import TemplateGenerator
+from dbt_sdf.model_parser.parser import (
+    BinaryOp,
+    Literal,
+    Node,
+    Parser,
+    Token,
+    Variable,
+    collect_dbt_calls,
+    iter_nodes,
+    tokenize,
+)
+
+TEMPLATE = """{{ config(materialized='table', tags=['a', 'b']) }}
+select {% if target.name == 'prod' %}{{ ref('a') }}{% elif x %}b{% else %}{{ f(y=1) }}{% endif %}
+{% for i in [1, 2] %}{{ i }}{% endfor %} {{ {'k': v.w[0]} }}
+"""
+
+
+def parse(code, lazy=False):
+    return Parser(tokenize(code), lazy=lazy).parse()
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_equality_agrees_with_repr(seed):
+    rng = random.Random(seed)
+    left, right = (TemplateGenerator(rng, 3).template() for _ in range(2))
+    for a, b in ((left, left), (left, right)):
+        assert (parse(a) == parse(b)) == (repr(parse(a)) == repr(parse(b)))
+
+
+def test_equal_trees_hash_alike():
+    trees = parse(TEMPLATE)
+    again = parse(TEMPLATE)
+    assert trees == again
+    assert [hash(node) for node in trees] == [hash(node) for node in again]
+    assert len(set(trees) | set(again)) == len(trees)
+
+
+def test_positions_change_equality_but_not_the_fingerprint():
+    first = parse("{{ config(a=1) }}")[0]
+    moved = parse("select 1\n  {{ config(a=1) }}")[-1]
+    assert first != moved
+    assert first.fingerprint() == moved.fingerprint()
+
+
+@pytest.mark.parametrize("other", ["{{ config(a=2) }}", "{{ config(b=1) }}", "{{ config(a='1') }}",
+                                   "{{ config(a=1, b=2) }}", "{{ config([a, 1]) }}", "{%- set a = 1 -%}"])
+def test_different_structures_have_different_fingerprints(other):
+    assert parse("{{ config(a=1) }}")[0].fingerprint() != parse(other)[0].fingerprint()
+
+
+def test_node_kind_is_part_of_equality_and_fingerprint():
+    token = Token('IDENTIFIER', 'a', 1, 0)
+    assert Variable(token) != Literal(token)
+    assert Variable(token).fingerprint() != Literal(token).fingerprint()
+
+
+def test_fingerprints_are_memoized_bottom_up():
+    trees = parse(TEMPLATE)
+    fingerprint = trees[0].fingerprint()
+    assert fingerprint is trees[0].fingerprint()
+    assert all(node._fingerprint is not None for node in iter_nodes(trees[0]))
+
+
+def test_lazy_and_eager_trees_are_equal():
+    lazy, eager = parse(TEMPLATE, lazy=True), parse(TEMPLATE)
+    assert [node.fingerprint() for node in lazy] == [node.fingerprint() for node in eager]
+    assert parse(TEMPLATE, lazy=True) == eager
+
+
+def test_unpickled_trees_are_equal():
+    trees = parse(TEMPLATE)
+    assert pickle.loads(pickle.dumps(trees)) == trees
+    assert [node.fingerprint() for node in pickle.loads(pickle.dumps(trees))] == [node.fingerprint() for node in trees]
+
+
+def test_deep_trees_compare_without_recursing():
+    def chain(value):
+        node = Variable(Token('IDENTIFIER', 'x', 1, 0))
+        for _ in range(10_000):
+            node = BinaryOp(Token('OP', '+', 1, 0), [node, Literal(Token('NUMBER', value, 1, 0))])
+        return node
+
+    assert chain('1') == chain('1')
+    assert chain('1') != chain('2')
+    assert chain('1').fingerprint() == chain('1').fingerprint()
+
+
+def test_repeated_calls_deduplicate_by_fingerprint():
+    code = "{{ config(a=1) }}\n{% if x %}{{ config(a=1) }}{% endif %}\n{{ config(a=2) }}"
+    config_calls, _, _ = collect_dbt_calls(parse(code))
+    assert len(config_calls) == 3
+    assert len({call.fingerprint() for call in config_calls}) == 2
+
+
+def test_nodes_are_not_equal_to_other_types():
+    node = Node(Token('TEXT', 'a', 1, 0))
+    assert node != 'a'
+    assert node != Token('TEXT', 'a', 1, 0)
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from dbt_sdf.migration.output import OUTPUT_FORMATS, write_workspace
+from dbt_sdf.schema.loader import load_workspace
+from dbt_sdf.schema.validation import construct_definitions, validate_definitions
+
+DEFINITIONS = [
+    {"workspace": {"edition": "1.3", "name": "demo"}},
+    {"table": {"name": "demo.pub.orders", "materialization": "view", "depended-on-by": ["demo.pub.report"]}},
+    {"table": {"name": "demo.pub.report", "materialization": {"other": "custom"}}},
+]
+
+
+def test_json(tmp_path):
+    path = write_workspace(validate_definitions(DEFINITIONS), str(tmp_path), "json")
+    assert path == str(tmp_path / "workspace.sdf.json")
+    with open(path) as f:
+        assert json.load(f) == DEFINITIONS
+
+
+def test_ndjson(tmp_path):
+    path = write_workspace(construct_definitions(DEFINITIONS), str(tmp_path), "ndjson")
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line) for line in lines] == DEFINITIONS
+
+
+@pytest.mark.parametrize("output_format", sorted(OUTPUT_FORMATS))
+def test_formats_round_trip_through_the_loader(tmp_path, output_format):
+    write_workspace(validate_definitions(DEFINITIONS), str(tmp_path), output_format)
+    assert [definition.data for definition in load_workspace(str(tmp_path))] == DEFINITIONS
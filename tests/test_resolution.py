@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+
+import pytest
+
+from dbt_sdf.migration.pipeline import ModelSource, run_pipeline
+from dbt_sdf.migration.resolution import (
+    ResolutionIndex,
+    UnresolvedCall,
+    dialect_for_adapter,
+    normalize_identifier,
+    qualified_name,
+)
+from dbt_sdf.model_parser.parser import Parser, collect_dbt_calls, tokenize
+from dbt_sdf.schema.generated.models import Dialect
+
+
+def node(name, package="root", schema="pub", resource_type="model", version=None, latest_version=None, alias=None):
+    return SimpleNamespace(
+        unique_id=f"{resource_type}.{package}.{name}" + (f".v{version}" if version else ""),
+        resource_type=resource_type, name=name, package_name=package, database="db", schema=schema,
+        alias=alias or (f"{name}_v{version}" if version else name), version=version, latest_version=latest_version,
+        original_file_path=f"models/{name}.sql", raw_code="select 1", language="sql",
+    )
+
+
+def source(source_name, name, package="root", identifier=None):
+    return SimpleNamespace(
+        unique_id=f"source.{package}.{source_name}.{name}", source_name=source_name, name=name,
+        package_name=package, database="raw", schema=source_name, identifier=identifier or name,
+    )
+
+
+@pytest.fixture
+def manifest():
+    nodes = [
+        node("orders"),
+        node("orders", package="dep", schema="dep"),
+        node("helper", package="dep", schema="dep"),
+        node("helper", package="other", schema="other"),
+        node("only_in_dep", package="dep", schema="dep"),
+        node("customers", version=1, latest_version=2),
+        node("customers", version=2, latest_version=2),
+        node("countries", resource_type="seed", schema="seeds"),
+        node("not_null_orders_id", resource_type="test"),
+    ]
+    sources = [source("shop", "orders"), source("shop", "items", package="dep", identifier="Line Items")]
+    return SimpleNamespace(
+        nodes={n.unique_id: n for n in nodes},
+        sources={s.unique_id: s for s in sources},
+    )
+
+
+@pytest.fixture
+def index(manifest):
+    return ResolutionIndex.from_manifest(manifest, "root")
+
+
+def test_package_precedence(index):
+    # The root project wins over packages, even when called from a package
+    assert index.resolve_ref("orders") == "db.pub.orders"
+    assert index.resolve_ref("orders", node_package="dep") == "db.pub.orders"
+    assert index.resolve_ref("orders", package="dep") == "db.dep.orders"
+    # Then the calling node's own package, then any package
+    assert index.resolve_ref("helper", node_package="dep") == "db.dep.helper"
+    assert index.resolve_ref("only_in_dep") == "db.dep.only_in_dep"
+    # Matches in several packages other than the root resolve like dbt, to the first in the manifest
+    assert index.resolve_ref("helper") == "db.dep.helper"
+    assert index.resolve_ref("helper", node_package="other") == "db.other.helper"
+    with pytest.raises(UnresolvedCall, match="not found"):
+        index.resolve_ref("orders", package="missing")
+
+
+def test_versions(index):
+    assert index.resolve_ref("customers") == "db.pub.customers_v2"
+    assert index.resolve_ref("customers", version=1) == "db.pub.customers_v1"
+    assert index.resolve_ref("customers", version="2") == "db.pub.customers_v2"
+
+
+def test_refable_types(index):
+    assert index.resolve_ref("countries") == "db.seeds.countries"
+    with pytest.raises(UnresolvedCall):
+        index.resolve_ref("not_null_orders_id")
+
+
+def test_sources(index):
+    assert index.resolve_source("shop", "orders") == "raw.shop.orders"
+    assert index.resolve_source("shop", "items") == 'raw.shop."Line Items"'
+    with pytest.raises(UnresolvedCall):
+        index.resolve_source("shop", "missing")
+
+
+def test_dialects(manifest):
+    assert dialect_for_adapter("databricks") is Dialect.spark_lp
+    assert dialect_for_adapter("duckdb") is None
+    assert normalize_identifier("Orders") == "orders"
+    assert normalize_identifier("Orders", Dialect.bigquery) == "Orders"
+    assert normalize_identifier("my table", Dialect.bigquery) == "`my table`"
+    assert normalize_identifier('a"b', Dialect.snowflake) == '"a""b"'
+    assert qualified_name(None, "Pub", "T") == "pub.t"
+    index = ResolutionIndex.from_manifest(manifest, "root", Dialect.spark_lp)
+    assert index.resolve_source("shop", "items") == "raw.shop.`Line Items`"
+
+
+def calls(code):
+    config, sources, refs = collect_dbt_calls(Parser(tokenize(code)).parse())
+    return refs + sources
+
+
+def test_resolve_call(index):
+    ref, src = calls("{{ ref('dep', 'orders') }} {{ source('shop', 'orders') }}")
+    assert index.resolve_call(ref) == "db.dep.orders"
+    assert index.resolve_call(src) == "raw.shop.orders"
+    (ref,) = calls("{{ ref('customers', v=1) }}")
+    assert index.resolve_call(ref) == "db.pub.customers_v1"
+    (ref,) = calls("{{ ref(var('model')) }}")
+    with pytest.raises(UnresolvedCall, match="not literals"):
+        index.resolve_call(ref)
+
+
+def test_pipeline_resolves_dependencies(manifest, index):
+    sources = [
+        ModelSource("model.root.a", "a", "root", "models/a.sql",
+                    "select * from {{ ref('orders') }} join {{ source('shop', 'orders') }} join {{ ref('orders') }}",
+                    database="DB", schema="Pub"),
+        ModelSource("model.root.b", "b", "root", "models/b.sql", "select * from {{ ref(var('x')) }}"),
+    ]
+    a, b = run_pipeline(sources, index=index)
+    assert a.table.dependencies == ["db.pub.orders", "raw.shop.orders"]
+    assert b.fallback_reason.startswith("unresolved call")
+    assert b.table.dependencies is None
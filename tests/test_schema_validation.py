@@ -0,0 +1,56 @@
+import pytest
+from pydantic import ValidationError
+
+from dbt_sdf.schema.generated.models import (
+    Credential4,
+    Definition,
+    Materialization,
+    Materialization10,
+    Table,
+    TablePurpose,
+)
+from dbt_sdf.schema.validation import construct_definitions, list_adapter, validate_definitions
+
+DEFINITIONS = [
+    {"workspace": {"edition": "1.3", "name": "demo"}},
+    {"table": {"name": "a.b.c", "materialization": "view", "purpose": "model",
+               "columns": [{"name": "id", "lineage": {"copy": ["x.id"]}}]}},
+    {"table": {"name": "a.b.d", "materialization": {"other": "custom"}, "dependencies": ["a.b.c"]}},
+    {"credential": {"name": "key", "type": "openai", "api-key": "secret"}},
+]
+
+
+def dump(definitions):
+    return [d.model_dump(mode="json", by_alias=True, exclude_defaults=True) for d in definitions]
+
+
+def test_list_adapter_is_cached():
+    assert list_adapter(Definition) is list_adapter(Definition)
+    assert list_adapter(Table) is not list_adapter(Definition)
+
+
+def test_validate_definitions():
+    definitions = validate_definitions(iter(DEFINITIONS))
+    assert [type(d) for d in definitions] == [Definition] * 4
+    assert definitions[1].table.materialization is Materialization.view
+    assert dump(definitions) == DEFINITIONS
+
+
+def test_validate_definitions_reports_every_error():
+    with pytest.raises(ValidationError) as e:
+        validate_definitions([{"table": {}}, {"table": {"name": "x", "purpose": "nope"}}])
+    assert {error["loc"][0] for error in e.value.errors()} == {0, 1}
+
+
+def test_construct_definitions_matches_validation():
+    constructed = construct_definitions(DEFINITIONS)
+    assert constructed == validate_definitions(DEFINITIONS)
+    assert constructed[1].table.purpose is TablePurpose.model
+    assert isinstance(constructed[2].table.materialization, Materialization10)
+    assert isinstance(constructed[3].credential, Credential4)
+    assert dump(constructed) == DEFINITIONS
+
+
+def test_construct_definitions_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="has no field 'nmae'"):
+        construct_definitions([{"table": {"nmae": "x"}}])
@@ -0,0 +1,129 @@
+import pickle
+import random
+
+import pytest
+
+from benchmarks.differential import TemplateGenerator
+from dbt_sdf.model_parser import serialization
+from dbt_sdf.model_parser.parser import BinaryOp, IfStatement, Literal, Node, Parser, Token, Variable, tokenize
+from dbt_sdf.model_parser.serialization import dumps_tokens, dumps_trees, loads_tokens, loads_trees
+
+TEMPLATE = """{{ config(materialized='table', tags=['a', 'b']) }}
+{% macro m(x, y='é') %}{{ x }}{% endmacro %}
+select {% if target.name == 'prod' %}{{ ref('a') }}{% elif x %}b{% else %}{{ f(y=1) }}{% endif %}
+{% for i in [1, 2] %}{{ i }}{% endfor %} {{ {'k': v.w[0]} }} {# note #}
+{% with z = 1 %}{{ -z }}{% endwith %}{% set s = not a %}{% do s.x() %}
+"""
+
+
+def parse(code, lazy=False):
+    return Parser(tokenize(code), lazy=lazy).parse()
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_generated_templates_round_trip(seed):
+    code = TemplateGenerator(random.Random(seed), 4).template()
+    tokens = tokenize(code)
+    assert loads_tokens(dumps_tokens(tokens)) == tokens
+    trees = Parser(tokens).parse()
+    assert loads_trees(dumps_trees(trees)) == trees
+
+
+def test_every_kind_of_node_round_trips():
+    trees = parse(TEMPLATE)
+    loaded = loads_trees(dumps_trees(trees))
+    assert loaded == trees
+    assert [type(node) for node in loaded] == [type(node) for node in trees]
+
+
+def test_lazy_trees_are_dumped_parsed():
+    assert loads_trees(dumps_trees(parse(TEMPLATE, lazy=True))) == parse(TEMPLATE)
+
+
+def test_shared_tokens_stay_shared():
+    statement = next(node for node in loads_trees(dumps_trees(parse(TEMPLATE))) if isinstance(node, IfStatement))
+    assert statement.token is Token.EMPTY
+    assert statement.clauses[0].token is Token.EMPTY
+
+
+def test_large_positions_round_trip():
+    tokens = [Token('IDENTIFIER', 'a', 100_000, 70_000), Token('TEXT', '', 1, 0)]
+    assert loads_tokens(dumps_tokens(tokens)) == tokens
+
+
+def test_deep_trees_round_trip_without_recursing():
+    node = Variable(Token('IDENTIFIER', 'x', 1, 0))
+    for i in range(10_000):
+        node = BinaryOp(Token('OP', '+', 1, 0), [node, Literal(Token('NUMBER', str(i), 1, 0))])
+    assert loads_trees(dumps_trees(node)) == node
+
+
+def test_smaller_than_pickle():
+    trees = parse(TEMPLATE * 20)
+    assert len(dumps_trees(trees)) < len(pickle.dumps(trees, protocol=pickle.HIGHEST_PROTOCOL))
+    tokens = tokenize(TEMPLATE * 20)
+    assert len(dumps_tokens(tokens)) < len(pickle.dumps(tokens, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_other_format_versions_are_rejected(monkeypatch):
+    data = dumps_trees(parse(TEMPLATE))
+    monkeypatch.setattr(serialization, "FORMAT_VERSION", serialization.FORMAT_VERSION + 1)
+    with pytest.raises(ValueError, match="format"):
+        loads_trees(data)
+
+
+NO_TOKENS = ([], ('B', b''), ('B', b''), ('B', b''), ('B', b''))
+
+
+def serialized(payload):
+    # Well formed, with a valid checksum, but not something dumps_trees() writes
+    return serialization._dumps('trees', payload)
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"not serialized",
+    dumps_tokens(tokenize(TEMPLATE)),
+    dumps_trees(parse(TEMPLATE))[:-10],
+    serialized(()),
+    # A list of one token, of which there are none
+    serialized((NO_TOKENS, ('B', bytes([2, 1, 1, 0])))),
+    # A list of one item that is missing
+    serialized((NO_TOKENS, ('B', bytes([2, 1])))),
+    serialized((NO_TOKENS, ('B', bytes([0, 0])))),
+    serialized((NO_TOKENS, ('B', bytes([200])))),
+])
+def test_corrupt_trees_raise_value_error(data):
+    with pytest.raises(ValueError):
+        loads_trees(data)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_flipped_bytes_raise_value_error(seed):
+    rng = random.Random(seed)
+    data = bytearray(dumps_trees(parse(TEMPLATE)))
+    for _ in range(50):
+        corrupt = bytearray(data)
+        for _ in range(rng.randint(1, 3)):
+            corrupt[rng.randrange(len(corrupt))] ^= 1 << rng.randrange(8)
+        if corrupt == data:
+            continue
+        with pytest.raises(ValueError):
+            loads_trees(bytes(corrupt))
+
+
+def test_truncated_and_extended_data_raise_value_error():
+    data = dumps_trees(parse(TEMPLATE))
+    for corrupt in (data[:len(serialization.MAGIC) + 3], data[:-1], data + b"\0"):
+        with pytest.raises(ValueError, match="Corrupt"):
+            loads_trees(corrupt)
+
+
+def test_unknown_values_cannot_be_dumped():
+    class Custom(Node):
+        pass
+
+    with pytest.raises(TypeError):
+        dumps_trees([Custom(Token('TEXT', 'a', 1, 0))])
+    with pytest.raises(TypeError):
+        dumps_trees([Node(Token('TEXT', 'a', 1, 0), [1.5])])
@@ -0,0 +1,37 @@
+import re
+
+from benchmarks.synthetic import ProjectSpec, generate_project, model_sources, write_project
+from dbt_sdf.migration.pipeline import run_pipeline
+
+
+def test_generated_project_shape():
+    spec = ProjectSpec(models=30, depth=3, fan_out=2, macros=4)
+    files = generate_project(spec)
+
+    assert "dbt_project.yml" in files
+    assert len([path for path in files if path.startswith("macros/")]) == 4
+    models = {path: code for path, code in files.items() if path.endswith(".sql") and path.startswith("models/")}
+    assert len(models) == 30
+
+    layer_of = {re.search(r"(model_\d+)", path).group(1): int(re.search(r"layer_(\d+)", path).group(1))
+                for path in models}
+    for path, code in models.items():
+        refs = re.findall(r"ref\('(model_\d+)'\)", code)
+        assert len(refs) <= 2
+        layer = int(re.search(r"layer_(\d+)", path).group(1))
+        assert all(layer_of[ref] < layer for ref in refs)
+
+
+def test_generation_is_deterministic():
+    assert generate_project(ProjectSpec(seed=3)) == generate_project(ProjectSpec(seed=3))
+    assert generate_project(ProjectSpec(seed=3)) != generate_project(ProjectSpec(seed=4))
+
+
+def test_generated_models_migrate_statically(tmp_path):
+    spec = ProjectSpec(models=10, jinja_density=0.8, macro_usage=0.5)
+    models = run_pipeline(model_sources(spec))
+    assert all(model.is_static for model in models)
+    assert all(model.ref_calls or model.source_calls for model in models)
+
+    write_project(spec, str(tmp_path))
+    assert (tmp_path / "dbt_project.yml").exists()
@@ -0,0 +1,64 @@
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.differential import TemplateGenerator
+from dbt_sdf.model_parser.parser import Parser, Token, collect_dbt_calls, extract_dbt_calls, tokenize
+
+THREADS = 16
+
+
+@pytest.fixture(autouse=True)
+def frequent_switches():
+    # Switch threads every few bytecodes to interleave them as much as possible
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return [TemplateGenerator(random.Random(seed), 4).template() for seed in range(50)]
+
+
+def parse(code):
+    return repr(Parser(tokenize(code)).parse())
+
+
+def test_parsing_from_many_threads(templates):
+    expected = [parse(code) for code in templates]
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        assert list(executor.map(parse, templates * 4)) == expected * 4
+
+
+def test_extracting_calls_from_many_threads(templates):
+    def calls(code):
+        return [repr(found) for found in extract_dbt_calls(code)]
+    expected = [calls(code) for code in templates]
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        assert list(executor.map(calls, templates * 4)) == expected * 4
+
+
+def test_reading_a_lazy_tree_from_many_threads(templates):
+    code = "\n".join(templates[:20])
+    expected = repr(collect_dbt_calls(Parser(tokenize(code)).parse()))
+    for _ in range(3):
+        trees = Parser(tokenize(code), lazy=True).parse()
+        barrier = threading.Barrier(THREADS)
+
+        def read():
+            barrier.wait()
+            return repr(collect_dbt_calls(trees))
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            results = [executor.submit(read) for _ in range(THREADS)]
+            assert [result.result() for result in results] == [expected] * THREADS
+
+
+def test_empty_token_cannot_be_changed():
+    with pytest.raises(AttributeError):
+        Token.EMPTY.column -= 2
+    assert repr(Token.EMPTY) == "Token('EMPTY', '', 0, 0)"
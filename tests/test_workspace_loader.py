@@ -0,0 +1,79 @@
+import pytest
+from pydantic import ValidationError
+
+from dbt_sdf.schema.generated.models import Definition, Materialization
+from dbt_sdf.schema.loader import LazyDefinition, find_sdf_yml_files, load_file, load_workspace, validate_all
+
+WORKSPACE = """\
+workspace:
+  edition: '1.3'
+  name: demo
+---
+table:
+  name: demo.pub.orders
+  materialization: view
+"""
+
+TABLES = """\
+table:
+  materialization: view
+  name: demo.pub.orders
+---
+---
+table:
+  name: demo.pub.customers
+  purpose: not-a-purpose
+"""
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "workspace.sdf.yml").write_text(WORKSPACE)
+    (tmp_path / "models").mkdir()
+    (tmp_path / "models" / "tables.sdf.yml").write_text(TABLES)
+    (tmp_path / "sdftarget").mkdir()
+    (tmp_path / "sdftarget" / "ignored.sdf.yml").write_text(WORKSPACE)
+    (tmp_path / "notes.yml").write_text("a: 1")
+    return tmp_path
+
+
+def test_find_sdf_yml_files(workspace):
+    assert find_sdf_yml_files(str(workspace)) == [
+        str(workspace / "models" / "tables.sdf.yml"),
+        str(workspace / "workspace.sdf.yml"),
+    ]
+
+
+def test_load_file_skips_empty_documents(workspace):
+    definitions = load_file(str(workspace / "models" / "tables.sdf.yml"))
+    assert [(d.index, d.key) for d in definitions] == [(0, ("table", "demo.pub.orders")), (2, ("table", "demo.pub.customers"))]
+
+
+def test_load_workspace_is_lazy(workspace):
+    definitions = load_workspace(str(workspace), max_workers=2)
+    assert [d.key for d in definitions] == [
+        ("table", "demo.pub.orders"),
+        ("table", "demo.pub.customers"),
+        ("workspace", "demo"),
+        ("table", "demo.pub.orders"),
+    ]
+    # Reading names and hashes never validates, so the invalid table goes unnoticed
+    assert all(d._definition is None for d in definitions)
+    # Key order and formatting do not change the hash
+    assert definitions[0].hash == definitions[3].hash
+    assert definitions[0].hash != definitions[1].hash
+
+    assert definitions[0].definition.table.materialization is Materialization.view
+    assert definitions[0].definition is definitions[0].definition
+    with pytest.raises(ValidationError):
+        definitions[1].definition
+
+
+def test_validate_all():
+    definitions = [
+        LazyDefinition("a.sdf.yml", 0, {"workspace": {"edition": "1.3", "name": "demo"}}),
+        LazyDefinition("a.sdf.yml", 1, {"table": {"name": "t"}}),
+    ]
+    validated = validate_all(definitions)
+    assert [type(d) for d in validated] == [Definition, Definition]
+    assert definitions[1].definition is validated[1]